@@ -1,5 +1,10 @@
-from starlette_admin import DropDown, I18nConfig
+from typing import Any, Dict, List
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette_admin import DropDown, I18nConfig, action
 from starlette_admin.contrib.sqla import Admin, ModelView
+from starlette_admin.exceptions import FormValidationError
 
 from app.admin.admin_auth import AdminAuthProvider
 from app.database.session import engine
@@ -12,9 +17,50 @@ from app.models.database import (
     Notification,
     QuestionTemplate,
 )
+from app.services.question_options import InvalidOptionsError, parse_option_scores
+from app.services.review_answers import ANSWER_COLUMNS
 
 auth_provider = AdminAuthProvider()
 
+
+# Источник ответов - строки review_answers, JSON-поля лишь их копия: правка
+# JSON в админке не повлияла бы на баллы, аналитику и API
+class ReviewView(ModelView):
+    exclude_fields_from_create = [*ANSWER_COLUMNS.values(), "answer_rows"]
+    exclude_fields_from_edit = [*ANSWER_COLUMNS.values(), "answer_rows"]
+
+
+class RespondentReviewView(ModelView):
+    exclude_fields_from_create = ["answers", "answer_rows"]
+    exclude_fields_from_edit = ["answers", "answer_rows"]
+
+
+class QuestionTemplateView(ModelView):
+    actions = ["delete", "rescore_reviews"]
+
+    async def validate(self, request: Request, data: Dict[str, Any]) -> None:
+        try:
+            parse_option_scores(data.get("options_json"))
+        except InvalidOptionsError as e:
+            raise FormValidationError({"options_json": str(e)})
+        return await super().validate(request, data)
+
+    @action(
+        name="rescore_reviews",
+        text="Пересчитать оценки",
+        confirmation="Пересчитать баллы всех оценок с ответами на выбранные вопросы?",
+        submit_btn_text="Пересчитать",
+    )
+    async def rescore_reviews(self, request: Request, pks: List[Any]) -> str:
+        """Пересчет баллов оценок после изменения весов шаблонов"""
+        # numpy нужен только для пересчета - не грузим его вместе с админкой
+        from app.services.review_rescoring import ReviewRescoringService
+
+        service = ReviewRescoringService(request.state.session)
+        result = await run_in_threadpool(service.rescore, pks)
+        return f"Пересчитано оценок: {result.updated} из {result.reviews}"
+
+
 admin = Admin(
     engine,
     title="Performance Review Admin",
@@ -50,8 +96,8 @@ admin.add_view(
     DropDown(
         label="📊 Система оценок",
         views=[
-            ModelView(Review, label="Оценка"),
-            ModelView(RespondentReview, label="Оценка респондента"),
+            ReviewView(Review, label="Оценка"),
+            RespondentReviewView(RespondentReview, label="Оценка респондента"),
         ],
     )
 )
@@ -59,7 +105,7 @@ admin.add_view(
 admin.add_view(
     DropDown(
         label="Шаблоны Вопросов",
-        views=[ModelView(QuestionTemplate, label="Шаблоны Вопросов")],
+        views=[QuestionTemplateView(QuestionTemplate, label="Шаблоны Вопросов")],
     )
 )
 
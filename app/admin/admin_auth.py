@@ -1,5 +1,6 @@
 from datetime import timedelta
 
+from fastapi import HTTPException
 from starlette_admin.auth import AuthProvider, AdminConfig, AdminUser
 from starlette_admin.exceptions import LoginFailed
 from starlette.requests import Request
@@ -7,7 +8,11 @@ from starlette.responses import Response
 
 from app.database.session import SessionLocal
 from app.models.database import User
-from app.core.security import verify_password, create_access_token, verify_token
+from app.core.security import (
+    verify_password_async,
+    create_access_token,
+    verify_token,
+)
 from app.core.config import settings
 
 
@@ -32,7 +37,14 @@ class AdminAuthProvider(AuthProvider):
             # Ищем пользователя по email
             user = db.query(User).filter(User.email == username).first()
 
-            if not user or not verify_password(password, user.hashed_password):  # type: ignore
+            try:
+                password_ok = user is not None and await verify_password_async(
+                    password, user.hashed_password  # type: ignore
+                )
+            except HTTPException:
+                raise LoginFailed("Сервер перегружен, попробуйте войти позже")
+
+            if not password_ok:
                 raise LoginFailed("Неверное имя пользователя или пароль")
 
             if not user.is_active:  # type: ignore
@@ -0,0 +1,67 @@
+import threading
+from typing import Callable, Optional
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Mount
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+ADMIN_PATH = "/admin"
+ADMIN_ROUTE_NAME = "admin"
+
+
+class LazyASGIApp:
+    """
+    ASGI-приложение, которое строится при первом запросе.
+
+    Сборка (импорт моделей админки, представлений и шаблонов) выполняется
+    в пуле потоков один раз; до первого обращения к /admin она не влияет на
+    время старта воркера.
+    """
+
+    def __init__(self, factory: Callable[[], ASGIApp]):
+        self._factory = factory
+        self._app: Optional[ASGIApp] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_built(self) -> bool:
+        return self._app is not None
+
+    @property
+    def app(self) -> ASGIApp:
+        if self._app is None:
+            with self._lock:
+                if self._app is None:
+                    self._app = self._factory()
+        return self._app
+
+    @property
+    def routes(self):
+        # Mount.url_path_for ищет имена маршрутов (admin:index) в routes
+        return getattr(self.app, "routes", [])
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self._app is None:
+            await run_in_threadpool(lambda: self.app)
+        await self.app(scope, receive, send)  # type: ignore
+
+
+def build_admin_app() -> ASGIApp:
+    """Собрать приложение starlette-admin со всеми представлениями"""
+    from app.admin.admin import admin
+
+    holder = Starlette()
+    admin.mount_to(holder)
+    mount = holder.routes[0] if holder.routes else None
+    if not isinstance(mount, Mount):
+        raise RuntimeError(
+            f"starlette-admin mount_to() did not add a Mount route (got {mount!r})"
+        )
+    return mount.app
+
+
+def mount_admin(app: Starlette, lazy: bool = False) -> None:
+    """Подключить админку на /admin; lazy - собрать при первом запросе"""
+    admin_app = LazyASGIApp(build_admin_app) if lazy else build_admin_app()
+    app.mount(ADMIN_PATH, app=admin_app, name=ADMIN_ROUTE_NAME)
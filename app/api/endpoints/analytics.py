@@ -1,11 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.endpoints.auth import get_current_user
-from app.database.session import get_db
+from app.api.endpoints.auth import get_current_user_async
+from app.database.session import get_async_db
 from app.models.database import User, Goal
-from app.models.schemas import GoalAnalyticsResponse, EmployeeSummaryResponse
-from app.services.analytics_service import AnalyticsService
+from app.models.schemas import (
+    CalibrationResponse,
+    GoalAnalyticsResponse,
+    EmployeeSummaryResponse,
+    OrgAnalyticsResponse,
+    ReviewType,
+)
+from app.services.analytics_snapshot_service import GoalAnalyticsSnapshotService
+from app.services.calibration_service import CalibrationService, parse_review_cycle
+from app.services.org_hierarchy import OrgHierarchyService
 
 router = APIRouter(tags=["analytics"])
 
@@ -18,22 +26,26 @@ router = APIRouter(tags=["analytics"])
 )
 async def get_goal_analytics(
     goal_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    refresh: bool = Query(False, description="Пересчитать снимок аналитики"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Аналитика по конкретной цели"""
-    analytics_service = AnalyticsService(db)
-    analytics = analytics_service.get_goal_analytics(goal_id)
-
-    if not analytics:
+    goal = await db.get(Goal, goal_id)
+    if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
 
-    goal = db.query(Goal).filter(Goal.id == goal_id).first()
     if goal.employee_id != current_user.id and not current_user.is_manager:  # type: ignore
         raise HTTPException(
             status_code=403, detail="Not authorized to view this analytics"
         )
 
+    analytics = await db.run_sync(
+        lambda session: GoalAnalyticsSnapshotService(
+            session, force_refresh=refresh
+        ).get_goal_analytics(goal_id)
+    )
+
     return analytics
 
 
@@ -45,8 +57,9 @@ async def get_goal_analytics(
 )
 async def get_employee_summary(
     employee_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    refresh: bool = Query(False, description="Пересчитать снимки аналитики целей"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Сводная аналитика по сотруднику"""
     # Проверяем права доступа
@@ -55,7 +68,72 @@ async def get_employee_summary(
             status_code=403, detail="Not authorized to view this employee's analytics"
         )
 
-    analytics_service = AnalyticsService(db)
-    summary = analytics_service.get_employee_summary(employee_id)
+    summary = await db.run_sync(
+        lambda session: GoalAnalyticsSnapshotService(
+            session, force_refresh=refresh
+        ).get_employee_summary(employee_id)
+    )
 
     return summary
+
+
+@router.get(
+    "/org/summary",
+    response_model=OrgAnalyticsResponse,
+    summary="Сводная аналитика по оргструктуре",
+    description="Сводка по всем подчиненным руководителя и по командам его прямых подчиненных. Считается по снимкам аналитики целей.",
+)
+async def get_org_summary(
+    refresh: bool = Query(
+        False, description="Пересчитать отсутствующие и устаревшие снимки"
+    ),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Сводная аналитика по оргструктуре (только для руководителей)"""
+    if not current_user.is_manager:  # type: ignore
+        raise HTTPException(
+            status_code=403, detail="Only managers can view organisation analytics"
+        )
+
+    def build(session):
+        service = OrgHierarchyService(session)
+        if refresh:
+            goals = service.get_goals_without_fresh_analytics(current_user.id)  # type: ignore
+            if goals:
+                GoalAnalyticsSnapshotService(session).get_goals_analytics(goals)
+        return service.get_analytics_rollup(current_user.id)  # type: ignore
+
+    return await db.run_sync(build)
+
+
+@router.get(
+    "/calibration",
+    response_model=CalibrationResponse,
+    summary="Калибровочная аналитика",
+    description="Гистограмма баллов, перцентили и распределение рейтингов по компании, руководителям и подразделениям с отклонениями от среднего. Кэшируется по циклу оценки.",
+)
+async def get_calibration(
+    cycle: str = Query(
+        "all", description="Цикл оценки: 2026, 2026-H1, 2026-Q3 или all"
+    ),
+    review_type: ReviewType = Query(ReviewType.MANAGER, description="Тип оценки"),
+    refresh: bool = Query(False, description="Пересчитать, не используя кэш"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Калибровочная аналитика (только для руководителей)"""
+    if not current_user.is_manager:  # type: ignore
+        raise HTTPException(
+            status_code=403, detail="Only managers can view calibration analytics"
+        )
+    try:
+        review_cycle = parse_review_cycle(cycle)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return await db.run_sync(
+        lambda session: CalibrationService(session).get_calibration(
+            review_cycle, review_type.value, refresh
+        )
+    )
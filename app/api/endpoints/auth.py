@@ -2,30 +2,60 @@ from datetime import timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
     create_access_token,
     verify_token,
 )
 from app.core.config import settings
-from app.database.session import get_db
+from app.database.session import get_async_db, get_db
 from app.models.database import User
 from app.models.schemas import UserCreate, UserResponse, Token, UserLogin
+from app.services.user_cache import user_cache
 
 
 router = APIRouter(tags=["authentication"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
+# Для EventSource (SSE), который не умеет передавать заголовок Authorization
+oauth2_scheme_optional = OAuth2PasswordBearer(
+    tokenUrl="api/v1/auth/login", auto_error=False
+)
 
 
-async def get_current_user(
+def get_current_user(
     token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
 ) -> User:
-    """Зависимость для получения текущего пользователя из JWT токена"""
+    """
+    Зависимость для получения текущего пользователя из JWT токена.
+
+    Для эндпоинтов на синхронной сессии: синхронная функция выполняется
+    в пуле потоков, промах кэша не блокирует event loop.
+    """
+    user_id = verify_token(token)
+    user = user_cache.get_user(db, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
+        )
+    return user
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """
+    Текущий пользователь для эндпоинтов на асинхронной сессии.
+
+    Пользователь привязан к той же сессии, что и эндпоинт, - его можно
+    использовать в сервисах внутри `db.run_sync(...)`.
+    """
     user_id = verify_token(token)
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.run_sync(lambda session: user_cache.get_user(session, user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
@@ -39,10 +69,10 @@ async def get_current_user(
     summary="Регистрация пользователя",
     description="Создание нового пользователя в системе. Для сотрудников is_manager=False, для руководителей - True.",
 )
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Регистрация нового пользователя"""
     # Проверяем, нет ли уже пользователя с таким email
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -51,10 +81,8 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
     # ПРОВЕРЯЕМ РУКОВОДИТЕЛЯ (если указан)
     if user_data.manager_id:
-        manager = (
-            db.query(User)
-            .filter(User.id == user_data.manager_id, User.is_manager == True)
-            .first()
+        manager = await db.scalar(
+            select(User).where(User.id == user_data.manager_id, User.is_manager == True)
         )
         if not manager:
             raise HTTPException(
@@ -63,7 +91,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
             )
 
     # Создаем пользователя (ТОЛЬКО те поля, которые есть в UserCreate)
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     user = User(
         email=user_data.email,
         full_name=user_data.full_name,
@@ -72,9 +100,10 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         manager_id=user_data.manager_id,  # СОХРАНЯЕМ РУКОВОДИТЕЛЯ
     )
 
+    # Строки org_hierarchy добавляет событие маппера User
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     return user
 
@@ -85,10 +114,12 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     summary="Аутентификация",
     description="Вход в систему. Возвращает JWT токен для доступа к защищенным endpoints.",
 )
-async def login(login_data: UserLogin, db: Session = Depends(get_db)):
+async def login(login_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Аутентификация пользователя"""
-    user = db.query(User).filter(User.email == login_data.email).first()
-    if not user or not verify_password(login_data.password, user.hashed_password):  # type: ignore
+    user = await db.scalar(select(User).where(User.email == login_data.email))
+    if not user or not await verify_password_async(
+        login_data.password, user.hashed_password  # type: ignore
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -1,19 +1,37 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from app.api.endpoints.auth import get_current_user
 from app.core.logger import logger
+from app.core.pagination import keyset_paginate, set_next_cursor
 from app.database.session import get_db
 from app.models.database import Goal as GoalModel, GoalStep, User
 from app.models.schemas import GoalCreate, GoalResponse, SuccessResponse
 from app.services.email_service import EmailService
+from app.services.goal_queries import goal_query
 from app.services.notification_service import NotificationService
+from app.services.org_hierarchy import OrgHierarchyService
 
 
 router = APIRouter(tags=["goals"])
 
+PAGE_LIMIT_HELP = "Размер страницы (без limit и cursor возвращаются все цели)"
+CURSOR_HELP = "Курсор следующей страницы из заголовка X-Next-Cursor"
+
+
+def _paginate_goals(
+    query, response: Response, limit: Optional[int], cursor: Optional[str]
+) -> List[GoalModel]:
+    # Без параметров пагинации - прежнее поведение: весь список
+    if limit is None and cursor is None:
+        return query.order_by(GoalModel.created_at, GoalModel.id).all()
+
+    goals, next_cursor = keyset_paginate(query, GoalModel, cursor=cursor, limit=limit)
+    set_next_cursor(response, next_cursor)
+    return goals
+
 
 @router.post(
     "/",
@@ -103,7 +121,7 @@ async def create_goal(
 
         if respondent_emails:
             try:
-                email_service = EmailService(db)
+                email_service = EmailService(db, use_outbox=True)
                 success = email_service.notify_respondents_about_review_request(
                     goal_id=db_goal.id,  # type: ignore
                     employee_name=current_user.full_name,  # type: ignore
@@ -125,6 +143,9 @@ async def create_goal(
 )
 async def get_employee_goals(
     employee_id: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=100, description=PAGE_LIMIT_HELP),
+    cursor: Optional[str] = Query(None, description=CURSOR_HELP),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -135,12 +156,14 @@ async def get_employee_goals(
             status_code=403, detail="Not authorized to view these goals"
         )
 
-    goals = db.query(GoalModel).filter(GoalModel.employee_id == employee_id).all()
+    query = goal_query(db, relations=("employee", "steps")).filter(
+        GoalModel.employee_id == employee_id
+    )
+    goals = _paginate_goals(query, response, limit, cursor)
 
-    # Добавляем имя сотрудника и подпункты к ответу
+    # Сотрудник и подпункты уже загружены вместе с целями
     for goal in goals:
         goal.employee_name = goal.employee.full_name  # type: ignore
-        # Подпункты автоматически загрузятся через relationship
 
     return goals
 
@@ -157,7 +180,7 @@ async def get_goal(
     db: Session = Depends(get_db),
 ):
     """Получение конкретной цели"""
-    goal = db.query(GoalModel).filter(GoalModel.id == goal_id).first()
+    goal = goal_query(db).filter(GoalModel.id == goal_id).first()
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
 
@@ -221,17 +244,50 @@ async def update_goal_status(
     description="Получение списка целей, где текущий пользователь назначен респондентом.",
 )
 async def get_my_respondent_goals(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=100, description=PAGE_LIMIT_HELP),
+    cursor: Optional[str] = Query(None, description=CURSOR_HELP),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """Получение целей, где пользователь является респондентом"""
-    goals = (
-        db.query(GoalModel)
+    query = (
+        goal_query(db, relations=("employee", "steps"))
         .join(GoalModel.respondents)
         .filter(User.id == current_user.id)
-        .all()
     )
+    goals = _paginate_goals(query, response, limit, cursor)
+
+    for goal in goals:
+        goal.employee_name = goal.employee.full_name  # type: ignore
+
+    return goals
 
+
+@router.get(
+    "/org/my",
+    response_model=List[GoalResponse],
+    summary="Цели всей оргструктуры",
+    description="Цели всех подчиненных текущего руководителя на всех уровнях. `max_depth` ограничивает уровень подчинения.",
+)
+async def get_my_org_goals(
+    response: Response,
+    max_depth: Optional[int] = Query(None, ge=1, description="Максимальный уровень"),
+    limit: Optional[int] = Query(None, ge=1, le=100, description=PAGE_LIMIT_HELP),
+    cursor: Optional[str] = Query(None, description=CURSOR_HELP),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Получение целей оргструктуры руководителя"""
+    if not current_user.is_manager:  # type: ignore
+        raise HTTPException(
+            status_code=403, detail="Only managers can view organisation goals"
+        )
+
+    query = OrgHierarchyService(db).subtree_goals_query(
+        current_user.id, max_depth=max_depth  # type: ignore
+    )
+    goals = _paginate_goals(query, response, limit, cursor)
     for goal in goals:
         goal.employee_name = goal.employee.full_name  # type: ignore
 
@@ -250,7 +306,7 @@ async def get_goal_as_respondent(
     db: Session = Depends(get_db),
 ):
     """Получение цели респондентом"""
-    goal = db.query(GoalModel).filter(GoalModel.id == goal_id).first()
+    goal = goal_query(db).filter(GoalModel.id == goal_id).first()
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
 
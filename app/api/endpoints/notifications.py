@@ -1,16 +1,22 @@
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-
-from app.api.endpoints.auth import get_current_user
-from app.database.session import get_db
+from typing import AsyncIterator, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.endpoints.auth import get_current_user_async, oauth2_scheme_optional
+from app.core import json_codec
+from app.core.config import settings
+from app.core.pagination import set_next_cursor
+from app.core.security import verify_token
+from app.database.session import AsyncSessionLocal, get_async_db
 from app.models.database import User
 from app.models.schemas import (
     NotificationResponse,
     UnreadCountResponse,
     SuccessResponse,
 )
+from app.services.notification_broker import Subscription, notification_broker
 from app.services.notification_service import NotificationService
 
 
@@ -24,17 +30,26 @@ router = APIRouter(tags=["notifications"])
     description="Получение списка уведомлений текущего пользователя",
 )
 async def get_my_notifications(
+    response: Response,
     unread_only: bool = Query(False, description="Только непрочитанные уведомления"),
     limit: int = Query(50, description="Количество уведомлений", ge=1, le=100),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        None, description="Курсор следующей страницы из заголовка X-Next-Cursor"
+    ),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Получение уведомлений текущего пользователя"""
-    notification_service = NotificationService(db)
-    notifications = notification_service.get_user_notifications(
-        user_id=current_user.id, limit=limit, unread_only=unread_only  # type: ignore
+    notifications, next_cursor = await db.run_sync(
+        lambda session: NotificationService(session).get_user_notifications_page(
+            user_id=current_user.id,  # type: ignore
+            limit=limit,
+            unread_only=unread_only,
+            cursor=cursor,
+        )
     )
 
+    set_next_cursor(response, next_cursor)
     return notifications
 
 
@@ -46,12 +61,15 @@ async def get_my_notifications(
 )
 async def mark_notification_read(
     notification_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Отметить уведомление как прочитанное"""
-    notification_service = NotificationService(db)
-    success = notification_service.mark_as_read(notification_id, current_user.id)  # type: ignore
+    success = await db.run_sync(
+        lambda session: NotificationService(session).mark_as_read(
+            notification_id, current_user.id  # type: ignore
+        )
+    )
 
     if not success:
         raise HTTPException(status_code=404, detail="Notification not found")
@@ -66,11 +84,15 @@ async def mark_notification_read(
     description="Отметить все уведомления пользователя как прочитанные",
 )
 async def mark_all_notifications_read(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Отметить все уведомления как прочитанные"""
-    notification_service = NotificationService(db)
-    count = notification_service.mark_all_as_read(current_user.id)  # type: ignore
+    count = await db.run_sync(
+        lambda session: NotificationService(session).mark_all_as_read(
+            current_user.id  # type: ignore
+        )
+    )
 
     return SuccessResponse(message=f"Marked {count} notifications as read")
 
@@ -82,10 +104,93 @@ async def mark_all_notifications_read(
     description="Количество непрочитанных уведомлений пользователя",
 )
 async def get_unread_count(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Получить количество непрочитанных уведомлений"""
-    notification_service = NotificationService(db)
-    count = notification_service.get_unread_count(current_user.id)  # type: ignore
+    count = await db.run_sync(
+        lambda session: NotificationService(session).get_unread_count(
+            current_user.id  # type: ignore
+        )
+    )
 
     return UnreadCountResponse(unread_count=count)
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Сообщение в формате text/event-stream"""
+    return f"event: {event}\ndata: {json_codec.dumps(data)}\n\n"
+
+
+async def notification_event_stream(
+    request: Request, subscription: Subscription, unread_count: int
+) -> AsyncIterator[str]:
+    """Поток SSE: текущий счетчик, затем события по мере их появления"""
+    try:
+        yield format_sse("unread_count", {"unread_count": unread_count})
+
+        while not await request.is_disconnected():
+            event = await subscription.get(
+                timeout=settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS
+            )
+            if event is None:
+                # Комментарий-heartbeat держит соединение через прокси
+                yield ": keepalive\n\n"
+                continue
+
+            yield format_sse(event["type"], event["data"])
+    finally:
+        subscription.close()
+
+
+@router.get(
+    "/stream",
+    summary="Поток уведомлений (SSE)",
+    description="""
+    Server-Sent Events поток уведомлений текущего пользователя вместо опроса.
+
+    - **unread_count**: количество непрочитанных (сразу при подключении и при изменениях)
+    - **notification**: новое уведомление
+
+    Токен передается в заголовке Authorization или параметром `token`
+    (EventSource не поддерживает заголовки).
+    """,
+)
+async def stream_notifications(
+    request: Request,
+    token: Optional[str] = Query(None, description="JWT токен (для EventSource)"),
+    header_token: Optional[str] = Depends(oauth2_scheme_optional),
+):
+    """SSE поток уведомлений текущего пользователя"""
+    access_token = header_token or token
+    if not access_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user_id = verify_token(access_token)
+
+    # Сессия нужна только на старте - не держим соединение с БД весь поток
+    async with AsyncSessionLocal() as db:
+        user = await db.get(User, user_id)
+        if not user or not user.is_active:  # type: ignore
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
+            )
+
+        # Подписываемся до чтения счетчика, чтобы не пропустить события
+        subscription = notification_broker.subscribe(user_id)
+        try:
+            unread_count = await db.run_sync(
+                lambda session: NotificationService(session).get_unread_count(user_id)
+            )
+        except Exception:
+            subscription.close()
+            raise
+
+    return StreamingResponse(
+        notification_event_stream(request, subscription, unread_count),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
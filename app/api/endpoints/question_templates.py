@@ -1,9 +1,10 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from app.api.endpoints.auth import get_current_user
+from app.core.pagination import keyset_paginate, set_next_cursor
 from app.database.session import get_db
 from app.models.database import QuestionTemplate, User
 from app.models.schemas import (
@@ -42,6 +43,7 @@ async def create_question_template(
         max_score=template_data.max_score,
         order_index=template_data.order_index,
         trigger_words=template_data.trigger_words,
+        options_json=template_data.options_json,
         requires_manager_scoring=template_data.requires_manager_scoring,
     )
 
@@ -56,11 +58,22 @@ async def create_question_template(
     "/",
     response_model=List[QuestionTemplateResponse],
     summary="Получение списка шаблонов вопросов",
-    description="Получение всех активных шаблонов вопросов с фильтрацией по типу.",
+    description="""
+    Получение всех активных шаблонов вопросов с фильтрацией по типу.
+    
+    Без `limit` и `cursor` возвращается весь список в порядке order_index.
+    С ними - страница в порядке создания, курсор следующей страницы
+    приходит в заголовке X-Next-Cursor.
+    """,
 )
 async def get_question_templates(
+    response: Response,
     question_type: Optional[str] = Query(None, description="Фильтр по типу вопроса"),
     section: Optional[str] = Query(None, description="Фильтр по разделу"),
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Размер страницы"),
+    cursor: Optional[str] = Query(
+        None, description="Курсор следующей страницы из заголовка X-Next-Cursor"
+    ),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -73,7 +86,13 @@ async def get_question_templates(
     if section:
         query = query.filter(QuestionTemplate.section == section)
 
-    templates = query.order_by(QuestionTemplate.order_index).all()
+    if limit is None and cursor is None:
+        return query.order_by(QuestionTemplate.order_index).all()
+
+    templates, next_cursor = keyset_paginate(
+        query, QuestionTemplate, cursor=cursor, limit=limit
+    )
+    set_next_cursor(response, next_cursor)
     return templates
 
 
@@ -130,6 +149,7 @@ async def update_question_template(
     template.max_score = template_data.max_score  # type: ignore
     template.order_index = template_data.order_index  # type: ignore
     template.trigger_words = template_data.trigger_words  # type: ignore
+    template.options_json = template_data.options_json  # type: ignore
     template.requires_manager_scoring = template_data.requires_manager_scoring  # type: ignore
 
     db.commit()
@@ -1,10 +1,12 @@
-import json
 from typing import Dict, List
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.endpoints.auth import get_current_user
+from app.api.endpoints.auth import get_current_user_async
+from app.core import json_codec
+from app.core.json_codec import model_response
 from app.core.logger import logger
 from app.models.database import Review, RespondentReview, Goal, User
 from app.models.schemas import (
@@ -18,8 +20,18 @@ from app.models.schemas import (
     RespondentReviewResponse,
     SuccessResponse,
 )
-from app.database.session import get_db
+from app.database.session import get_async_db
+from app.services.analytics_snapshot_service import GoalAnalyticsSnapshotService
 from app.services.email_service import EmailService
+from app.services.review_answers import (
+    ANSWER_COLUMNS,
+    get_respondent_answers,
+    get_review_answers,
+    set_respondent_answers,
+    set_review_answers,
+    update_answer_scores,
+)
+from app.services.question_options import InvalidOptionError
 from app.services.review_service import ReviewService
 from app.services.notification_service import NotificationService
 from app.services.user_service import UserService
@@ -45,10 +57,20 @@ router = APIRouter(tags=["reviews"])
 )
 async def create_review(
     review: ReviewCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Создание оценки (самооценка, оценка руководителя, оценка потенциала)"""
+    return await db.run_sync(
+        lambda session: _create_review(session, review, current_user)
+    )
+
+
+def _create_review(
+    db: Session,
+    review: ReviewCreate,
+    current_user: User,
+):
     # Проверяем существование цели
     goal = db.query(Goal).filter(Goal.id == review.goal_id).first()
     if not goal:
@@ -87,19 +109,22 @@ async def create_review(
     # РАСЧЕТ БАЛЛОВ
     review_service = ReviewService(db)
 
-    if review.review_type == ReviewType.POTENTIAL:
-        # Для оценки потенциала
-        potential_scores = review_service.calculate_potential_score(review.answers)
-        score = potential_scores["total_potential_score"]
-
-        # Сохраняем детальные баллы потенциала в JSON
-        potential_details = json.dumps(potential_scores, ensure_ascii=False)
-    else:
-        # Для других типов используем стандартный расчет
-        score = review_service.calculate_weighted_score(
-            review.answers, review.review_type
-        )
-        potential_details = None
+    try:
+        if review.review_type == ReviewType.POTENTIAL:
+            # Для оценки потенциала
+            potential_scores = review_service.calculate_potential_score(review.answers)
+            score = potential_scores["total_potential_score"]
+
+            # Сохраняем детальные баллы потенциала в JSON
+            potential_details = json_codec.dumps(potential_scores)
+        else:
+            # Для других типов используем стандартный расчет
+            score = review_service.calculate_weighted_score(
+                review.answers, review.review_type
+            )
+            potential_details = None
+    except InvalidOptionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     # ГЕНЕРАЦИЯ РЕКОМЕНДАЦИЙ НА ОСНОВЕ ТРИГГЕРНЫХ СЛОВ
     recommendations = review_service.extract_trigger_words_feedback(review.answers)
@@ -111,24 +136,20 @@ async def create_review(
         review_type=review.review_type,
         calculated_score=score,
         final_feedback=(
-            json.dumps(recommendations, ensure_ascii=False) if recommendations else None
+            json_codec.dumps(recommendations) if recommendations else None
         ),  # Сохраняем рекомендации
     )
 
-    # Сохраняем ответы в соответствующие поля
-    answers_json = json.dumps([answer.model_dump() for answer in review.answers], ensure_ascii=False)
+    # Сохраняем ответы (review_answers + JSON-поле типа оценки)
+    set_review_answers(db_review, review.answers)
 
-    if review.review_type == ReviewType.SELF:
-        db_review.self_evaluation_answers = answers_json  # type: ignore
-    elif review.review_type == ReviewType.MANAGER:
-        db_review.manager_evaluation_answers = answers_json  # type: ignore
-    elif review.review_type == ReviewType.POTENTIAL:
-        db_review.potential_evaluation_answers = answers_json  # type: ignore
+    if review.review_type == ReviewType.POTENTIAL:
         # Сохраняем детали потенциала
         db_review.manager_feedback = potential_details  # type: ignore
 
     db.add(db_review)
     db.commit()
+    GoalAnalyticsSnapshotService(db).refresh_goals([review.goal_id])
     db.refresh(db_review)
 
     # АВТОМАТИЧЕСКОЕ УВЕДОМЛЕНИЕ РУКОВОДИТЕЛЯ ПРИ САМООЦЕНКЕ
@@ -142,7 +163,7 @@ async def create_review(
             manager = managers[0] if managers else None
 
         if manager and manager.email:  # type: ignore
-            email_service = EmailService(db)
+            email_service = EmailService(db, use_outbox=True)
             email_service.notify_manager_about_pending_review(
                 goal_id=goal.id,  # type: ignore
                 employee_name=current_user.full_name,  # type: ignore
@@ -158,15 +179,17 @@ async def create_review(
                 manager_id=manager.id,  # type: ignore
             )
 
-    return ReviewResponse(
-        id=db_review.id,  # type: ignore
-        goal_id=db_review.goal_id,  # type: ignore
-        reviewer_id=db_review.reviewer_id,  # type: ignore
-        review_type=db_review.review_type,  # type: ignore
-        calculated_score=db_review.calculated_score,  # type: ignore
-        created_at=db_review.created_at,  # type: ignore
-        final_rating=db_review.final_rating,  # type: ignore
-        final_feedback=db_review.final_feedback,  # type: ignore
+    return model_response(
+        ReviewResponse(
+            id=db_review.id,  # type: ignore
+            goal_id=db_review.goal_id,  # type: ignore
+            reviewer_id=db_review.reviewer_id,  # type: ignore
+            review_type=db_review.review_type,  # type: ignore
+            calculated_score=db_review.calculated_score,  # type: ignore
+            created_at=db_review.created_at,  # type: ignore
+            final_rating=db_review.final_rating,  # type: ignore
+            final_feedback=db_review.final_feedback,  # type: ignore
+        )
     )
 
 
@@ -178,10 +201,20 @@ async def create_review(
 )
 async def get_review_with_answers(
     review_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Получение ревью с ответами"""
+    return await db.run_sync(
+        lambda session: _get_review_with_answers(session, review_id, current_user)
+    )
+
+
+def _get_review_with_answers(
+    db: Session,
+    review_id: str,
+    current_user: User,
+):
     review = db.query(Review).filter(Review.id == review_id).first()
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
@@ -205,19 +238,13 @@ async def get_review_with_answers(
         final_feedback=review.final_feedback,  # type: ignore
     )
 
-    # Парсим JSON ответы
-    if review.self_evaluation_answers:  # type: ignore
-        result.self_evaluation_answers = json.loads(review.self_evaluation_answers)  # type: ignore
-    if review.manager_evaluation_answers:  # type: ignore
-        result.manager_evaluation_answers = json.loads(
-            review.manager_evaluation_answers  # type: ignore
-        )
-    if review.potential_evaluation_answers:  # type: ignore
-        result.potential_evaluation_answers = json.loads(
-            review.potential_evaluation_answers  # type: ignore
-        )
+    # Ответы кладем в поле, соответствующее типу оценки
+    column = ANSWER_COLUMNS.get(review.review_type)  # type: ignore
+    answers = get_review_answers(review)
+    if column and answers:
+        setattr(result, column, [answer.model_dump() for answer in answers])
 
-    return result
+    return model_response(result)
 
 
 @router.put(
@@ -229,10 +256,23 @@ async def get_review_with_answers(
 async def update_final_review(
     review_id: str,
     final_data: FinalReviewUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Завершение ревью руководителем - проставление рейтинга и обратной связи"""
+    return await db.run_sync(
+        lambda session: _update_final_review(
+            session, review_id, final_data, current_user
+        )
+    )
+
+
+def _update_final_review(
+    db: Session,
+    review_id: str,
+    final_data: FinalReviewUpdate,
+    current_user: User,
+):
     if not current_user.is_manager:  # type: ignore
         raise HTTPException(
             status_code=403, detail="Only managers can finalize reviews"
@@ -246,6 +286,7 @@ async def update_final_review(
     review.final_feedback = final_data.final_feedback  # type: ignore
 
     db.commit()
+    GoalAnalyticsSnapshotService(db).refresh_goals([review.goal_id])  # type: ignore
     db.refresh(review)
 
     # АВТОМАТИЧЕСКОЕ УВЕДОМЛЕНИЕ СОТРУДНИКА О ЗАВЕРШЕНИИ РЕВЬЮ
@@ -253,7 +294,7 @@ async def update_final_review(
     employee = goal.employee
 
     if employee and employee.email:
-        email_service = EmailService(db)
+        email_service = EmailService(db, use_outbox=True)
         email_service.notify_employee_about_final_review(
             goal_id=goal.id,
             employee_email=employee.email,
@@ -270,15 +311,17 @@ async def update_final_review(
             employee_id=employee.id,
         )
 
-    return ReviewResponse(
-        id=review.id,  # type: ignore
-        goal_id=review.goal_id,  # type: ignore
-        reviewer_id=review.reviewer_id,  # type: ignore
-        review_type=review.review_type,  # type: ignore
-        calculated_score=review.calculated_score,  # type: ignore
-        created_at=review.created_at,  # type: ignore
-        final_rating=review.final_rating,  # type: ignore
-        final_feedback=review.final_feedback,  # type: ignore
+    return model_response(
+        ReviewResponse(
+            id=review.id,  # type: ignore
+            goal_id=review.goal_id,  # type: ignore
+            reviewer_id=review.reviewer_id,  # type: ignore
+            review_type=review.review_type,  # type: ignore
+            calculated_score=review.calculated_score,  # type: ignore
+            created_at=review.created_at,  # type: ignore
+            final_rating=review.final_rating,  # type: ignore
+            final_feedback=review.final_feedback,  # type: ignore
+        )
     )
 
 
@@ -296,10 +339,20 @@ async def update_final_review(
 )
 async def create_respondent_review(
     review: RespondentReviewCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Создание оценки респондента"""
+    return await db.run_sync(
+        lambda session: _create_respondent_review(session, review, current_user)
+    )
+
+
+def _create_respondent_review(
+    db: Session,
+    review: RespondentReviewCreate,
+    current_user: User,
+):
     # Проверяем существование цели
     goal = db.query(Goal).filter(Goal.id == review.goal_id).first()
     if not goal:
@@ -328,9 +381,12 @@ async def create_respondent_review(
 
     # РАСЧЕТ БАЛЛОВ
     review_service = ReviewService(db)
-    score = review_service.calculate_weighted_score(
-        review.answers, ReviewType.RESPONDENT
-    )
+    try:
+        score = review_service.calculate_weighted_score(
+            review.answers, ReviewType.RESPONDENT
+        )
+    except InvalidOptionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     # ГЕНЕРАЦИЯ РЕКОМЕНДАЦИЙ
     recommendations = review_service.extract_trigger_words_feedback(review.answers)
@@ -348,25 +404,28 @@ async def create_respondent_review(
     db_review = RespondentReview(
         goal_id=review.goal_id,
         respondent_id=current_user.id,
-        answers=json.dumps([answer.model_dump() for answer in review.answers], ensure_ascii=False),
         comments=enhanced_comments,  # type: ignore
     )
+    set_respondent_answers(db_review, review.answers)
 
     db.add(db_review)
     db.commit()
+    GoalAnalyticsSnapshotService(db).refresh_goals([review.goal_id])
     db.refresh(db_review)
 
     # Добавляем имя респондента для ответа
     db_review.respondent_name = current_user.full_name  # type: ignore
 
-    return RespondentReviewResponse(
-        id=db_review.id,  # type: ignore
-        goal_id=db_review.goal_id,  # type: ignore
-        respondent_id=db_review.respondent_id,  # type: ignore
-        answers=review.answers,
-        comments=db_review.comments,  # type: ignore
-        created_at=db_review.created_at,  # type: ignore
-        respondent_name=current_user.full_name,  # type: ignore
+    return model_response(
+        RespondentReviewResponse(
+            id=db_review.id,  # type: ignore
+            goal_id=db_review.goal_id,  # type: ignore
+            respondent_id=db_review.respondent_id,  # type: ignore
+            answers=review.answers,
+            comments=db_review.comments,  # type: ignore
+            created_at=db_review.created_at,  # type: ignore
+            respondent_name=current_user.full_name,  # type: ignore
+        )
     )
 
 
@@ -378,10 +437,20 @@ async def create_respondent_review(
 )
 async def get_respondent_review(
     review_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Получение оценки респондента"""
+    return await db.run_sync(
+        lambda session: _get_respondent_review(session, review_id, current_user)
+    )
+
+
+def _get_respondent_review(
+    db: Session,
+    review_id: str,
+    current_user: User,
+):
     review = db.query(RespondentReview).filter(RespondentReview.id == review_id).first()
     if not review:
         raise HTTPException(status_code=404, detail="Respondent review not found")
@@ -397,24 +466,22 @@ async def get_respondent_review(
             status_code=403, detail="Not authorized to view this respondent review"
         )
 
-    # Парсим JSON ответы и преобразуем в List[Answer]
-    parsed_answers = []
-    if review.answers:  # type: ignore
-        try:
-            answers_data = json.loads(review.answers)  # type: ignore
-            parsed_answers = [Answer(**answer_data) for answer_data in answers_data]
-        except Exception as e:
-            logger.error(f"Error parsing answers for review {review.id}: {e}")
-            parsed_answers = []
-
-    return RespondentReviewResponse(
-        id=review.id,  # type: ignore
-        goal_id=review.goal_id,  # type: ignore
-        respondent_id=review.respondent_id,  # type: ignore
-        answers=parsed_answers,  # Теперь это List[Answer]
-        comments=review.comments,  # type: ignore
-        created_at=review.created_at,  # type: ignore
-        respondent_name=review.respondent.full_name,  # type: ignore
+    try:
+        parsed_answers = get_respondent_answers(review)
+    except Exception as e:
+        logger.error(f"Error parsing answers for review {review.id}: {e}")
+        parsed_answers = []
+
+    return model_response(
+        RespondentReviewResponse(
+            id=review.id,  # type: ignore
+            goal_id=review.goal_id,  # type: ignore
+            respondent_id=review.respondent_id,  # type: ignore
+            answers=parsed_answers,  # Теперь это List[Answer]
+            comments=review.comments,  # type: ignore
+            created_at=review.created_at,  # type: ignore
+            respondent_name=review.respondent.full_name,  # type: ignore
+        )
     )
 
 
@@ -426,10 +493,23 @@ async def get_respondent_review(
 async def score_manager_questions(
     review_id: str,
     scores: List[Answer],
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Руководитель оценивает вопросы по 10-балльной системе"""
+    return await db.run_sync(
+        lambda session: _score_manager_questions(
+            session, review_id, scores, current_user
+        )
+    )
+
+
+def _score_manager_questions(
+    db: Session,
+    review_id: str,
+    scores: List[Answer],
+    current_user: User,
+):
     if not current_user.is_manager:  # type: ignore
         raise HTTPException(status_code=403, detail="Only managers can score questions")
 
@@ -449,47 +529,27 @@ async def score_manager_questions(
                 detail=f"Score must be between 1 and 10 for question {score_data.question_id}",
             )
 
-    # Обновляем оценки в соответствующих полях
-    answers_data = None  # Инициализируем переменную
-    
-    if review.review_type == ReviewType.SELF and review.self_evaluation_answers:  # type: ignore
-        answers_data = json.loads(review.self_evaluation_answers)  # type: ignore
-        for score_data in scores:
-            for answer in answers_data:
-                if answer.get("question_id") == score_data.question_id:
-                    answer["score"] = score_data.score
-        review.self_evaluation_answers = json.dumps(answers_data, ensure_ascii=False)  # type: ignore
-
-    elif review.review_type == ReviewType.MANAGER and review.manager_evaluation_answers:  # type: ignore
-        answers_data = json.loads(review.manager_evaluation_answers)  # type: ignore
-        for score_data in scores:
-            for answer in answers_data:
-                if answer.get("question_id") == score_data.question_id:
-                    answer["score"] = score_data.score
-        review.manager_evaluation_answers = json.dumps(answers_data, ensure_ascii=False)  # type: ignore
-
-    elif review.review_type == ReviewType.POTENTIAL and review.potential_evaluation_answers:  # type: ignore
-        answers_data = json.loads(review.potential_evaluation_answers)  # type: ignore
-        for score_data in scores:
-            for answer in answers_data:
-                if answer.get("question_id") == score_data.question_id:
-                    answer["score"] = score_data.score
-        review.potential_evaluation_answers = json.dumps(answers_data, ensure_ascii=False)  # type: ignore
-
-    # Проверяем, что answers_data была инициализирована
-    if answers_data is None:
+    # Обновляем баллы только указанных вопросов
+    updated_answers = update_answer_scores(review, scores)
+    if not updated_answers:
         raise HTTPException(
             status_code=400,
             detail=f"No answers found for review type {review.review_type}"
         )
 
     # Пересчитываем общий балл
-    updated_answers = [Answer(**data) for data in answers_data]
-    total_score = review_service.calculate_weighted_score(updated_answers, review.review_type)  # type: ignore
+    try:
+        total_score = review_service.calculate_weighted_score(updated_answers, review.review_type)  # type: ignore
+    except InvalidOptionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     review.calculated_score = total_score  # type: ignore
+    goal_id = review.goal_id
 
     db.commit()
+    GoalAnalyticsSnapshotService(db).refresh_goals([goal_id])  # type: ignore
 
-    return SuccessResponse(
-        message=f"Questions scored successfully. New total score: {total_score:.2f}"
+    return model_response(
+        SuccessResponse(
+            message=f"Questions scored successfully. New total score: {total_score:.2f}"
+        )
     )
\ No newline at end of file
@@ -1,12 +1,13 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.endpoints.auth import get_current_user
+from app.api.endpoints.auth import get_current_user_async
 from app.models.database import User
-from app.models.schemas import UserResponse, SuccessResponse
-from app.database.session import get_db
+from app.models.schemas import OrgMemberResponse, UserResponse, SuccessResponse
+from app.database.session import get_async_db
+from app.services.org_hierarchy import OrgHierarchyService
 from app.services.user_service import UserService
 
 
@@ -30,7 +31,8 @@ router = APIRouter(tags=["users"])
     """,
 )
 async def get_all_managers(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Получить всех руководителей (только для руководителей)"""
     if not current_user.is_manager:  # type: ignore
@@ -38,8 +40,9 @@ async def get_all_managers(
             status_code=403, detail="Only managers can view managers list"
         )
 
-    user_service = UserService(db)
-    managers = user_service.get_all_managers()
+    managers = await db.run_sync(
+        lambda session: UserService(session).get_all_managers()
+    )
     return managers
 
 
@@ -65,15 +68,16 @@ async def get_all_managers(
 async def assign_manager_to_user(
     user_id: str,
     manager_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Назначить руководителя сотруднику (только для руководителей)"""
     if not current_user.is_manager:  # type: ignore
         raise HTTPException(status_code=403, detail="Only managers can assign managers")
 
-    user_service = UserService(db)
-    success = user_service.assign_manager(user_id, manager_id)
+    success = await db.run_sync(
+        lambda session: UserService(session).assign_manager(user_id, manager_id)
+    )
 
     if not success:
         raise HTTPException(status_code=400, detail="Failed to assign manager")
@@ -99,7 +103,8 @@ async def assign_manager_to_user(
     """,
 )
 async def get_my_subordinates(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Получить моих подчиненных (только для руководителей)"""
     if not current_user.is_manager:  # type: ignore
@@ -107,11 +112,53 @@ async def get_my_subordinates(
             status_code=403, detail="Only managers can view subordinates"
         )
 
-    user_service = UserService(db)
-    subordinates = user_service.get_user_subordinates(current_user.id)  # type: ignore
+    subordinates = await db.run_sync(
+        lambda session: UserService(session).get_user_subordinates(
+            current_user.id  # type: ignore
+        )
+    )
     return subordinates
 
 
+@router.get(
+    "/my-org",
+    response_model=List[OrgMemberResponse],
+    summary="Вся оргструктура руководителя",
+    description="""
+    Все подчиненные текущего руководителя на всех уровнях (подчиненные подчиненных и т.д.).
+    
+    **Требования:**
+    - Только пользователи с ролью руководителя (is_manager=True)
+    
+    **Параметры:**
+    - `max_depth`: ограничение уровня подчинения (1 - только прямые подчиненные)
+    
+    **Возвращает:**
+    - Список пользователей с уровнем подчинения `depth`, отсортированный по уровню
+    """,
+)
+async def get_my_org(
+    max_depth: Optional[int] = Query(None, ge=1, description="Максимальный уровень"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Получить всю оргструктуру (только для руководителей)"""
+    if not current_user.is_manager:  # type: ignore
+        raise HTTPException(
+            status_code=403, detail="Only managers can view organisation tree"
+        )
+
+    members = await db.run_sync(
+        lambda session: OrgHierarchyService(session).get_subtree_users(
+            current_user.id, max_depth=max_depth  # type: ignore
+        )
+    )
+    return [
+        OrgMemberResponse(**UserResponse.model_validate(user).model_dump(), depth=depth)
+        for user, depth in members
+    ]
+
+
 @router.get(
     "/{user_id}",
     response_model=UserResponse,
@@ -134,8 +181,8 @@ async def get_my_subordinates(
 )
 async def get_user_by_id(
     user_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Получить информацию о пользователе по ID"""
     if user_id != current_user.id and not current_user.is_manager:  # type: ignore
@@ -143,7 +190,7 @@ async def get_user_by_id(
             status_code=403, detail="Not authorized to view this user's information"
         )
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
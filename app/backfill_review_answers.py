@@ -0,0 +1,38 @@
+"""
+Скрипт переноса ответов из JSON-полей оценок в таблицу review_answers
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.logger import logger
+from app.database.session import SessionLocal, engine
+from app.models.database import ReviewAnswer
+from app.services.review_answers import backfill_review_answers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    # Таблица могла еще не существовать в старой базе
+    ReviewAnswer.__table__.create(bind=engine, checkfirst=True)  # type: ignore
+
+    db = SessionLocal()
+    try:
+        migrated = backfill_review_answers(db, batch_size=args.batch_size)
+        logger.info(f"Перенесено оценок в review_answers: {migrated}")
+    except Exception as e:
+        logger.error(f"Ошибка переноса ответов: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
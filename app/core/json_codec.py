@@ -0,0 +1,149 @@
+"""
+JSON-кодек сервисов и хранилища (ответы, снимки аналитики, детали оценок).
+
+Бэкенд выбирается настройкой JSON_CODEC: orjson, ujson, json или auto
+(первый установленный из orjson, ujson, json). Все бэкенды пишут
+компактный UTF-8 без \\u-экранирования, так что данные, записанные одним,
+читаются любым другим.
+"""
+
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Union
+
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+JSONInput = Union[str, bytes, bytearray]
+
+AUTO_ORDER = ("orjson", "ujson", "json")
+
+
+@dataclass(frozen=True)
+class JSONCodec:
+    name: str
+    dumps: Callable[[Any], str]
+    dumps_bytes: Callable[[Any], bytes]
+    loads: Callable[[JSONInput], Any]
+
+
+def _default(value: Any) -> Any:
+    # То, что orjson сериализует сам: даты и скаляры numpy
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _orjson_codec() -> JSONCodec:
+    import orjson
+
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps_bytes(value: Any) -> bytes:
+        return orjson.dumps(value, option=options)
+
+    return JSONCodec(
+        name="orjson",
+        dumps=lambda value: dumps_bytes(value).decode(),
+        dumps_bytes=dumps_bytes,
+        loads=orjson.loads,
+    )
+
+
+def _ujson_codec() -> JSONCodec:
+    import ujson
+
+    def dumps(value: Any) -> str:
+        return ujson.dumps(
+            value, ensure_ascii=False, escape_forward_slashes=False, default=_default
+        )
+
+    return JSONCodec(
+        name="ujson",
+        dumps=dumps,
+        dumps_bytes=lambda value: dumps(value).encode(),
+        loads=ujson.loads,
+    )
+
+
+def _stdlib_codec() -> JSONCodec:
+    def dumps(value: Any) -> str:
+        return json.dumps(
+            value, ensure_ascii=False, separators=(",", ":"), default=_default
+        )
+
+    return JSONCodec(
+        name="json",
+        dumps=dumps,
+        dumps_bytes=lambda value: dumps(value).encode(),
+        loads=json.loads,
+    )
+
+
+CODEC_FACTORIES: Dict[str, Callable[[], JSONCodec]] = {
+    "orjson": _orjson_codec,
+    "ujson": _ujson_codec,
+    "json": _stdlib_codec,
+}
+
+
+def load_codec(name: str = "auto") -> JSONCodec:
+    """Кодек по имени; auto - самый быстрый из установленных"""
+    if name != "auto":
+        if name not in CODEC_FACTORIES:
+            raise ValueError(f"Unknown JSON codec: {name}")
+        return CODEC_FACTORIES[name]()
+    for candidate in AUTO_ORDER:
+        try:
+            return CODEC_FACTORIES[candidate]()
+        except ImportError:
+            continue
+    raise RuntimeError("No JSON codec available")  # json есть всегда
+
+
+codec = load_codec(settings.JSON_CODEC)
+
+
+def use_codec(name: str) -> JSONCodec:
+    """Переключить кодек (тесты, замеры). Возвращает прежний"""
+    global codec
+    previous, codec = codec, load_codec(name)
+    return previous
+
+
+def dumps(value: Any) -> str:
+    return codec.dumps(value)
+
+
+def dumps_bytes(value: Any) -> bytes:
+    return codec.dumps_bytes(value)
+
+
+def loads(data: JSONInput) -> Any:
+    return codec.loads(data)
+
+
+def default_response_class() -> type:
+    """Класс ответа API по умолчанию: ORJSONResponse, если доступен orjson"""
+    return ORJSONResponse if codec.name == "orjson" else JSONResponse
+
+
+def model_response(model: BaseModel, status_code: int = 200) -> Response:
+    """
+    Ответ из готовой pydantic-модели: сериализуется сразу в JSON,
+    без повторной валидации по response_model и jsonable_encoder.
+
+    Параметры сериализации - как у FastAPI по умолчанию (by_alias, поля
+    со значением None не исключаются); модель должна быть того же класса,
+    что response_model маршрута.
+    """
+    return Response(
+        content=model.model_dump_json(by_alias=True).encode(),
+        status_code=status_code,
+        media_type="application/json",
+    )
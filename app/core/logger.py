@@ -1,34 +1,227 @@
+"""
+Централизованное логирование.
+
+Записи из потоков приложения и event loop только кладутся в ограниченную
+очередь (QueueHandler); вывод в консоль и ротируемый файл выполняет
+QueueListener в отдельном потоке. Частые INFO/DEBUG одного места вызова
+прореживаются, при переполнении очереди записи отбрасываются со счетчиком.
+
+Настройки читаются из окружения напрямую (app.core.config сам логирует
+при импорте):
+    LOG_LEVEL                      уровень корневого логгера (INFO)
+    LOG_LEVELS                     уровни отдельных логгеров:
+                                   "performance_review=DEBUG,uvicorn.access=WARNING"
+    LOG_JSON                       JSON и в консоль (в файл - всегда JSON)
+    LOG_FORMAT                     формат текстового вывода в консоль
+    LOG_DIR                        каталог файла логов (logs, пусто - без файла)
+    LOG_QUEUE_SIZE                 размер очереди записей (10000)
+    LOG_RATE_LIMIT                 записей INFO/DEBUG с одного места за окно (50, 0 - выкл.)
+    LOG_RATE_LIMIT_WINDOW_SECONDS  окно прореживания (10)
+"""
+
+import atexit
+import json
+import logging
 import os
+import queue
+import re
 import sys
-import logging
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional, Tuple
 
-from logging.handlers import RotatingFileHandler
+from dotenv import load_dotenv
 
+DEFAULT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
-def setup_logger():
-    """Настройка централизованного логгера"""
-    logger = logging.getLogger("performance_review")
-    logger.setLevel(logging.INFO)
+# Атрибуты LogRecord, которые не относятся к полям extra
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+# Логгеры uvicorn пишут в stdout синхронно - переводим их на общую очередь
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+# Параметры URL с секретами (SSE передает JWT в ?token=, EventSource
+# не умеет заголовки) - в журнал доступа попадают замаскированными
+REDACTED_QUERY_PARAMS = ("token", "access_token")
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_number(name: str, default, cast=int):
+    try:
+        return cast(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def parse_logger_levels(value: str) -> Dict[str, int]:
+    """Разобрать "logger=LEVEL,..." в {имя логгера: уровень}"""
+    levels = {}
+    for item in value.split(","):
+        name, _, level = item.partition("=")
+        name, level = name.strip(), level.strip().upper()
+        if not name or not level:
+            continue
+        if not isinstance(logging.getLevelName(level), int):
+            raise ValueError(f"Unknown log level {level!r} for logger {name!r}")
+        levels[name] = logging.getLevelName(level)
+    return levels
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись - одна строка JSON; поля extra попадают в объект"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key not in payload:
+                payload[key] = value
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Не больше limit записей ниже WARNING с одного места вызова за окно.
+
+    Первая запись следующего окна сообщает, сколько записей было пропущено.
+    Предупреждения и ошибки проходят всегда.
+    """
+
+    def __init__(self, limit: int, window_seconds: float):
+        super().__init__()
+        self.limit = limit
+        self.window_seconds = window_seconds
+        # место вызова -> [начало окна, записей в окне, пропущено]
+        self._windows: Dict[Tuple[str, str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.limit <= 0 or record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.window_seconds:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if window[1] < self.limit:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+class RedactQueryParamsFilter(logging.Filter):
+    """Маскирует значения секретных параметров URL в аргументах записи"""
+
+    def __init__(self, params=REDACTED_QUERY_PARAMS):
+        super().__init__()
+        names = "|".join(re.escape(param) for param in params)
+        self._pattern = re.compile(rf"([?&](?:{names})=)[^&\s\"]*")
+
+    def redact(self, value):
+        if isinstance(value, str):
+            return self._pattern.sub(r"\1***", value)
+        return value
 
-    # Очищаем существующие handlers (на случай переинициализации)
-    logger.handlers.clear()
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.args, tuple):
+            record.args = tuple(self.redact(arg) for arg in record.args)
+        record.msg = self.redact(record.msg)
+        return True
 
-    # Форматтер
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
+
+_access_log_filter = RedactQueryParamsFilter()
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler, который не блокирует и не падает на полной очереди"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Сообщение и traceback форматируются здесь, пока доступны args и
+        # exc_info; раскладку по полям делают форматтеры слушателя
+        record = logging.makeLogRecord(vars(record))
+        record.message = record.getMessage()
+        if getattr(record, "suppressed", 0):
+            record.message += f" (similar records suppressed: {record.suppressed})"
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.stack_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.dropped:
+            # Очередь освободилась - сообщаем, сколько записей потеряно
+            warning = logging.makeLogRecord(
+                {
+                    "name": "performance_review.logging",
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": f"Dropped {self.dropped} log records: queue is full",
+                }
+            )
+            try:
+                self.queue.put_nowait(warning)
+                self.dropped = 0
+            except queue.Full:
+                pass
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[DroppingQueueHandler] = None
+
+
+def _build_handlers() -> list:
+    text_formatter = logging.Formatter(
+        os.getenv("LOG_FORMAT", DEFAULT_FORMAT), datefmt="%Y-%m-%d %H:%M:%S"
     )
+    json_formatter = JsonFormatter()
 
     # Консольный handler - ВСЕГДА РАБОТАЕТ
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    console_handler.setFormatter(
+        json_formatter if _env_bool("LOG_JSON", False) else text_formatter
+    )
+    handlers = [console_handler]
 
-    # File handler (ротация логов)
-    log_dir = "logs"
+    # File handler (ротация логов); пустой LOG_DIR - только консоль
+    log_dir = os.getenv("LOG_DIR", "logs")
+    if not log_dir:
+        return handlers
     log_file = os.path.join(log_dir, "performance_review.log")
-
     try:
         # Создаем директорию если не существует
         if not os.path.exists(log_dir):
@@ -38,19 +231,70 @@ def setup_logger():
         file_handler = RotatingFileHandler(
             log_file, maxBytes=10 * 1024 * 1024, backupCount=5, encoding="utf-8"  # 10MB
         )
-        file_handler.setLevel(logging.DEBUG)  # В файл пишем больше информации
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        file_handler.setFormatter(json_formatter)
+        handlers.append(file_handler)
+    except Exception as e:
+        print(f"Не удалось создать файловый handler: {e}", file=sys.stderr)
+    return handlers
 
-        logger.info("Файловый handler для логов успешно создан: %s", log_file)
 
-    except Exception as e:
-        logger.warning("Не удалось создать файловый handler: %s", e)
-        logger.info("Логи будут выводиться только в консоль")
+def shutdown_logging() -> None:
+    """Дописать записи из очереди и остановить поток вывода"""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
 
-    logger.info("Логгер инициализирован. Вывод в консоль и файл %s", log_file)
+
+def setup_logger():
+    """Настройка централизованного логгера"""
+    global _listener, _queue_handler
+
+    # Повторная инициализация заменяет прежний конвейер
+    shutdown_logging()
+    load_dotenv()
+
+    log_queue: queue.Queue = queue.Queue(_env_number("LOG_QUEUE_SIZE", 10000))
+    _queue_handler = DroppingQueueHandler(log_queue)
+    _queue_handler.addFilter(
+        RateLimitFilter(
+            limit=_env_number("LOG_RATE_LIMIT", 50),
+            window_seconds=_env_number("LOG_RATE_LIMIT_WINDOW_SECONDS", 10.0, float),
+        )
+    )
+    _listener = QueueListener(log_queue, *_build_handlers())
+    _listener.start()
+
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+    # Фильтр логгера, а не handler: запись маскируется до постановки в очередь
+    logging.getLogger("uvicorn.access").addFilter(_access_log_filter)
+
+    logger = logging.getLogger("performance_review")
+    try:
+        levels = parse_logger_levels(os.getenv("LOG_LEVELS", ""))
+    except ValueError as e:
+        levels = {}
+        logger.warning(f"Ignoring LOG_LEVELS: {e}")
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+
+    logger.info("Логгер инициализирован")
     return logger
 
 
+atexit.register(shutdown_logging)
+
 # Создаем глобальный логгер
 logger = setup_logger()
@@ -0,0 +1,303 @@
+"""
+Метрики приложения в текстовом формате Prometheus.
+
+Собственный реестр без внешних зависимостей: счетчики, gauge и гистограммы
+с метками. Значения хранятся в памяти процесса - при нескольких воркерах
+каждый отдает свои метрики, агрегирует их Prometheus.
+"""
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Границы гистограмм длительности, секунды
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric(ABC):
+    """Семейство метрик с одинаковым именем и набором меток"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.label_names):
+            raise ValueError(
+                f"Metric {self.name} expects labels {self.label_names}, "
+                f"got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    @abstractmethod
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        """(суффикс имени, метки, значение)"""
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, name, documentation, labels=()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counter can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield "", _format_labels(self.label_names, key), value
+
+
+class Gauge(Metric):
+    type_name = "gauge"
+
+    def __init__(self, name, documentation, labels=()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield "", _format_labels(self.label_names, key), value
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # метки -> [счетчики по границам (без накопления)..., сумма, количество]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        # Первая граница >= value; за последней - корзина +Inf
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 3)
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Замерить длительность блока"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def timed(self, **labels: str) -> Callable:
+        """Декоратор: длительность каждого вызова функции"""
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(**labels):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def count(self, **labels: str) -> float:
+        state = self._values.get(self._key(labels))
+        return state[-1] if state else 0.0
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        names = self.label_names + ("le",)
+        for key, state in items:
+            cumulative = 0.0
+            for bound, observed in zip(bounds, state):
+                cumulative += observed
+                yield "_bucket", _format_labels(names, key + (bound,)), cumulative
+            labels = _format_labels(self.label_names, key)
+            yield "_sum", labels, state[-2]
+            yield "_count", labels, state[-1]
+
+
+class MetricsRegistry:
+    """Набор метрик и функций, обновляющих значения перед выгрузкой"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels=()) -> Counter:
+        return self.register(Counter(name, documentation, labels))  # type: ignore
+
+    def gauge(self, name: str, documentation: str, labels=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labels))  # type: ignore
+
+    def histogram(
+        self, name: str, documentation: str, labels=(), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        histogram = Histogram(name, documentation, labels, buckets)
+        return self.register(histogram)  # type: ignore
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Функция, вызываемая при каждой выгрузке (например, снять gauge пула)"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in list(self._collectors):
+            collector()
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# HTTP (заполняет MetricsMiddleware)
+http_requests_total = registry.counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code",
+    ("method", "route", "status"),
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route"),
+)
+http_requests_in_progress = registry.gauge(
+    "http_requests_in_progress",
+    "HTTP requests being processed by route template",
+    ("method", "route"),
+)
+
+# Пул соединений БД
+db_pool_connections = registry.gauge(
+    "db_pool_connections",
+    "Database pool connections by state",
+    ("engine", "state"),
+)
+db_pool_checkouts_total = registry.counter(
+    "db_pool_checkouts_total", "Connections checked out from the pool", ("engine",)
+)
+
+# Фоновая работа
+email_send_duration_seconds = registry.histogram(
+    "email_send_duration_seconds",
+    "Time to send one email over SMTP",
+    ("transport", "outcome"),
+)
+scoring_duration_seconds = registry.histogram(
+    "scoring_duration_seconds",
+    "Review scoring computation time",
+    ("operation",),
+)
+analytics_duration_seconds = registry.histogram(
+    "analytics_duration_seconds",
+    "Analytics computation time",
+    ("operation",),
+)
+
+
+def instrument_pool(engine, name: str) -> None:
+    """Счетчик выдачи соединений и gauge состояния пула engine"""
+    from sqlalchemy import event
+
+    event.listen(
+        engine, "checkout", lambda *args: db_pool_checkouts_total.inc(engine=name)
+    )
+
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        # NullPool/StaticPool не ведут учет соединений
+        return
+
+    def collect() -> None:
+        db_pool_connections.set(pool.size(), engine=name, state="size")
+        db_pool_connections.set(pool.checkedout(), engine=name, state="checked_out")
+        db_pool_connections.set(pool.checkedin(), engine=name, state="idle")
+        # overflow() отрицателен, пока пул не заполнен до size
+        db_pool_connections.set(max(pool.overflow(), 0), engine=name, state="overflow")
+
+    registry.add_collector(collect)
@@ -0,0 +1,97 @@
+import time
+
+from starlette.routing import Match
+
+from app.core.config import settings
+from app.core.metrics import (
+    http_request_duration_seconds,
+    http_requests_in_progress,
+    http_requests_total,
+)
+from app.database.query_stats import track_queries
+
+# Метка для путей без маршрута (404) - не плодим серии на каждый URL
+UNMATCHED_ROUTE = "unmatched"
+
+
+class QueryStatsMiddleware:
+    """
+    Считает SQL-запросы и время БД каждого HTTP-запроса.
+
+    В режиме DEBUG добавляет заголовки X-DB-Queries и X-DB-Time-ms.
+    Повторы одного запроса сверх DB_N_PLUS_ONE_THRESHOLD пишутся в лог.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        label = f"{scope['method']} {scope['path']}"
+        with track_queries(label) as stats:
+
+            async def send_with_stats(message):
+                if message["type"] == "http.response.start" and settings.DEBUG:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-db-queries", str(stats.count).encode()))
+                    headers.append(
+                        (b"x-db-time-ms", f"{stats.duration_ms:.2f}".encode())
+                    )
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
+
+
+def route_template(scope) -> str:
+    """Шаблон маршрута запроса (/api/v1/goals/{goal_id}), а не конкретный путь"""
+    app = scope.get("app")
+    if app is None:
+        return UNMATCHED_ROUTE
+    partial = None
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path_format", UNMATCHED_ROUTE)
+        if match == Match.PARTIAL and partial is None:
+            partial = getattr(route, "path_format", None)
+    # PARTIAL - путь есть, метод не тот (405)
+    return partial or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Метрики HTTP-запросов по шаблону маршрута: число запросов по статусам,
+    гистограмма длительности и число запросов в обработке.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        labels = {"method": scope["method"], "route": route_template(scope)}
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc(**labels)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_request_duration_seconds.observe(
+                time.perf_counter() - started, **labels
+            )
+            http_requests_in_progress.dec(**labels)
+            http_requests_total.inc(status=str(status), **labels)
@@ -0,0 +1,90 @@
+import base64
+import json
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+DEFAULT_PAGE_SIZE = 50
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # В БД created_at хранится без часового пояса (UTC)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def encode_cursor(created_at: datetime, item_id: str) -> str:
+    """Непрозрачный курсор на позицию (created_at, id)"""
+    raw = json.dumps([_naive_utc(created_at).isoformat(), item_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Разобрать курсор; некорректный курсор - 400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded))
+        return _naive_utc(datetime.fromisoformat(created_at)), str(item_id)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def keyset_paginate(
+    query: Query,
+    model,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    descending: bool = False,
+) -> Tuple[List, Optional[str]]:
+    """
+    Страница запроса по ключу (created_at, id) без OFFSET.
+
+    Возвращает элементы страницы и курсор следующей (None - страниц больше нет).
+    Для быстрой выборки нужен составной индекс, заканчивающийся на
+    (created_at, id).
+    """
+    created_at, item_id = model.created_at, model.id
+    limit = limit or DEFAULT_PAGE_SIZE
+
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        if descending:
+            query = query.filter(
+                or_(
+                    created_at < cursor_created_at,
+                    and_(created_at == cursor_created_at, item_id < cursor_id),
+                )
+            )
+        else:
+            query = query.filter(
+                or_(
+                    created_at > cursor_created_at,
+                    and_(created_at == cursor_created_at, item_id > cursor_id),
+                )
+            )
+
+    if descending:
+        query = query.order_by(created_at.desc(), item_id.desc())
+    else:
+        query = query.order_by(created_at, item_id)
+
+    # Лишняя строка показывает, есть ли следующая страница
+    items = query.limit(limit + 1).all()
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    last = items[-1]
+    return items, encode_cursor(last.created_at, last.id)
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """Передать курсор следующей страницы в заголовке (тело ответа не меняется)"""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -1,15 +1,26 @@
-from typing import Optional
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
 
 from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException, status
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Результаты проверки подписи токенов: {token: user_id}
+token_cache = TTLCache(
+    max_size=settings.AUTH_CACHE_MAX_SIZE,
+    ttl_seconds=settings.AUTH_TOKEN_CACHE_TTL_SECONDS,
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -19,6 +30,84 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """
+    Ограниченный пул потоков для bcrypt.
+
+    Хеширование занимает сотни миллисекунд CPU и не должно выполняться
+    в event loop. Если в очереди уже max_pending задач, новые запросы
+    сразу получают 503, а не копятся в памяти.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="password-hash"
+                )
+            return self._executor
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Authentication service is busy, try again later",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Слот освобождается, когда поток закончил работу, а не когда
+        # запрос перестал ждать: отмененный запрос не уменьшает очередь,
+        # пока bcrypt еще занимает поток
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future: Optional[Future] = None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password вне event loop"""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash вне event loop"""
+    return await password_hasher.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -40,6 +129,10 @@ def verify_token(token: str):
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    cached_user_id = token_cache.get(token)
+    if cached_user_id is not None:
+        return cached_user_id
+
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -47,6 +140,11 @@ def verify_token(token: str):
         user_id: str = payload.get("sub")  # type: ignore
         if user_id is None:
             raise credentials_exception
-        return user_id
     except JWTError:
         raise credentials_exception
+
+    # Кэшируем не дольше, чем токен остается действительным
+    exp = payload.get("exp")
+    ttl = exp - time.time() if isinstance(exp, (int, float)) else None
+    token_cache.set(token, user_id, ttl=ttl)
+    return user_id
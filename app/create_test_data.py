@@ -14,6 +14,7 @@ from app.core.logger import logger
 from app.core.security import get_password_hash
 from app.database.session import SessionLocal
 from app.models.database import User, Goal
+from app.services.user_service import UserService
 
 
 def create_test_data():
@@ -73,9 +74,9 @@ def create_test_data():
         db.refresh(employee2)
 
         # Устанавливаем руководителей
-        employee1.manager_id = manager1.id
-        employee2.manager_id = manager2.id
-        db.commit()
+        user_service = UserService(db)
+        user_service.assign_manager(employee1.id, manager1.id)  # type: ignore
+        user_service.assign_manager(employee2.id, manager2.id)  # type: ignore
 
         logger.info(
             f"Создано пользователей: 2 руководителя, 2 сотрудника, 1 респондент"
@@ -0,0 +1,119 @@
+"""
+Счетчик SQL-запросов и времени БД в рамках одного HTTP-запроса.
+
+Слушатели курсора вешаются на engine в app/database/session.py и пишут
+в QueryStats из contextvar, который выставляет QueryStatsMiddleware.
+Вне запроса (скрипты, фоновые задачи) запросы не учитываются.
+"""
+
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.logger import logger
+
+# Плейсхолдер параметра: ?, %(name)s, %s, $1, :name
+_PARAM = r"(?:\?|%\(\w+\)s|%s|\$\d+|:\w+)"
+_PARAM_LIST_RE = re.compile(rf"\(\s*{_PARAM}(?:\s*,\s*{_PARAM})*\s*\)")
+_REPEATED_GROUPS_RE = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_STARTED_AT_KEY = "query_stats_started_at"
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    Форма запроса без конкретных параметров.
+
+    Списки IN (...) и многострочные VALUES схлопываются, чтобы выборки
+    по разному числу ID считались одним и тем же запросом.
+    """
+    shape = _WHITESPACE_RE.sub(" ", statement).strip()
+    shape = _PARAM_LIST_RE.sub("(?)", shape)
+    return _REPEATED_GROUPS_RE.sub("(?)", shape)
+
+
+class QueryStats:
+    """Статистика SQL-запросов одного HTTP-запроса"""
+
+    def __init__(self, label: str = "", n_plus_one_threshold: Optional[int] = None):
+        self.label = label
+        self.count = 0
+        self.duration_ms = 0.0
+        self.shapes: Counter = Counter()
+        self.n_plus_one_threshold = (
+            n_plus_one_threshold
+            if n_plus_one_threshold is not None
+            else settings.DB_N_PLUS_ONE_THRESHOLD
+        )
+        self._reported: Set[str] = set()
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        shape = normalize_statement(statement)
+        self.count += 1
+        self.duration_ms += duration_ms
+        self.shapes[shape] += 1
+
+        threshold = self.n_plus_one_threshold
+        if (
+            threshold > 0
+            and self.shapes[shape] > threshold
+            and shape not in self._reported
+        ):
+            # Предупреждаем один раз на форму запроса
+            self._reported.add(shape)
+            logger.warning(
+                f"Possible N+1 in {self.label or 'request'}: statement repeated "
+                f"more than {threshold} times: {shape[:300]}"
+            )
+
+    def repeated(self, threshold: Optional[int] = None) -> Dict[str, int]:
+        """Формы запросов, выполненные больше threshold раз"""
+        limit = self.n_plus_one_threshold if threshold is None else threshold
+        return {shape: count for shape, count in self.shapes.items() if count > limit}
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None
+)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries(label: str = "") -> Iterator[QueryStats]:
+    """Учитывать SQL-запросы текущего контекста (и порожденных им потоков)"""
+    stats = QueryStats(label)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current_stats.get() is not None:
+        setattr(context, _STARTED_AT_KEY, time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    started_at = getattr(context, _STARTED_AT_KEY, None)
+    if stats is not None and started_at is not None:
+        stats.record(statement, (time.perf_counter() - started_at) * 1000)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Подключить учет запросов к engine (для async - к engine.sync_engine)"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -1,16 +1,81 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
+from app.core.metrics import instrument_pool
+from app.database.query_stats import instrument_engine
 
 
 engine = create_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+# Асинхронные драйверы для синхронных строк подключения
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    """Преобразовать строку подключения к асинхронному драйверу"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database '{backend}'")
+
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(
+        hide_password=False
+    )
+
+
+def create_async_db_engine(database_url: str):
+    """Асинхронный engine (asyncpg для PostgreSQL, aiosqlite для локальной SQLite)"""
+    engine_kwargs = {}
+    if make_url(database_url).get_backend_name() == "sqlite":
+        # Соединения aiosqlite привязаны к event loop - не держим их в пуле
+        engine_kwargs["poolclass"] = NullPool
+
+    return create_async_engine(database_url, **engine_kwargs)
+
+
+async_engine = create_async_db_engine(
+    settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+# Учет SQL-запросов на HTTP-запрос (см. QueryStatsMiddleware)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+# Состояние пулов соединений для /metrics
+instrument_pool(engine, "sync")
+instrument_pool(async_engine.sync_engine, "async")
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Асинхронная сессия для эндпоинтов.
+
+    Синхронные сервисы вызываются через `await db.run_sync(...)`: SQLAlchemy
+    выполняет их в greenlet, и ожидание БД не блокирует event loop.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,31 +1,69 @@
+import asyncio
 import logging
 
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 
 from app.core.config import settings
-from app.database.session import engine
+from app.core import json_codec, metrics
+from app.core.middleware import MetricsMiddleware, QueryStatsMiddleware
+from app.core.security import password_hasher
+from app.database.session import async_engine, engine
+from app.migrations.runner import pending_migrations, run_migrations
 from app.models.database import Base
-from app.admin.admin import admin
+from app.admin.lazy import mount_admin
+from app.services.notification_service import run_unread_counter_reconciliation
 
-logging.basicConfig(
-    level=logging.DEBUG,  # Показывать всё, включая debug
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+# Вывод настраивает app.core.logger: записи идут через очередь в отдельный поток
 logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    try:
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully")
-    except Exception as e:
-        logger.error(f"Database initialization failed: {e}")
+    if settings.is_production:
+        # Схему готовит шаг деплоя (python app/migrate.py), а не каждый воркер
+        try:
+            pending = pending_migrations(engine)
+            if pending:
+                logger.warning(
+                    "Pending migrations: "
+                    + ", ".join(migration.version for migration in pending)
+                )
+        except Exception as e:
+            logger.error(f"Migration status check failed: {e}")
+    else:
+        try:
+            Base.metadata.create_all(bind=engine)
+            logger.info("Database tables created successfully")
+            # Индексы существующих таблиц, которые create_all пропускает
+            run_migrations(engine)
+        except Exception as e:
+            logger.error(f"Database initialization failed: {e}")
+
+    background_tasks = []
+
+    # Фоновая отправка писем из email_outbox
+    if settings.EMAIL_DISPATCHER_ENABLED:
+        from app.services.email_dispatcher import EmailDispatcher
+
+        background_tasks.append(asyncio.create_task(EmailDispatcher().run_forever()))
+
+    # Периодическая сверка счетчиков непрочитанных уведомлений
+    if settings.NOTIFICATION_COUNTER_RECONCILE_SECONDS > 0:
+        background_tasks.append(
+            asyncio.create_task(run_unread_counter_reconciliation())
+        )
+
     yield
     # Shutdown
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    password_hasher.shutdown()
+    await async_engine.dispose()
 
 
 app = FastAPI(
@@ -57,8 +95,15 @@ app = FastAPI(
         "url": "https://opensource.org/licenses/MIT",
     },
     lifespan=lifespan,
+    # orjson сериализует большие ответы (аналитика, списки целей) в разы быстрее
+    default_response_class=json_codec.default_response_class(),
 )
 
+app.add_middleware(QueryStatsMiddleware)
+if settings.METRICS_ENABLED:
+    # Добавлен последним - внешний слой, замеряет запрос целиком
+    app.add_middleware(MetricsMiddleware)
+
 # Подключаем роутеры
 from app.api.endpoints import (
     auth,
@@ -86,9 +131,20 @@ app.include_router(
     tags=["question-templates"],
 )
 
-admin.mount_to(app)
+# В production админка собирается при первом запросе к /admin
+mount_admin(app, lazy=settings.is_production)
 
 
 @app.get("/")
 async def root():
     return {"message": "Performance Review System API"}
+
+
+if settings.METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        """Метрики в текстовом формате Prometheus"""
+        return PlainTextResponse(
+            metrics.registry.render(), media_type=metrics.CONTENT_TYPE
+        )
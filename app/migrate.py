@@ -0,0 +1,41 @@
+"""
+Скрипт применения миграций схемы (app/migrations/versions)
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.logger import logger
+from app.database.session import engine
+from app.migrations.runner import pending_migrations, run_migrations
+from app.models.database import Base
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--status", action="store_true", help="Показать непримененные миграции"
+    )
+    parser.add_argument("--target", help="Применить миграции до этой версии")
+    args = parser.parse_args()
+
+    if args.status:
+        for migration in pending_migrations(engine):
+            print(f"{migration.version}  {migration.description}")
+        return
+
+    try:
+        # Миграции меняют существующие таблицы; новые создает create_all
+        Base.metadata.create_all(bind=engine)
+        applied = run_migrations(engine, target=args.target)
+        logger.info(f"Применено миграций: {len(applied)} {applied}")
+    except Exception as e:
+        logger.error(f"Ошибка применения миграций: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
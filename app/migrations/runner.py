@@ -0,0 +1,200 @@
+import importlib
+import pkgutil
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import ModuleType
+from typing import Callable, List, Optional, Sequence
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    MetaData,
+    String,
+    Table,
+    insert,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.logger import logger
+from app.migrations import versions
+
+# Ключ advisory lock PostgreSQL: миграции применяет один процесс
+MIGRATION_LOCK_KEY = 7_342_001
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", String, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+class MigrationError(RuntimeError):
+    """Миграцию нельзя применить без вмешательства"""
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: str
+    description: str
+    upgrade: Callable[["Operations"], None]
+
+
+class Operations:
+    """
+    Операции со схемой, доступные миграциям.
+
+    Индексы создаются идемпотентно (IF NOT EXISTS), на PostgreSQL -
+    CONCURRENTLY, без блокировки записи в таблицу.
+    """
+
+    def __init__(self, connection: Connection):
+        self.connection = connection
+        self.dialect = connection.dialect.name
+
+    @property
+    def is_postgresql(self) -> bool:
+        return self.dialect == "postgresql"
+
+    def execute(self, sql: str, **params) -> None:
+        self.connection.execute(text(sql), params)
+
+    def create_index(
+        self, name: str, table: str, columns: Sequence[str], unique: bool = False
+    ) -> None:
+        if unique:
+            self._check_duplicates(name, table, columns)
+
+        concurrently = ""
+        if self.is_postgresql:
+            concurrently = "CONCURRENTLY "
+            self._drop_invalid_index(name)
+
+        self.execute(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX {concurrently}"
+            f"IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+        )
+
+    def _check_duplicates(self, name: str, table: str, columns: Sequence[str]) -> None:
+        column_list = ", ".join(columns)
+        duplicates = self.connection.execute(
+            text(
+                f"SELECT {column_list}, COUNT(*) FROM {table} "
+                f"GROUP BY {column_list} HAVING COUNT(*) > 1 LIMIT 5"
+            )
+        ).all()
+        if duplicates:
+            raise MigrationError(
+                f"Cannot create unique index {name}: duplicate rows in {table} "
+                f"({column_list}), e.g. {[tuple(row) for row in duplicates]}"
+            )
+
+    def _drop_invalid_index(self, name: str) -> None:
+        # Прерванный CREATE INDEX CONCURRENTLY оставляет невалидный индекс,
+        # который IF NOT EXISTS принял бы за готовый
+        invalid = self.connection.execute(
+            text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ),
+            {"name": name},
+        ).first()
+        if invalid:
+            logger.warning(f"Dropping invalid index {name} left by a failed build")
+            self.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def _load_module(module: ModuleType) -> Migration:
+    # Версия - префикс имени файла: 0002_hot_path_indexes.py -> "0002"
+    version = module.__name__.rsplit(".", 1)[-1].partition("_")[0]
+    return Migration(
+        version=version,
+        description=(module.__doc__ or "").strip().splitlines()[0],
+        upgrade=module.upgrade,
+    )
+
+
+def load_migrations() -> List[Migration]:
+    """Миграции из app/migrations/versions по возрастанию версии"""
+    migrations = [
+        _load_module(importlib.import_module(f"{versions.__name__}.{info.name}"))
+        for info in pkgutil.iter_modules(versions.__path__)
+    ]
+    migrations.sort(key=lambda migration: migration.version)
+
+    seen = set()
+    for migration in migrations:
+        if migration.version in seen:
+            raise MigrationError(f"Duplicate migration version {migration.version}")
+        seen.add(migration.version)
+    return migrations
+
+
+def _applied_versions(connection: Connection) -> set:
+    schema_migrations.create(connection, checkfirst=True)
+    return set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+
+def pending_migrations(engine: Engine) -> List[Migration]:
+    """Еще не примененные миграции"""
+    with engine.connect() as connection:
+        applied = _applied_versions(connection)
+        connection.commit()
+    return [m for m in load_migrations() if m.version not in applied]
+
+
+def run_migrations(engine: Engine, target: Optional[str] = None) -> List[str]:
+    """
+    Применить непримененные миграции (до версии target включительно).
+
+    Каждая миграция записывается в schema_migrations после успешного
+    выполнения. Возвращает версии примененных миграций.
+    """
+    with engine.connect() as connection:
+        is_postgresql = connection.dialect.name == "postgresql"
+        if is_postgresql:
+            # CREATE INDEX CONCURRENTLY нельзя выполнить внутри транзакции
+            connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+            connection.execute(
+                text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY}
+            )
+        try:
+            return _apply(connection, target)
+        finally:
+            if is_postgresql:
+                connection.execute(
+                    text("SELECT pg_advisory_unlock(:key)"),
+                    {"key": MIGRATION_LOCK_KEY},
+                )
+
+
+def _apply(connection: Connection, target: Optional[str]) -> List[str]:
+    applied = _applied_versions(connection)
+    connection.commit()
+
+    done = []
+    for migration in load_migrations():
+        if target is not None and migration.version > target:
+            break
+        if migration.version in applied:
+            continue
+
+        logger.info(f"Applying migration {migration.version}: {migration.description}")
+        try:
+            migration.upgrade(Operations(connection))
+            connection.execute(
+                insert(schema_migrations).values(
+                    version=migration.version,
+                    description=migration.description,
+                    applied_at=datetime.now(timezone.utc),
+                )
+            )
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        done.append(migration.version)
+    return done
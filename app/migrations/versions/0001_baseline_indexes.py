@@ -0,0 +1,40 @@
+"""Индексы моделей, созданные до появления миграций"""
+
+INDEXES = [
+    ("ix_org_hierarchy_ancestor_depth", "org_hierarchy", ["ancestor_id", "depth"]),
+    ("ix_org_hierarchy_descendant", "org_hierarchy", ["descendant_id"]),
+    ("ix_goals_employee_created", "goals", ["employee_id", "created_at", "id"]),
+    ("ix_reviews_type_created", "reviews", ["review_type", "created_at"]),
+    ("ix_review_answers_review_id", "review_answers", ["review_id"]),
+    (
+        "ix_review_answers_respondent_review_id",
+        "review_answers",
+        ["respondent_review_id"],
+    ),
+    ("ix_review_answers_goal_id", "review_answers", ["goal_id"]),
+    (
+        "ix_review_answers_question_type",
+        "review_answers",
+        ["question_id", "review_type"],
+    ),
+    (
+        "ix_notifications_user_created",
+        "notifications",
+        ["user_id", "created_at", "id"],
+    ),
+    (
+        "ix_question_templates_active_created",
+        "question_templates",
+        ["is_active", "created_at", "id"],
+    ),
+    (
+        "ix_email_outbox_status_next_attempt",
+        "email_outbox",
+        ["status", "next_attempt_at"],
+    ),
+]
+
+
+def upgrade(op):
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
@@ -0,0 +1,38 @@
+"""Составные индексы и уникальность для горячих фильтров"""
+
+INDEXES = [
+    # Проверка существующей оценки при создании и выборки оценок цели
+    (
+        "uq_reviews_goal_reviewer_type",
+        "reviews",
+        ["goal_id", "reviewer_id", "review_type"],
+        True,
+    ),
+    (
+        "uq_respondent_reviews_goal_respondent",
+        "respondent_reviews",
+        ["goal_id", "respondent_id"],
+        True,
+    ),
+    ("uq_goal_respondents_goal_user", "goal_respondents", ["goal_id", "user_id"], True),
+    # Непрочитанные уведомления пользователя и "прочитать все"
+    (
+        "ix_notifications_user_read_created",
+        "notifications",
+        ["user_id", "is_read", "created_at"],
+        False,
+    ),
+    ("ix_goal_steps_goal_order", "goal_steps", ["goal_id", "order_index"], False),
+    (
+        "ix_question_templates_type_section",
+        "question_templates",
+        ["question_type", "section", "is_active", "order_index"],
+        False,
+    ),
+]
+
+
+def upgrade(op):
+    # goals(employee_id) уже покрыт ix_goals_employee_created
+    for name, table, columns, unique in INDEXES:
+        op.create_index(name, table, columns, unique=unique)
@@ -5,6 +5,7 @@ from sqlalchemy import (
     Boolean,
     Column,
     DateTime,
+    Index,
     Integer,
     ForeignKey,
     Float,
@@ -29,6 +30,7 @@ goal_respondents = Table(
     Base.metadata,
     Column("goal_id", String, ForeignKey("goals.id")),
     Column("user_id", String, ForeignKey("users.id")),
+    Index("uq_goal_respondents_goal_user", "goal_id", "user_id", unique=True),
 )
 
 
@@ -59,6 +61,24 @@ class User(Base):
     manager = relationship("User", remote_side=[id], backref="subordinates")
 
 
+class OrgHierarchy(Base):
+    """
+    Замыкание оргструктуры: строка на каждую пару (руководитель любого
+    уровня, подчиненный), включая пару пользователя с самим собой (depth=0)
+    """
+
+    __tablename__ = "org_hierarchy"
+
+    ancestor_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    descendant_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_org_hierarchy_ancestor_depth", "ancestor_id", "depth"),
+        Index("ix_org_hierarchy_descendant", "descendant_id"),
+    )
+
+
 class GoalStep(Base):
     """Подпункты/шаги для достижения цели"""
 
@@ -75,6 +95,8 @@ class GoalStep(Base):
     # Relationships
     goal = relationship("Goal", back_populates="steps")
 
+    __table_args__ = (Index("ix_goal_steps_goal_order", "goal_id", "order_index"),)
+
 
 class Goal(Base):
     __tablename__ = "goals"
@@ -98,6 +120,10 @@ class Goal(Base):
         "GoalStep", back_populates="goal", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        Index("ix_goals_employee_created", "employee_id", "created_at", "id"),
+    )
+
 
 class Review(Base):
     __tablename__ = "reviews"
@@ -134,6 +160,23 @@ class Review(Base):
     reviewer = relationship(
         "User", back_populates="reviews_created", foreign_keys=[reviewer_id]
     )
+    answer_rows = relationship(
+        "ReviewAnswer",
+        back_populates="review",
+        order_by="ReviewAnswer.position",
+        cascade="all, delete-orphan",
+    )
+
+    __table_args__ = (
+        Index("ix_reviews_type_created", "review_type", "created_at"),
+        Index(
+            "uq_reviews_goal_reviewer_type",
+            "goal_id",
+            "reviewer_id",
+            "review_type",
+            unique=True,
+        ),
+    )
 
 
 class RespondentReview(Base):
@@ -149,6 +192,51 @@ class RespondentReview(Base):
     # Relationships
     goal = relationship("Goal", back_populates="respondent_reviews")
     respondent = relationship("User", back_populates="respondent_reviews")
+    answer_rows = relationship(
+        "ReviewAnswer",
+        back_populates="respondent_review",
+        order_by="ReviewAnswer.position",
+        cascade="all, delete-orphan",
+    )
+
+    __table_args__ = (
+        Index(
+            "uq_respondent_reviews_goal_respondent",
+            "goal_id",
+            "respondent_id",
+            unique=True,
+        ),
+    )
+
+
+class ReviewAnswer(Base):
+    """Ответ на вопрос оценки (нормализованная форма JSON-полей с ответами)"""
+
+    __tablename__ = "review_answers"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    # Ровно одна из ссылок заполнена
+    review_id = Column(String, ForeignKey("reviews.id"), nullable=True)
+    respondent_review_id = Column(
+        String, ForeignKey("respondent_reviews.id"), nullable=True
+    )
+    goal_id = Column(String, ForeignKey("goals.id"), nullable=False)
+    review_type = Column(String, nullable=False)  # self, manager, potential, respondent
+    question_id = Column(String, nullable=False)
+    position = Column(Integer, nullable=False, default=0)
+    score = Column(Float)
+    selected_option = Column(String)
+    answer_text = Column(Text)
+
+    review = relationship("Review", back_populates="answer_rows")
+    respondent_review = relationship("RespondentReview", back_populates="answer_rows")
+
+    __table_args__ = (
+        Index("ix_review_answers_review_id", "review_id"),
+        Index("ix_review_answers_respondent_review_id", "respondent_review_id"),
+        Index("ix_review_answers_goal_id", "goal_id"),
+        Index("ix_review_answers_question_type", "question_id", "review_type"),
+    )
 
 
 class Notification(Base):
@@ -169,6 +257,38 @@ class Notification(Base):
     # Relationships
     user = relationship("User", backref="notifications")
 
+    __table_args__ = (
+        Index("ix_notifications_user_created", "user_id", "created_at", "id"),
+        Index("ix_notifications_user_read_created", "user_id", "is_read", "created_at"),
+    )
+
+
+class NotificationCounter(Base):
+    """Поддерживаемый счетчик непрочитанных уведомлений пользователя"""
+
+    __tablename__ = "notification_counters"
+
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+
+class GoalAnalyticsSnapshot(Base):
+    """Материализованная аналитика по цели"""
+
+    __tablename__ = "goal_analytics_snapshot"
+
+    goal_id = Column(String, ForeignKey("goals.id"), primary_key=True)
+    data = Column(Text, nullable=False)  # JSON (GoalAnalyticsResponse)
+    total_score = Column(Float, nullable=False, default=0.0)
+    final_rating = Column(String)
+    is_stale = Column(Boolean, nullable=False, default=False)
+    computed_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
 
 class QuestionTemplate(Base):
     __tablename__ = "question_templates"
@@ -189,3 +309,35 @@ class QuestionTemplate(Base):
     requires_manager_scoring = Column(Boolean, default=False)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index("ix_question_templates_active_created", "is_active", "created_at", "id"),
+        Index(
+            "ix_question_templates_type_section",
+            "question_type",
+            "section",
+            "is_active",
+            "order_index",
+        ),
+    )
+
+
+class EmailOutbox(Base):
+    """Очередь исходящих писем (отправляются фоновым диспетчером)"""
+
+    __tablename__ = "email_outbox"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    html_body = Column(Text, nullable=False)
+    status = Column(String, default="pending")  # pending, sending, sent, failed
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text)
+    next_attempt_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    sent_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
@@ -71,6 +71,12 @@ class UserResponse(UserBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class OrgMemberResponse(UserResponse):
+    """Подчиненный в оргструктуре руководителя"""
+
+    depth: int  # 1 - прямой подчиненный
+
+
 class Token(BaseModel):
     """JWT токен"""
 
@@ -252,6 +258,10 @@ class GoalAnalyticsResponse(BaseModel):
     recommendations: List[str]
     review_count: int
     respondent_count: int
+    # Оценки респондентов, не вошедшие в балл (неизвестный вариант ответа)
+    skipped_respondent_reviews: int = 0
+    computed_at: Optional[datetime] = None  # время расчета снимка
+    is_stale: bool = False
     model_config = ConfigDict(from_attributes=True)
 
 
@@ -267,6 +277,76 @@ class EmployeeSummaryResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class OrgRollupEntry(BaseModel):
+    """Сводка по поддереву оргструктуры"""
+
+    user_id: str
+    full_name: Optional[str] = None
+    employees: int
+    goals: int
+    completed_goals: int
+    analyzed_goals: int  # цели со снимком аналитики
+    stale_goals: int
+    average_score: Optional[float] = None
+
+
+class OrgAnalyticsResponse(BaseModel):
+    """Сводная аналитика по оргструктуре руководителя"""
+
+    manager_id: str
+    total: OrgRollupEntry
+    teams: List[OrgRollupEntry]  # команды прямых подчиненных
+
+
+class ReviewCycleInfo(BaseModel):
+    """Цикл оценки: полуинтервал [start, end) по дате оценки"""
+
+    label: str
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+
+
+class ScoreBucket(BaseModel):
+    """Столбец гистограммы баллов [min_score, max_score)"""
+
+    min_score: float
+    max_score: float
+    count: int
+
+
+class CalibrationGroup(BaseModel):
+    """Распределение оценок группы и его отклонение от компании"""
+
+    id: Optional[str] = None  # руководитель или корень подразделения
+    name: Optional[str] = None
+    reviews: int
+    employees: int
+    scored_reviews: int
+    average_score: Optional[float] = None
+    score_delta: Optional[float] = None
+    rating_distribution: Dict[str, int]  # A, B, C, D, unrated
+    high_rating_share: Optional[float] = None  # доля A и B среди рейтингов
+    high_rating_share_delta: Optional[float] = None
+
+
+class CalibrationResponse(BaseModel):
+    """Калибровочная аналитика цикла оценки"""
+
+    cycle: ReviewCycleInfo
+    review_type: str
+    computed_at: datetime
+    reviews: int
+    employees: int
+    scored_reviews: int
+    average_score: Optional[float] = None
+    rating_distribution: Dict[str, int]
+    high_rating_share: Optional[float] = None
+    percentiles: Dict[str, Optional[float]]  # p10, p25, p50, p75, p90
+    score_histogram: List[ScoreBucket]
+    managers: List[CalibrationGroup]
+    departments: List[CalibrationGroup]
+
+
 # === СХЕМЫ УВЕДОМЛЕНИЙ ===
 class NotificationResponse(BaseModel):
     """Уведомление"""
@@ -290,6 +370,22 @@ class UnreadCountResponse(BaseModel):
 
 
 # === СХЕМЫ ВОПРОСОВ ===
+class QuestionOption(BaseModel):
+    """Вариант ответа в options_json шаблона вопроса"""
+
+    id: str
+    text: Optional[str] = None
+    value: float = 0.0
+    order_index: int = 0
+
+    @field_validator("id")
+    @classmethod
+    def id_not_empty(cls, v):
+        if not v.strip():
+            raise ValueError("Option id must not be empty")
+        return v
+
+
 class QuestionTemplateBase(BaseModel):
     question_text: str
     question_type: str
@@ -304,7 +400,14 @@ class QuestionTemplateBase(BaseModel):
 
 
 class QuestionTemplateCreate(QuestionTemplateBase):
-    pass
+    @field_validator("options_json")
+    @classmethod
+    def validate_options(cls, v):
+        # Импорт здесь: question_options сам использует схемы этого модуля
+        from app.services.question_options import parse_option_scores
+
+        parse_option_scores(v)
+        return v
 
 
 class QuestionTemplateResponse(QuestionTemplateBase):
@@ -0,0 +1,30 @@
+"""
+Скрипт перестроения таблицы org_hierarchy по users.manager_id
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.logger import logger
+from app.database.session import engine
+from app.models.database import OrgHierarchy
+from app.services.org_hierarchy import rebuild_org_hierarchy
+
+
+def main():
+    # Таблица могла еще не существовать в старой базе
+    OrgHierarchy.__table__.create(bind=engine, checkfirst=True)  # type: ignore
+
+    try:
+        with engine.begin() as conn:
+            rows = rebuild_org_hierarchy(conn)
+        logger.info(f"org_hierarchy перестроена, строк: {rows}")
+    except Exception as e:
+        logger.error(f"Ошибка перестроения org_hierarchy: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Скрипт пересчета баллов оценок после изменения весов, max_score или
+вариантов ответов в шаблонах вопросов
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.logger import logger
+from app.database.session import SessionLocal
+from app.services.review_rescoring import ReviewRescoringService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--question-id",
+        action="append",
+        dest="question_ids",
+        help="Пересчитать только оценки с ответами на этот вопрос (можно повторять)",
+    )
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = ReviewRescoringService(db, batch_size=args.batch_size).rescore(
+            args.question_ids
+        )
+        logger.info(
+            f"Пересчитано оценок: {result.updated} из {result.reviews} "
+            f"(ответов: {result.answers})"
+        )
+    except Exception as e:
+        logger.error(f"Ошибка пересчета оценок: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,50 @@
-import json
-from typing import Dict, Any, List
-from sqlalchemy.orm import Session
+from collections import defaultdict
+from typing import Dict, Any, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
 
+from app.core import json_codec
 from app.core.logger import logger
-from app.models.database import Review, RespondentReview, Goal
+from app.core.metrics import analytics_duration_seconds
+from app.models.database import Review, RespondentReview, ReviewAnswer, Goal
 from app.models.schemas import Answer, ReviewType
+from app.services.question_options import InvalidOptionError
+from app.services.review_answers import get_respondent_answers, get_review_answers
 from app.services.review_service import ReviewService
+from app.services.trigger_matcher import AhoCorasick
+
+
+# Ключевые слова в отзывах -> категория рекомендаций
+FEEDBACK_CATEGORIES = {
+    **dict.fromkeys(["сложно", "трудно", "проблем", "тяжело", "затруднен"], "problem"),
+    **dict.fromkeys(
+        ["успех", "достиг", "результат", "отличн", "превосходн"], "success"
+    ),
+    **dict.fromkeys(["коммуникац", "общен", "взаимодейств", "команд"], "communication"),
+}
+
+FEEDBACK_RECOMMENDATIONS = {
+    "problem": "Рекомендуется тренировка навыков преодоления сложностей",
+    "success": "Развивать навыки управления успешными проектами",
+    "communication": "Улучшить навыки коммуникации и работы в команде",
+}
+
+_feedback_matcher = AhoCorasick(FEEDBACK_CATEGORIES)
 
 
 class AnalyticsService:
     def __init__(self, db: Session):
         self.db = db
+        self._review_service: Optional[ReviewService] = None
+
+    @property
+    def review_service(self) -> ReviewService:
+        """Один ReviewService на весь расчет (шаблоны вопросов берутся из кэша)"""
+        if self._review_service is None:
+            self._review_service = ReviewService(self.db)
+        return self._review_service
 
+    @analytics_duration_seconds.timed(operation="goal")
     def get_goal_analytics(self, goal_id: str) -> Dict[str, Any]:
         """Комплексная аналитика по цели"""
 
@@ -19,34 +52,44 @@ class AnalyticsService:
         if not goal:
             return {}
 
-        # Собираем все оценки
-        reviews = self.db.query(Review).filter(Review.goal_id == goal_id).all()
-        respondent_reviews = (
-            self.db.query(RespondentReview)
-            .filter(RespondentReview.goal_id == goal_id)
-            .all()
-        )
+        return self.get_goals_analytics([goal])[goal.id]  # type: ignore
 
+    def _build_goal_analytics(
+        self, goal: Goal, reviews: List, respondent_reviews: List
+    ) -> Dict[str, Any]:
+        """Аналитика по цели из уже загруженных оценок (без запросов к БД)"""
         # Расчет средних баллов
-        scores = self._calculate_scores(reviews, respondent_reviews)
+        skipped: List[str] = []
+        scores = self._calculate_scores(reviews, respondent_reviews, skipped)
 
         # Генерация рекомендаций
         recommendations = self._generate_recommendations(reviews, respondent_reviews)
 
         return {
-            "goal_id": goal_id,
+            "goal_id": goal.id,
             "goal_title": goal.title,
             "scores": scores,
             "final_rating": self._calculate_final_rating(scores["total_score"]),
             "recommendations": recommendations,
             "review_count": len(reviews),
             "respondent_count": len(respondent_reviews),
+            "skipped_respondent_reviews": len(skipped),
         }
 
     def _calculate_scores(
-        self, reviews: List, respondent_reviews: List
+        self,
+        reviews: List,
+        respondent_reviews: List,
+        skipped: Optional[List[str]] = None,
     ) -> Dict[str, float]:
-        """Расчет различных баллов"""
+        """
+        Расчет различных баллов.
+
+        ID оценок респондентов, которые не удалось посчитать, добавляются
+        в skipped.
+        """
+        if skipped is None:
+            skipped = []
         scores = {
             "self_score": 0,
             "manager_score": 0,
@@ -77,19 +120,25 @@ class AnalyticsService:
         respondent_scores = []
         for resp_review in respondent_reviews:
             # Используем логику расчета из ответов
-            if resp_review.answers:
+            if resp_review.answer_rows or resp_review.answers:
                 try:
-                    answers_data = json.loads(resp_review.answers)
-                    answers = [Answer(**answer_data) for answer_data in answers_data]
+                    answers = get_respondent_answers(resp_review)
 
-                    review_service = ReviewService(self.db)
-                    score = review_service.calculate_weighted_score(
+                    score = self.review_service.calculate_weighted_score(
                         answers, ReviewType.RESPONDENT
                     )
                     respondent_scores.append(score)
-                except Exception as e:
-                    logger.error(f"Error calculating respondent score: {e}")
-                    continue
+                except InvalidOptionError as e:
+                    # Вариант ответа удален из шаблона после отправки оценки
+                    logger.warning(
+                        f"Respondent review {resp_review.id} skipped in analytics: {e}"
+                    )
+                    skipped.append(resp_review.id)
+                except (TypeError, ValueError) as e:
+                    logger.error(
+                        f"Cannot parse answers of respondent review {resp_review.id}: {e}"
+                    )
+                    skipped.append(resp_review.id)
 
         if respondent_scores:
             scores["respondent_score"] = sum(respondent_scores) / len(respondent_scores)  # type: ignore
@@ -151,23 +200,14 @@ class AnalyticsService:
         """Генерация рекомендаций на основе ответов"""
         all_text = self._extract_feedback_text(reviews, respondent_reviews)
 
-        recommendations = []
-
-        # Простая логика рекомендаций на основе ключевых слов
-        problem_words = ["сложно", "трудно", "проблем", "тяжело", "затруднен"]
-        success_words = ["успех", "достиг", "результат", "отличн", "превосходн"]
-        communication_words = ["коммуникац", "общен", "взаимодейств", "команд"]
-
-        if any(word in all_text for word in problem_words):
-            recommendations.append(
-                "Рекомендуется тренировка навыков преодоления сложностей"
-            )
-
-        if any(word in all_text for word in success_words):
-            recommendations.append("Развивать навыки управления успешными проектами")
-
-        if any(word in all_text for word in communication_words):
-            recommendations.append("Улучшить навыки коммуникации и работы в команде")
+        categories = {
+            FEEDBACK_CATEGORIES[word] for word in _feedback_matcher.find(all_text)
+        }
+        recommendations = [
+            recommendation
+            for category, recommendation in FEEDBACK_RECOMMENDATIONS.items()
+            if category in categories
+        ]
 
         # Если нет специфических рекомендаций, даем общую
         if not recommendations:
@@ -182,21 +222,25 @@ class AnalyticsService:
         all_text = ""
 
         for review in reviews:
-            # Самооценка
-            if review.self_evaluation_answers:
-                try:
-                    answers = json.loads(review.self_evaluation_answers)
-                    all_text += " " + " ".join([a.get("answer", "") for a in answers])
-                except:
-                    pass
-
-            # Оценка руководителя
-            if review.manager_evaluation_answers:
-                try:
-                    answers = json.loads(review.manager_evaluation_answers)
-                    all_text += " " + " ".join([a.get("answer", "") for a in answers])
-                except:
-                    pass
+            if review.answer_rows:
+                if review.review_type in (ReviewType.SELF, ReviewType.MANAGER):
+                    all_text += " " + " ".join(
+                        row.answer_text or "" for row in review.answer_rows
+                    )
+            else:
+                # Оценка еще не перенесена в review_answers
+                for raw_answers in (
+                    review.self_evaluation_answers,
+                    review.manager_evaluation_answers,
+                ):
+                    if raw_answers:
+                        try:
+                            answers = json_codec.loads(raw_answers)
+                            all_text += " " + " ".join(
+                                [a.get("answer", "") for a in answers]
+                            )
+                        except:
+                            pass
 
             # Обратная связь руководителя
             if review.final_feedback:
@@ -209,34 +253,132 @@ class AnalyticsService:
 
         return all_text.lower()
 
-    def get_employee_summary(self, employee_id: str) -> Dict[str, Any]:
-        """Сводная аналитика по всем целям сотрудника"""
+    @analytics_duration_seconds.timed(operation="goals_batch")
+    def get_goals_analytics(self, goals: List[Goal]) -> Dict[str, Dict[str, Any]]:
+        """
+        Аналитика по нескольким целям, {goal_id: analytics}.
 
-        goals = self.db.query(Goal).filter(Goal.employee_id == employee_id).all()
+        Оценки и оценки респондентов загружаются двумя запросами на все цели.
+        """
+        goal_ids = [goal.id for goal in goals]
 
-        goal_analytics = []
-        total_score = 0
-        goal_count = 0
+        reviews_by_goal: Dict[str, List[Review]] = defaultdict(list)
+        respondent_reviews_by_goal: Dict[str, List[RespondentReview]] = defaultdict(
+            list
+        )
 
-        for goal in goals:
-            analytics = self.get_goal_analytics(goal.id)  # type: ignore
-            goal_analytics.append(analytics)
+        if goal_ids:
+            # Ответы подгружаются JOIN-ом в тех же запросах
+            for review in (
+                self.db.query(Review)
+                .options(joinedload(Review.answer_rows))
+                .filter(Review.goal_id.in_(goal_ids))
+            ):
+                reviews_by_goal[review.goal_id].append(review)  # type: ignore
+
+            for resp_review in (
+                self.db.query(RespondentReview)
+                .options(joinedload(RespondentReview.answer_rows))
+                .filter(RespondentReview.goal_id.in_(goal_ids))
+            ):
+                respondent_reviews_by_goal[resp_review.goal_id].append(resp_review)  # type: ignore
 
-            if analytics.get("scores", {}).get("total_score", 0) > 0:
-                total_score += analytics["scores"]["total_score"]
-                goal_count += 1
+        return {
+            goal.id: self._build_goal_analytics(  # type: ignore
+                goal,
+                reviews_by_goal[goal.id],  # type: ignore
+                respondent_reviews_by_goal[goal.id],  # type: ignore
+            )
+            for goal in goals
+        }
 
-        avg_score = total_score / goal_count if goal_count > 0 else 0
+    @analytics_duration_seconds.timed(operation="question_averages")
+    def get_question_score_averages(
+        self, goal_ids: Optional[List[str]] = None, review_type: Optional[str] = None
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Средний балл по каждому вопросу, считается в SQL по review_answers.
+
+        Возвращает {question_id: {"average_score": ..., "answer_count": ...}}.
+        """
+        query = self.db.query(
+            ReviewAnswer.question_id,
+            func.avg(ReviewAnswer.score),
+            func.count(ReviewAnswer.score),
+        ).filter(ReviewAnswer.score.isnot(None))
+        if goal_ids is not None:
+            query = query.filter(ReviewAnswer.goal_id.in_(goal_ids))
+        if review_type is not None:
+            query = query.filter(ReviewAnswer.review_type == review_type)
 
         return {
-            "employee_id": employee_id,
-            "total_goals": len(goals),
-            "completed_goals": len([g for g in goals if g.status == "completed"]),  # type: ignore
-            "average_score": round(avg_score, 2),
-            "overall_rating": self._calculate_final_rating(avg_score),
-            "goals_analytics": goal_analytics,
+            question_id: {
+                "average_score": round(float(average), 2),
+                "answer_count": count,
+            }
+            for question_id, average, count in query.group_by(ReviewAnswer.question_id)
         }
 
+    def get_employee_summary(self, employee_id: str) -> Dict[str, Any]:
+        """Сводная аналитика по всем целям сотрудника"""
+        return self.get_employee_summaries([employee_id])[employee_id]
+
+    @analytics_duration_seconds.timed(operation="employee_summaries")
+    def get_employee_summaries(
+        self, employee_ids: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Сводная аналитика сразу по нескольким сотрудникам.
+
+        Цели, оценки и оценки респондентов загружаются тремя запросами
+        на всю группу, баллы по целям считаются в памяти.
+        """
+        goals = (
+            self.db.query(Goal)
+            .filter(Goal.employee_id.in_(employee_ids))
+            .order_by(Goal.created_at)
+            .all()
+            if employee_ids
+            else []
+        )
+        goal_ids_by_employee: Dict[str, List[str]] = defaultdict(list)
+        completed_by_employee: Dict[str, int] = defaultdict(int)
+        for goal in goals:
+            goal_ids_by_employee[goal.employee_id].append(goal.id)  # type: ignore
+            if goal.status == "completed":  # type: ignore
+                completed_by_employee[goal.employee_id] += 1  # type: ignore
+
+        analytics_by_goal = self.get_goals_analytics(goals)
+
+        summaries = {}
+        for employee_id in employee_ids:
+            employee_goal_ids = goal_ids_by_employee[employee_id]
+
+            goal_analytics = []
+            total_score = 0
+            goal_count = 0
+
+            for goal_id in employee_goal_ids:
+                analytics = analytics_by_goal[goal_id]
+                goal_analytics.append(analytics)
+
+                if analytics["scores"]["total_score"] > 0:
+                    total_score += analytics["scores"]["total_score"]
+                    goal_count += 1
+
+            avg_score = total_score / goal_count if goal_count > 0 else 0
+
+            summaries[employee_id] = {
+                "employee_id": employee_id,
+                "total_goals": len(employee_goal_ids),
+                "completed_goals": completed_by_employee[employee_id],
+                "average_score": round(avg_score, 2),
+                "overall_rating": self._calculate_final_rating(avg_score),
+                "goals_analytics": goal_analytics,
+            }
+
+        return summaries
+
     def _calculate_review_score(
         self, review: Review, review_service: ReviewService
     ) -> float:
@@ -251,15 +393,4 @@ class AnalyticsService:
 
     def _get_all_answers(self, review: Review) -> List[Answer]:
         """Получить все ответы из оценки"""
-        answers_data = []
-
-        if review.review_type == ReviewType.SELF and review.self_evaluation_answers:  # type: ignore
-            answers_data = json.loads(review.self_evaluation_answers)  # type: ignore
-        elif review.review_type == ReviewType.MANAGER and review.manager_evaluation_answers:  # type: ignore
-            answers_data = json.loads(review.manager_evaluation_answers)  # type: ignore
-        elif review.review_type == ReviewType.POTENTIAL and review.potential_evaluation_answers:  # type: ignore
-            answers_data = json.loads(review.potential_evaluation_answers)  # type: ignore
-        elif review.review_type == ReviewType.RESPONDENT and hasattr(review, "answers"):  # type: ignore
-            answers_data = json.loads(review.answers)  # type: ignore
-
-        return [Answer(**data) for data in answers_data]
+        return get_review_answers(review)
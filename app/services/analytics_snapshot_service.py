@@ -0,0 +1,209 @@
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import delete, event, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core import json_codec
+from app.core.config import settings
+from app.core.logger import logger
+from app.models.database import (
+    Goal,
+    GoalAnalyticsSnapshot,
+    QuestionTemplate,
+    RespondentReview,
+    Review,
+)
+from app.services.analytics_service import AnalyticsService
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite не хранит часовой пояс
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class GoalAnalyticsSnapshotService(AnalyticsService):
+    """
+    Аналитика по целям из таблицы goal_analytics_snapshot.
+
+    Запись оценок помечает снимок цели устаревшим в той же транзакции
+    (события маппера ниже), после коммита эндпоинты пересчитывают снимок
+    только этой цели. Чтение отдает готовый снимок и пересчитывает
+    отсутствующие, устаревшие или слишком старые.
+
+    Пересчитанные снимки пишутся в savepoint и коммитятся одним commit
+    при выходе из внешнего публичного метода - базовый AnalyticsService
+    не видит коммитов посреди расчета.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        force_refresh: bool = False,
+        max_age_seconds: Optional[float] = None,
+    ):
+        super().__init__(db)
+        self.force_refresh = force_refresh
+        self.max_age_seconds = (
+            max_age_seconds
+            if max_age_seconds is not None
+            else settings.GOAL_ANALYTICS_SNAPSHOT_MAX_AGE_SECONDS
+        )
+        self._depth = 0
+        self._unsaved = False
+
+    @contextmanager
+    def _saving(self) -> Iterator[None]:
+        """Закоммитить пересчитанные снимки по выходу из внешнего вызова"""
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+        if self._depth == 0 and self._unsaved:
+            self._unsaved = False
+            try:
+                self.db.commit()
+            except SQLAlchemyError as e:
+                # Расчет уже отдан, снимок обновится при следующем чтении
+                self.db.rollback()
+                logger.error(f"Failed to store goal analytics snapshots: {e}")
+
+    def get_goal_analytics(self, goal_id: str) -> Dict[str, Any]:
+        """Аналитика по цели из снимка"""
+        goal = self.db.get(Goal, goal_id)
+        if not goal:
+            return {}
+        return self.get_goals_analytics([goal])[goal_id]
+
+    def get_goals_analytics(self, goals: List[Goal]) -> Dict[str, Dict[str, Any]]:
+        """Аналитика по целям: готовые снимки + пересчет недостающих"""
+        with self._saving():
+            return self._get_goals_analytics(goals)
+
+    def get_employee_summaries(
+        self, employee_ids: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        with self._saving():
+            return super().get_employee_summaries(employee_ids)
+
+    def _get_goals_analytics(self, goals: List[Goal]) -> Dict[str, Dict[str, Any]]:
+        snapshots = self._load_snapshots([goal.id for goal in goals])  # type: ignore
+
+        result = {}
+        to_rebuild = []
+        for goal in goals:
+            snapshot = snapshots.get(goal.id)  # type: ignore
+            if self._needs_rebuild(snapshot):
+                to_rebuild.append(goal)
+            else:
+                result[goal.id] = self._from_snapshot(snapshot)  # type: ignore
+
+        if to_rebuild:
+            result.update(self._rebuild(to_rebuild, snapshots))
+        return result
+
+    def refresh_goals(self, goal_ids: List[str]) -> None:
+        """Пересчитать снимки целей (вызывается после записи оценок)"""
+        with self._saving():
+            goals = self.db.query(Goal).filter(Goal.id.in_(goal_ids)).all()
+            if goals:
+                self._rebuild(goals, self._load_snapshots(goal_ids))
+
+    def _load_snapshots(self, goal_ids: List[str]) -> Dict[str, GoalAnalyticsSnapshot]:
+        if not goal_ids:
+            return {}
+        return {
+            snapshot.goal_id: snapshot  # type: ignore
+            for snapshot in self.db.query(GoalAnalyticsSnapshot).filter(
+                GoalAnalyticsSnapshot.goal_id.in_(goal_ids)
+            )
+        }
+
+    def _needs_rebuild(self, snapshot: Optional[GoalAnalyticsSnapshot]) -> bool:
+        if snapshot is None or snapshot.is_stale or self.force_refresh:  # type: ignore
+            return True
+        computed_at = _as_utc(snapshot.computed_at)  # type: ignore
+        if self.max_age_seconds <= 0 or computed_at is None:
+            return False
+        age = datetime.now(timezone.utc) - computed_at
+        return age.total_seconds() > self.max_age_seconds
+
+    @staticmethod
+    def _from_snapshot(snapshot: GoalAnalyticsSnapshot) -> Dict[str, Any]:
+        analytics = json_codec.loads(snapshot.data)  # type: ignore
+        analytics["computed_at"] = _as_utc(snapshot.computed_at)  # type: ignore
+        analytics["is_stale"] = bool(snapshot.is_stale)
+        return analytics
+
+    def _rebuild(
+        self, goals: List[Goal], snapshots: Dict[str, GoalAnalyticsSnapshot]
+    ) -> Dict[str, Dict[str, Any]]:
+        analytics_by_goal = AnalyticsService.get_goals_analytics(self, goals)
+        computed_at = datetime.now(timezone.utc)
+
+        try:
+            with self.db.begin_nested():
+                for goal_id, analytics in analytics_by_goal.items():
+                    snapshot = snapshots.get(goal_id)
+                    if snapshot is None:
+                        snapshot = GoalAnalyticsSnapshot(goal_id=goal_id)
+                        self.db.add(snapshot)
+                    snapshot.data = json_codec.dumps(analytics)  # type: ignore
+                    snapshot.total_score = analytics["scores"]["total_score"]
+                    snapshot.final_rating = analytics["final_rating"]
+                    snapshot.is_stale = False  # type: ignore
+                    snapshot.computed_at = computed_at  # type: ignore
+            self._unsaved = True
+        except SQLAlchemyError as e:
+            # Например, снимок параллельно создан другим запросом -
+            # откатывается только savepoint, расчет все равно отдаем
+            logger.error(f"Failed to store goal analytics snapshots: {e}")
+
+        return {
+            goal_id: {**analytics, "computed_at": computed_at, "is_stale": False}
+            for goal_id, analytics in analytics_by_goal.items()
+        }
+
+
+_snapshots = GoalAnalyticsSnapshot.__table__
+
+
+def _mark_goal_stale(connection, goal_id: Optional[str]) -> None:
+    if goal_id is not None:
+        connection.execute(
+            update(_snapshots)
+            .where(_snapshots.c.goal_id == goal_id)
+            .values(is_stale=True)
+        )
+
+
+def _on_review_write(mapper, connection, target):
+    _mark_goal_stale(connection, target.goal_id)
+
+
+def _on_goal_update(mapper, connection, target):
+    # В снимке хранится название цели
+    _mark_goal_stale(connection, target.id)
+
+
+def _on_goal_delete(mapper, connection, target):
+    connection.execute(delete(_snapshots).where(_snapshots.c.goal_id == target.id))
+
+
+def _on_question_template_write(mapper, connection, target):
+    # Веса вопросов влияют на баллы всех целей
+    connection.execute(update(_snapshots).values(is_stale=True))
+
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(Review, _event_name, _on_review_write)
+    event.listen(RespondentReview, _event_name, _on_review_write)
+    event.listen(QuestionTemplate, _event_name, _on_question_template_write)
+
+event.listen(Goal, "after_update", _on_goal_update)
+event.listen(Goal, "before_delete", _on_goal_delete)
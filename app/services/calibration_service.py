@@ -0,0 +1,374 @@
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Hashable, List, Optional
+
+from sqlalchemy import Integer, and_, case, cast, event, func, or_, select
+from sqlalchemy.orm import Session, aliased
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import analytics_duration_seconds
+from app.models.database import Goal, OrgHierarchy, Review, User
+from app.models.schemas import ReviewType
+
+RATINGS = ("A", "B", "C", "D")
+HIGH_RATINGS = ("A", "B")
+PERCENTILES = (10, 25, 50, 75, 90)
+
+_CYCLE_RE = re.compile(r"^(\d{4})(?:-(H[12]|Q[1-4]))?$")
+
+
+@dataclass(frozen=True)
+class ReviewCycle:
+    """Цикл оценки - полуинтервал [start, end) по created_at оценок"""
+
+    label: str
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+
+    def contains(self, moment: Optional[datetime]) -> bool:
+        if moment is None:
+            return True
+        moment = _naive_utc(moment)
+        if self.start is not None and moment < self.start:
+            return False
+        return self.end is None or moment < self.end
+
+
+ALL_TIME = ReviewCycle("all")
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def parse_review_cycle(cycle: Optional[str]) -> ReviewCycle:
+    """
+    Цикл по метке: "2026" (год), "2026-H1" (полугодие), "2026-Q3" (квартал).
+
+    Без метки - все оценки за все время.
+    """
+    if not cycle or cycle == ALL_TIME.label:
+        return ALL_TIME
+    match = _CYCLE_RE.match(cycle)
+    if not match:
+        raise ValueError(f"Invalid review cycle: {cycle}")
+
+    year, part = int(match.group(1)), match.group(2)
+    if part is None:
+        first_month, months = 1, 12
+    elif part[0] == "H":
+        first_month, months = 1 + (int(part[1]) - 1) * 6, 6
+    else:
+        first_month, months = 1 + (int(part[1]) - 1) * 3, 3
+
+    start = datetime(year, first_month, 1)
+    end_month = first_month + months
+    end = datetime(year + (end_month - 1) // 12, (end_month - 1) % 12 + 1, 1)
+    return ReviewCycle(cycle, start, end)
+
+
+class CalibrationCache:
+    """
+    Кэш калибровки по (цикл, тип оценки).
+
+    Запись оценки сбрасывает только циклы, в которые она попадает:
+    закрытые циклы остаются в кэше, пока идет текущий.
+    """
+
+    def __init__(self, max_size: int = 256, ttl_seconds: float = 600.0):
+        self._cache = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self._cycles: Dict[Hashable, ReviewCycle] = {}
+        self._lock = threading.Lock()
+
+    def get(self, cycle: ReviewCycle, review_type: str) -> Optional[Dict[str, Any]]:
+        return self._cache.get((cycle.label, review_type))
+
+    def set(self, cycle: ReviewCycle, review_type: str, value: Dict[str, Any]) -> None:
+        key = (cycle.label, review_type)
+        with self._lock:
+            self._cycles[key] = cycle
+        self._cache.set(key, value)
+
+    def invalidate_for(self, moment: Optional[datetime]) -> None:
+        """Сбросить циклы, содержащие момент создания оценки"""
+        with self._lock:
+            keys = [
+                key for key, cycle in self._cycles.items() if cycle.contains(moment)
+            ]
+            for key in keys:
+                del self._cycles[key]
+        for key in keys:
+            self._cache.pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cycles.clear()
+        self._cache.clear()
+
+
+calibration_cache = CalibrationCache(ttl_seconds=settings.CALIBRATION_CACHE_TTL_SECONDS)
+
+
+def _percentile(ranked: Dict[int, float], count: int, pct: float) -> float:
+    # Линейная интерполяция, как percentile_cont
+    position = (count - 1) * pct / 100
+    lower = int(position)
+    low_value = ranked[lower + 1]
+    high_value = ranked.get(lower + 2, low_value)
+    return low_value + (high_value - low_value) * (position - lower)
+
+
+class CalibrationService:
+    """
+    Распределение рейтингов и баллов для калибровочных сессий.
+
+    Все агрегаты считаются в БД (GROUP BY по руководителю и подразделению,
+    гистограмма и перцентили), число запросов не зависит от числа
+    сотрудников. Подразделение - корень оргструктуры сотрудника
+    (по org_hierarchy).
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @analytics_duration_seconds.timed(operation="calibration")
+    def get_calibration(
+        self,
+        cycle: ReviewCycle = ALL_TIME,
+        review_type: str = ReviewType.MANAGER.value,
+        refresh: bool = False,
+    ) -> Dict[str, Any]:
+        """Калибровочная аналитика цикла (из кэша, если не устарела)"""
+        if not refresh:
+            cached = calibration_cache.get(cycle, review_type)
+            if cached is not None:
+                return cached
+
+        result = self._compute(cycle, review_type)
+        calibration_cache.set(cycle, review_type, result)
+        return result
+
+    def _compute(self, cycle: ReviewCycle, review_type: str) -> Dict[str, Any]:
+        managers = self._manager_groups(cycle, review_type)
+
+        # Итог по компании складывается из групп руководителей
+        reviews = sum(group["reviews"] for group in managers)
+        scored = sum(group["scored_reviews"] for group in managers)
+        score_sum = sum(
+            group["average_score"] * group["scored_reviews"]
+            for group in managers
+            if group["average_score"] is not None
+        )
+        distribution = {
+            key: sum(group["rating_distribution"][key] for group in managers)
+            for key in (*RATINGS, "unrated")
+        }
+        overall = {
+            "reviews": reviews,
+            "employees": sum(group["employees"] for group in managers),
+            "scored_reviews": scored,
+            "average_score": score_sum / scored if scored else None,
+            "rating_distribution": distribution,
+        }
+        overall["high_rating_share"] = self._high_rating_share(overall)
+
+        departments = self._department_groups(cycle, review_type)
+        for group in managers + departments:
+            self._add_deltas(group, overall)
+
+        return {
+            "cycle": {"label": cycle.label, "start": cycle.start, "end": cycle.end},
+            "review_type": review_type,
+            "computed_at": datetime.now(timezone.utc),
+            **overall,
+            "average_score": _round(overall["average_score"]),
+            "percentiles": self._percentiles(cycle, review_type, scored),
+            "score_histogram": self._histogram(cycle, review_type),
+            "managers": managers,
+            "departments": departments,
+        }
+
+    def _base_query(self, cycle: ReviewCycle, review_type: str):
+        employee = aliased(User)
+        query = (
+            select(
+                Review.calculated_score.label("score"),
+                Review.final_rating.label("rating"),
+                Goal.employee_id.label("employee_id"),
+            )
+            .join(Goal, Goal.id == Review.goal_id)
+            .join(employee, employee.id == Goal.employee_id)
+            .where(Review.review_type == review_type)
+        )
+        if cycle.start is not None:
+            query = query.where(Review.created_at >= cycle.start)
+        if cycle.end is not None:
+            query = query.where(Review.created_at < cycle.end)
+        return query, employee
+
+    def _manager_groups(self, cycle, review_type) -> List[Dict[str, Any]]:
+        query, employee = self._base_query(cycle, review_type)
+        manager = aliased(User)
+        base = (
+            query.add_columns(
+                employee.manager_id.label("group_id"),
+                manager.full_name.label("group_name"),
+            )
+            .outerjoin(manager, manager.id == employee.manager_id)
+            .subquery()
+        )
+        return self._group_stats(base)
+
+    def _department_groups(self, cycle, review_type) -> List[Dict[str, Any]]:
+        query, employee = self._base_query(cycle, review_type)
+        link = aliased(OrgHierarchy)
+        root = aliased(User)
+        base = (
+            query.add_columns(
+                root.id.label("group_id"), root.full_name.label("group_name")
+            )
+            .join(link, link.descendant_id == employee.id)
+            .join(root, and_(root.id == link.ancestor_id, root.manager_id.is_(None)))
+            .subquery()
+        )
+        return self._group_stats(base)
+
+    def _group_stats(self, base) -> List[Dict[str, Any]]:
+        stmt = (
+            select(
+                base.c.group_id,
+                base.c.group_name,
+                func.count(),
+                func.count(func.distinct(base.c.employee_id)),
+                func.count(base.c.score),
+                func.avg(base.c.score),
+                *[func.sum(case((base.c.rating == r, 1), else_=0)) for r in RATINGS],
+            )
+            .group_by(base.c.group_id, base.c.group_name)
+            .order_by(base.c.group_name)
+        )
+
+        groups = []
+        for row in self.db.execute(stmt):
+            group_id, name, reviews, employees, scored, average, *counts = row
+            distribution = {r: int(c or 0) for r, c in zip(RATINGS, counts)}
+            distribution["unrated"] = reviews - sum(distribution.values())
+            groups.append(
+                {
+                    "id": group_id,
+                    "name": name,
+                    "reviews": reviews,
+                    "employees": employees,
+                    "scored_reviews": scored,
+                    "average_score": average,
+                    "rating_distribution": distribution,
+                }
+            )
+        return groups
+
+    @staticmethod
+    def _high_rating_share(group: Dict[str, Any]) -> Optional[float]:
+        distribution = group["rating_distribution"]
+        rated = group["reviews"] - distribution["unrated"]
+        if not rated:
+            return None
+        return sum(distribution[r] for r in HIGH_RATINGS) / rated
+
+    def _add_deltas(self, group: Dict[str, Any], overall: Dict[str, Any]) -> None:
+        """Отклонение группы от компании: средний балл и доля A/B"""
+        share = self._high_rating_share(group)
+        group["high_rating_share"] = _round(share)
+        group["high_rating_share_delta"] = _round(
+            _delta(share, overall["high_rating_share"])
+        )
+        group["score_delta"] = _round(
+            _delta(group["average_score"], overall["average_score"])
+        )
+        group["average_score"] = _round(group["average_score"])
+
+    def _histogram(self, cycle, review_type) -> List[Dict[str, Any]]:
+        width = settings.CALIBRATION_HISTOGRAM_BUCKET
+        query, _ = self._base_query(cycle, review_type)
+        base = query.where(Review.calculated_score.isnot(None)).subquery()
+        # Баллы неотрицательны - CAST отбрасывает дробную часть как floor
+        bucket = cast(base.c.score / width, Integer).label("bucket")
+        stmt = select(bucket, func.count()).group_by(bucket).order_by(bucket)
+        return [
+            {
+                "min_score": round(index * width, 4),
+                "max_score": round((index + 1) * width, 4),
+                "count": count,
+            }
+            for index, count in self.db.execute(stmt)
+        ]
+
+    def _percentiles(self, cycle, review_type, scored: int) -> Dict[str, float]:
+        if not scored:
+            return {}
+        query, _ = self._base_query(cycle, review_type)
+        query = query.where(Review.calculated_score.isnot(None))
+
+        if self.db.get_bind().dialect.name == "postgresql":
+            base = query.subquery()
+            stmt = select(
+                *[
+                    func.percentile_cont(pct / 100).within_group(base.c.score)
+                    for pct in PERCENTILES
+                ]
+            )
+            values = self.db.execute(stmt).one()
+            return {f"p{pct}": _round(v) for pct, v in zip(PERCENTILES, values)}
+
+        # Без percentile_cont: нумеруем баллы оконной функцией и забираем
+        # только соседние с позициями перцентилей строки
+        ranked = query.add_columns(
+            func.row_number().over(order_by=Review.calculated_score).label("rn"),
+            func.count().over().label("n"),
+        ).subquery()
+        positions = []
+        for pct in PERCENTILES:
+            lower = cast(pct / 100 * (ranked.c.n - 1), Integer) + 1
+            positions += [ranked.c.rn == lower, ranked.c.rn == lower + 1]
+        stmt = select(ranked.c.rn, ranked.c.score).where(or_(*positions))
+
+        values = {rn: score for rn, score in self.db.execute(stmt)}
+        return {
+            f"p{pct}": _round(_percentile(values, scored, pct)) for pct in PERCENTILES
+        }
+
+
+def _delta(value: Optional[float], base: Optional[float]) -> Optional[float]:
+    if value is None or base is None:
+        return None
+    return value - base
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 3)
+
+
+_DIRTY_KEY = "calibration_dirty_reviews"
+
+
+def _on_review_write(mapper, connection, target):
+    calibration_cache.invalidate_for(target.created_at)
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault(_DIRTY_KEY, []).append(target.created_at)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _on_session_end(session):
+    # Между flush и commit кэш мог заполниться незакоммиченными данными
+    for created_at in session.info.pop(_DIRTY_KEY, ()):
+        calibration_cache.invalidate_for(created_at)
+
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(Review, _event_name, _on_review_write)
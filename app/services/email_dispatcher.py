@@ -0,0 +1,311 @@
+import asyncio
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.metrics import email_send_duration_seconds
+from app.database.session import SessionLocal
+from app.models.database import EmailOutbox
+from app.services.email_service import EmailService
+
+
+@dataclass(frozen=True)
+class OutboxItem:
+    """Забранное письмо; отправляется без открытой транзакции"""
+
+    id: str
+    to_email: str
+    subject: str
+    html_body: str
+    attempts: int
+
+
+class SMTPConnectionPool:
+    """
+    Пул переиспользуемых SMTP-соединений.
+
+    Соединение открывается (STARTTLS + login) один раз и отдается повторно;
+    перед выдачей простаивавшего соединения оно проверяется через NOOP.
+    """
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: Optional[bool] = None,
+        size: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_idle_seconds: float = 30.0,
+    ):
+        self.host = host if host is not None else settings.SMTP_SERVER
+        self.port = port if port is not None else settings.SMTP_PORT
+        self.username = username if username is not None else settings.SMTP_USERNAME
+        self.password = password if password is not None else settings.SMTP_PASSWORD
+        self.use_tls = use_tls if use_tls is not None else settings.SMTP_USE_TLS
+        self.size = size if size is not None else settings.SMTP_POOL_SIZE
+        self.timeout = timeout if timeout is not None else settings.SMTP_TIMEOUT
+        self.max_idle_seconds = max_idle_seconds
+
+        self._idle: List[tuple] = []  # (smtplib.SMTP, время возврата в пул)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            server.starttls()
+        if self.username and self.password:
+            server.login(self.username, self.password)
+        return server
+
+    @staticmethod
+    def _close(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _is_alive(self, server: smtplib.SMTP) -> bool:
+        try:
+            return server.noop()[0] == 250
+        except Exception:
+            return False
+
+    @contextmanager
+    def connection(self):
+        """Выдать соединение; при ошибке отправки соединение закрывается"""
+        self._slots.acquire()
+        server = None
+        try:
+            with self._lock:
+                idle = self._idle.pop() if self._idle else None
+
+            if idle is not None:
+                server, released_at = idle
+                if (
+                    time.monotonic() - released_at > self.max_idle_seconds
+                    and not self._is_alive(server)
+                ):
+                    self._close(server)
+                    server = None
+
+            if server is None:
+                server = self._connect()
+
+            yield server
+
+            with self._lock:
+                self._idle.append((server, time.monotonic()))
+            server = None
+        finally:
+            if server is not None:
+                self._close(server)
+            self._slots.release()
+
+    def close(self) -> None:
+        """Закрыть все простаивающие соединения"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._close(server)
+
+
+class EmailDispatcher:
+    """Фоновая отправка писем из email_outbox с повторами и backoff"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        pool: Optional[SMTPConnectionPool] = None,
+        batch_size: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        retry_base_seconds: Optional[float] = None,
+        retry_max_seconds: Optional[float] = None,
+        lease_seconds: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.pool = pool or SMTPConnectionPool()
+        self.batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+        self.max_attempts = max_attempts or settings.EMAIL_MAX_ATTEMPTS
+        self.retry_base_seconds = (
+            retry_base_seconds
+            if retry_base_seconds is not None
+            else settings.EMAIL_RETRY_BASE_SECONDS
+        )
+        self.retry_max_seconds = (
+            retry_max_seconds
+            if retry_max_seconds is not None
+            else settings.EMAIL_RETRY_MAX_SECONDS
+        )
+        self.lease_seconds = (
+            lease_seconds
+            if lease_seconds is not None
+            else settings.EMAIL_CLAIM_LEASE_SECONDS
+        )
+
+    def backoff_seconds(self, attempts: int) -> float:
+        """Экспоненциальная задержка перед следующей попыткой"""
+        return min(
+            self.retry_base_seconds * (2 ** max(attempts - 1, 0)),
+            self.retry_max_seconds,
+        )
+
+    def _deliver(self, item: OutboxItem) -> None:
+        msg = EmailService.build_message(item.to_email, item.subject, item.html_body)
+        with self.pool.connection() as server:
+            server.send_message(msg)
+
+    def _claim(self, db: Session) -> List[OutboxItem]:
+        """
+        Забрать пачку писем: status=sending и аренда до next_attempt_at.
+
+        Блокировки строк держатся только до commit, не на время SMTP.
+        Письма, чья аренда истекла (воркер упал), забираются повторно.
+        """
+        now = datetime.now(timezone.utc)
+        rows = (
+            db.query(EmailOutbox)
+            .filter(
+                or_(EmailOutbox.status == "pending", EmailOutbox.status == "sending"),
+                EmailOutbox.next_attempt_at <= now,
+            )
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+        claimed = []
+        for row in rows:
+            if (row.attempts or 0) >= self.max_attempts:  # type: ignore
+                # Попытки исчерпаны отправками, которые не завершились
+                row.status = "failed"  # type: ignore
+                logger.error(f"Email {row.id} to {row.to_email} failed permanently")
+                continue
+            row.status = "sending"  # type: ignore
+            row.attempts = (row.attempts or 0) + 1  # type: ignore
+            row.next_attempt_at = now + timedelta(  # type: ignore
+                seconds=self.lease_seconds
+            )
+            claimed.append(
+                OutboxItem(
+                    id=row.id,  # type: ignore
+                    to_email=row.to_email,  # type: ignore
+                    subject=row.subject,  # type: ignore
+                    html_body=row.html_body,  # type: ignore
+                    attempts=row.attempts,  # type: ignore
+                )
+            )
+        db.commit()
+        return claimed
+
+    def _record(self, db: Session, item: OutboxItem, values: dict) -> None:
+        """Записать результат отправки, если письмо все еще за этим воркером"""
+        db.execute(
+            update(EmailOutbox)
+            .where(
+                EmailOutbox.id == item.id,
+                EmailOutbox.status == "sending",
+                EmailOutbox.attempts == item.attempts,
+            )
+            .values(**values)
+        )
+        db.commit()
+
+    def _send(self, db: Session, item: OutboxItem) -> bool:
+        started = time.perf_counter()
+        try:
+            self._deliver(item)
+        except Exception as e:
+            email_send_duration_seconds.observe(
+                time.perf_counter() - started, transport="outbox", outcome="error"
+            )
+            if item.attempts >= self.max_attempts:
+                self._record(db, item, {"status": "failed", "last_error": str(e)})
+                logger.error(
+                    f"Email {item.id} to {item.to_email} failed permanently: {e}"
+                )
+            else:
+                next_attempt_at = datetime.now(timezone.utc) + timedelta(
+                    seconds=self.backoff_seconds(item.attempts)
+                )
+                self._record(
+                    db,
+                    item,
+                    {
+                        "status": "pending",
+                        "last_error": str(e),
+                        "next_attempt_at": next_attempt_at,
+                    },
+                )
+                logger.warning(
+                    f"Email {item.id} to {item.to_email} failed "
+                    f"(attempt {item.attempts}), will retry: {e}"
+                )
+            return False
+
+        email_send_duration_seconds.observe(
+            time.perf_counter() - started, transport="outbox", outcome="sent"
+        )
+        self._record(
+            db, item, {"status": "sent", "sent_at": datetime.now(timezone.utc)}
+        )
+        return True
+
+    def drain_once(self) -> int:
+        """Отправить одну пачку готовых писем. Возвращает число отправленных"""
+        db = self.session_factory()
+        sent = 0
+        try:
+            try:
+                items = self._claim(db)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Email outbox claim failed: {e}")
+                return 0
+
+            # Результат каждого письма - отдельная транзакция: сбой записи
+            # одного не откатывает статусы уже отправленных
+            for item in items:
+                try:
+                    if self._send(db, item):
+                        sent += 1
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"Failed to record email {item.id} result: {e}")
+        finally:
+            db.close()
+
+        if sent:
+            logger.info(f"Email dispatcher sent {sent} emails")
+        return sent
+
+    async def run_forever(self, poll_interval: Optional[float] = None) -> None:
+        """Цикл фонового воркера: разбирает очередь, не блокируя event loop"""
+        poll_interval = poll_interval or settings.EMAIL_DISPATCHER_POLL_SECONDS
+        logger.info("Email dispatcher started")
+        try:
+            while True:
+                sent = await asyncio.to_thread(self.drain_once)
+                # Полная пачка - вероятно, очередь не пуста, продолжаем сразу
+                if sent < self.batch_size:
+                    await asyncio.sleep(poll_interval)
+        finally:
+            self.pool.close()
+            logger.info("Email dispatcher stopped")
+
+
+if __name__ == "__main__":
+    # Отдельный процесс-воркер: python -m app.services.email_dispatcher
+    asyncio.run(EmailDispatcher().run_forever())
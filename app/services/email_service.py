@@ -1,27 +1,30 @@
 import smtplib
+import time
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from typing import Tuple
+
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.logger import logger
-from app.models.database import Goal
+from app.core.metrics import email_send_duration_seconds
+from app.models.database import EmailOutbox, Goal
 
 
 class EmailService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, use_outbox: bool = False):
         self.db = db
+        # В режиме outbox письма только ставятся в очередь email_outbox,
+        # отправку выполняет фоновый EmailDispatcher
+        self.use_outbox = use_outbox
 
-    def send_email(self, to_email: str, subject: str, html_content: str):
-        """Базовая отправка email"""
-        try:
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = f"{settings.COMPANY_NAME} - {subject}"
-            msg["From"] = settings.SMTP_FROM_EMAIL
-            msg["To"] = to_email
+    @staticmethod
+    def render_email(subject: str, html_content: str) -> Tuple[str, str]:
+        """Полная тема и HTML письма в фирменном шаблоне"""
+        full_subject = f"{settings.COMPANY_NAME} - {subject}"
 
-            # HTML версия
-            html_template = f"""
+        html_template = f"""
             <!DOCTYPE html>
             <html>
             <head>
@@ -50,7 +53,27 @@ class EmailService:
             </html>
             """
 
-            msg.attach(MIMEText(html_template, "html"))
+        return full_subject, html_template
+
+    @staticmethod
+    def build_message(to_email: str, subject: str, html_body: str) -> MIMEMultipart:
+        """MIME-сообщение из уже отрендеренных темы и HTML"""
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = subject
+        msg["From"] = settings.SMTP_FROM_EMAIL
+        msg["To"] = to_email
+        msg.attach(MIMEText(html_body, "html"))
+        return msg
+
+    def send_email(self, to_email: str, subject: str, html_content: str):
+        """Базовая отправка email (или постановка в очередь в режиме outbox)"""
+        if self.use_outbox:
+            return self.enqueue_email(to_email, subject, html_content)
+
+        started = time.perf_counter()
+        try:
+            full_subject, html_template = self.render_email(subject, html_content)
+            msg = self.build_message(to_email, full_subject, html_template)
 
             # Отправка через SMTP
             with smtplib.SMTP(settings.SMTP_SERVER, settings.SMTP_PORT) as server:
@@ -60,13 +83,40 @@ class EmailService:
                     server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
                 server.send_message(msg)
 
+            email_send_duration_seconds.observe(
+                time.perf_counter() - started, transport="direct", outcome="sent"
+            )
             logger.info(f"Email sent to {to_email}: {subject}")
             return True
 
         except Exception as e:
+            email_send_duration_seconds.observe(
+                time.perf_counter() - started, transport="direct", outcome="error"
+            )
             logger.error(f"Failed to send email to {to_email}: {e}")
             return False
 
+    def enqueue_email(self, to_email: str, subject: str, html_content: str) -> bool:
+        """Поставить письмо в очередь email_outbox"""
+        try:
+            full_subject, html_template = self.render_email(subject, html_content)
+            self.db.add(
+                EmailOutbox(
+                    to_email=to_email,
+                    subject=full_subject,
+                    html_body=html_template,
+                )
+            )
+            self.db.commit()
+
+            logger.info(f"Email queued for {to_email}: {subject}")
+            return True
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to queue email for {to_email}: {e}")
+            return False
+
     def notify_manager_about_pending_review(
         self, goal_id: str, employee_name: str, manager_email: str
     ):
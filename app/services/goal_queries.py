@@ -0,0 +1,56 @@
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Query, Session, joinedload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from app.models.database import Goal
+
+# Стратегия загрузки связей цели по умолчанию:
+# many-to-one - JOIN в основном запросе, коллекции - один SELECT ... IN
+GOAL_LOAD_STRATEGIES: Dict[str, str] = {
+    "employee": "joined",
+    "steps": "selectin",
+    "respondents": "selectin",
+}
+
+# Связи, которые нужны для сериализации GoalResponse
+GOAL_RESPONSE_RELATIONS = ("employee", "steps", "respondents")
+
+_LOADERS = {
+    "joined": joinedload,
+    "selectin": selectinload,
+}
+
+
+def goal_loader_options(
+    relations: Iterable[str] = GOAL_RESPONSE_RELATIONS,
+    strategies: Optional[Dict[str, str]] = None,
+) -> List[LoaderOption]:
+    """
+    Опции загрузки связей Goal.
+
+    strategies переопределяет GOAL_LOAD_STRATEGIES для отдельных связей
+    ("joined" или "selectin").
+    """
+    strategies = {**GOAL_LOAD_STRATEGIES, **(strategies or {})}
+    options = []
+    for relation in relations:
+        strategy = strategies.get(relation)
+        if strategy not in _LOADERS:
+            raise ValueError(f"Unknown load strategy for Goal.{relation}: {strategy}")
+        options.append(_LOADERS[strategy](getattr(Goal, relation)))
+    return options
+
+
+def goal_query(
+    db: Session,
+    relations: Iterable[str] = GOAL_RESPONSE_RELATIONS,
+    strategies: Optional[Dict[str, str]] = None,
+) -> Query:
+    """
+    Запрос целей с заранее загруженными связями.
+
+    Число SQL-запросов не зависит от количества целей: основной SELECT
+    плюс по одному на каждую selectin-связь.
+    """
+    return db.query(Goal).options(*goal_loader_options(relations, strategies))
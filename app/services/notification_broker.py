@@ -0,0 +1,110 @@
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+
+from app.core.logger import logger
+
+
+class Subscription:
+    """Подписка одного SSE-клиента на события пользователя"""
+
+    def __init__(self, broker: "NotificationBroker", user_id: str, max_queue: int):
+        self.broker = broker
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+
+    def deliver(self, event: Dict[str, Any]) -> None:
+        """Положить событие в очередь (вызывается из любого потока)"""
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event: Dict[str, Any]) -> None:
+        if self.queue.full():
+            # Медленный клиент: отбрасываем самое старое событие
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Следующее событие или None по таймауту"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class BrokerBackend(ABC):
+    """
+    Транспорт событий между процессами.
+
+    InMemoryBackend доставляет события только подписчикам текущего процесса.
+    Для нескольких воркеров подключается backend поверх общей шины
+    (Redis pub/sub, PostgreSQL LISTEN/NOTIFY), который вызывает
+    broker.dispatch_local() при получении сообщения.
+    """
+
+    @abstractmethod
+    def publish(self, broker: "NotificationBroker", user_id: str, event: Dict) -> None:
+        """Доставить событие подписчикам пользователя во всех процессах"""
+
+
+class InMemoryBackend(BrokerBackend):
+    def publish(self, broker: "NotificationBroker", user_id: str, event: Dict) -> None:
+        broker.dispatch_local(user_id, event)
+
+
+class NotificationBroker:
+    """In-process pub/sub событий уведомлений по пользователям"""
+
+    def __init__(self, backend: Optional[BrokerBackend] = None, max_queue: int = 100):
+        self.backend = backend or InMemoryBackend()
+        self.max_queue = max_queue
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def set_backend(self, backend: BrokerBackend) -> None:
+        self.backend = backend
+
+    def subscribe(self, user_id: str) -> Subscription:
+        """Подписаться на события пользователя (внутри event loop)"""
+        subscription = Subscription(self, user_id, self.max_queue)
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def has_subscribers(self, user_id: str) -> bool:
+        return bool(self._subscribers.get(user_id))
+
+    def publish(self, user_id: str, event: Dict[str, Any]) -> None:
+        """Опубликовать событие для пользователя"""
+        try:
+            self.backend.publish(self, user_id, event)
+        except Exception as e:
+            # Доставка в реальном времени не должна ломать запись уведомлений
+            logger.error(f"Failed to publish notification event for {user_id}: {e}")
+
+    def dispatch_local(self, user_id: str, event: Dict[str, Any]) -> None:
+        """Раздать событие подписчикам текущего процесса"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.deliver(event)
+            except RuntimeError:
+                # Event loop подписчика уже закрыт
+                self.unsubscribe(subscription)
+
+
+notification_broker = NotificationBroker()
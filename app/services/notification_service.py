@@ -1,9 +1,19 @@
-from typing import List, Optional
+import asyncio
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from sqlalchemy import bindparam, case, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.logger import logger
-from app.models.database import Notification
+from app.core.pagination import keyset_paginate
+from app.database.session import SessionLocal
+from app.models.database import Notification, NotificationCounter, generate_uuid
+from app.models.schemas import NotificationResponse
+from app.services.notification_broker import notification_broker
 
 
 class NotificationService:
@@ -30,103 +40,400 @@ class NotificationService:
         )
 
         self.db.add(notification)
+        self.db.flush()
+        self._adjust_unread_counters([user_id])
         self.db.commit()
         self.db.refresh(notification)
 
         logger.info(f"Created notification for user {user_id}: {title}")
+        self._publish_created([notification])
         return notification
 
+    def create_notifications_bulk(
+        self,
+        user_ids: List[str],
+        title: str,
+        message: str,
+        notification_type: str,
+        related_entity_type: Optional[str] = None,
+        related_entity_id: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Массовое создание одинаковых уведомлений для нескольких пользователей.
+
+        Все строки вставляются одним INSERT в одной транзакции.
+        Возвращает ID созданных уведомлений.
+        """
+        rows = self._insert_notifications(
+            user_ids,
+            title,
+            message,
+            notification_type,
+            related_entity_type,
+            related_entity_id,
+        )
+        return [row["id"] for row in rows]
+
+    def _insert_notifications(
+        self,
+        user_ids: List[str],
+        title: str,
+        message: str,
+        notification_type: str,
+        related_entity_type: Optional[str] = None,
+        related_entity_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Вставка уведомлений одним INSERT; возвращает вставленные строки"""
+        created_at = datetime.now(timezone.utc)
+        rows = [
+            {
+                "id": generate_uuid(),
+                "user_id": user_id,
+                "title": title,
+                "message": message,
+                "notification_type": notification_type,
+                "related_entity_type": related_entity_type,
+                "related_entity_id": related_entity_id,
+                "is_read": False,
+                "created_at": created_at,
+            }
+            for user_id in dict.fromkeys(user_ids)  # без дублей, порядок сохраняется
+        ]
+
+        if rows:
+            self.db.execute(insert(Notification), rows)
+            self._adjust_unread_counters([row["user_id"] for row in rows])
+            self.db.commit()
+            logger.info(
+                f"Created {len(rows)} '{notification_type}' notifications: {title}"
+            )
+            self._publish_created(rows)
+
+        return rows
+
+    def _publish_created(self, notifications: List[Any]) -> None:
+        """Отправить подписчикам (SSE) новые уведомления и счетчик непрочитанных"""
+        for notification in notifications:
+            user_id = (
+                notification["user_id"]
+                if isinstance(notification, dict)
+                else notification.user_id
+            )
+            if not notification_broker.has_subscribers(user_id):
+                continue
+
+            payload = NotificationResponse.model_validate(notification)
+            notification_broker.publish(
+                user_id,
+                {"type": "notification", "data": payload.model_dump(mode="json")},
+            )
+            self._publish_unread_count(user_id)
+
+    def _publish_unread_count(self, user_id: str, count: Optional[int] = None) -> None:
+        if not notification_broker.has_subscribers(user_id):
+            return
+
+        if count is None:
+            count = self.get_unread_count(user_id)
+        notification_broker.publish(
+            user_id, {"type": "unread_count", "data": {"unread_count": count}}
+        )
+
     def get_user_notifications(
         self, user_id: str, limit: int = 50, unread_only: bool = False
     ) -> List[Notification]:
         """Получение уведомлений пользователя"""
+        notifications, _ = self.get_user_notifications_page(
+            user_id, limit=limit, unread_only=unread_only
+        )
+        return notifications
+
+    def get_user_notifications_page(
+        self,
+        user_id: str,
+        limit: int = 50,
+        unread_only: bool = False,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Notification], Optional[str]]:
+        """Страница уведомлений (новые первыми) и курсор следующей"""
         query = self.db.query(Notification).filter(Notification.user_id == user_id)
 
         if unread_only:
             query = query.filter(Notification.is_read == False)
 
-        notifications = (
-            query.order_by(Notification.created_at.desc()).limit(limit).all()
+        return keyset_paginate(
+            query, Notification, cursor=cursor, limit=limit, descending=True
         )
-        return notifications
 
     def mark_as_read(self, notification_id: str, user_id: str) -> bool:
         """Отметить уведомление как прочитанное"""
-        notification = (
-            self.db.query(Notification)
-            .filter(Notification.id == notification_id, Notification.user_id == user_id)
-            .first()
-        )
+        # Условие is_read = false в самом UPDATE: из параллельных запросов
+        # строку меняет и уменьшает счетчик только один
+        updated = self.db.execute(
+            update(Notification)
+            .where(
+                Notification.id == notification_id,
+                Notification.user_id == user_id,
+                Notification.is_read == False,
+            )
+            .values(is_read=True)
+        ).rowcount
 
-        if not notification:
-            return False
+        if updated != 1:
+            # Уже прочитано или не принадлежит пользователю
+            exists = (
+                self.db.query(Notification.id)
+                .filter(
+                    Notification.id == notification_id,
+                    Notification.user_id == user_id,
+                )
+                .first()
+            )
+            self.db.commit()
+            return exists is not None
 
-        notification.is_read = True  # type: ignore
+        self._adjust_unread_counters([user_id], delta=-1)
         self.db.commit()
+        self._publish_unread_count(user_id)
         return True
 
     def mark_all_as_read(self, user_id: str) -> int:
         """Отметить все уведомления пользователя как прочитанные"""
-        result = (
-            self.db.query(Notification)
-            .filter(Notification.user_id == user_id, Notification.is_read == False)
-            .update({"is_read": True})
-        )
+        result = self.db.execute(
+            update(Notification)
+            .where(Notification.user_id == user_id, Notification.is_read == False)
+            .values(is_read=True)
+        ).rowcount
+        # Вычитаем ровно отмеченные: уведомления, созданные параллельно,
+        # остаются в счетчике
+        if result:
+            self._adjust_unread_counters([user_id], delta=-result)
 
         self.db.commit()
         logger.info(f"Marked {result} notifications as read for user {user_id}")
+        self._publish_unread_count(user_id)
         return result
 
     def get_unread_count(self, user_id: str) -> int:
-        """Получить количество непрочитанных уведомлений"""
-        count = (
+        """Получить количество непрочитанных уведомлений (из счетчика)"""
+        unread_count = (
+            self.db.query(NotificationCounter.unread_count)
+            .filter(NotificationCounter.user_id == user_id)
+            .scalar()
+        )
+        if unread_count is not None:
+            return max(unread_count, 0)
+
+        # Счетчика еще нет - считаем один раз и сохраняем
+        count = self._count_unread(user_id)
+        self._set_unread_counter(user_id, count)
+        self.db.commit()
+        return count
+
+    def _count_unread(self, user_id: str) -> int:
+        return (
             self.db.query(Notification)
             .filter(Notification.user_id == user_id, Notification.is_read == False)
             .count()
         )
 
-        return count
+    def _set_unread_counter(self, user_id: str, count: int) -> None:
+        """Установить значение счетчика (в текущей транзакции)"""
+        updated = self.db.execute(
+            update(NotificationCounter)
+            .where(NotificationCounter.user_id == user_id)
+            .values(unread_count=count)
+        ).rowcount
+        if not updated:
+            self._insert_counter(user_id, count)
+
+    def _insert_counter(self, user_id: str, count: int) -> None:
+        try:
+            with self.db.begin_nested():
+                self.db.execute(
+                    insert(NotificationCounter).values(
+                        user_id=user_id, unread_count=count
+                    )
+                )
+        except IntegrityError:
+            # Счетчик создан параллельным запросом - просто обновляем
+            self.db.execute(
+                update(NotificationCounter)
+                .where(NotificationCounter.user_id == user_id)
+                .values(unread_count=count)
+            )
+
+    def _adjust_unread_counters(self, user_ids: Iterable[str], delta: int = 1) -> None:
+        """
+        Атомарно изменить счетчики в текущей транзакции
+        (unread_count = unread_count + delta, без ухода ниже нуля).
+
+        Вызывается после flush изменений уведомлений: отсутствующие счетчики
+        инициализируются подсчетом, который уже учитывает эти изменения.
+        """
+        deltas = Counter()
+        for user_id in user_ids:
+            deltas[user_id] += delta
+        if not deltas:
+            return
+
+        existing = {
+            row.user_id
+            for row in self.db.query(NotificationCounter.user_id).filter(
+                NotificationCounter.user_id.in_(list(deltas))
+            )
+        }
+
+        new_value = NotificationCounter.unread_count + bindparam("delta")
+        to_update = [
+            {"counter_user_id": user_id, "delta": user_delta}
+            for user_id, user_delta in deltas.items()
+            if user_id in existing
+        ]
+        if to_update:
+            self.db.connection().execute(
+                update(NotificationCounter)
+                .where(NotificationCounter.user_id == bindparam("counter_user_id"))
+                .values(unread_count=case((new_value < 0, 0), else_=new_value)),
+                to_update,
+            )
+
+        missing = [user_id for user_id in deltas if user_id not in existing]
+        if missing:
+            counts = dict(
+                self.db.query(Notification.user_id, func.count(Notification.id))
+                .filter(
+                    Notification.user_id.in_(missing), Notification.is_read == False
+                )
+                .group_by(Notification.user_id)
+                .all()
+            )
+            rows = [
+                {"user_id": user_id, "unread_count": counts.get(user_id, 0)}
+                for user_id in missing
+            ]
+            try:
+                with self.db.begin_nested():
+                    self.db.execute(insert(NotificationCounter), rows)
+            except IntegrityError:
+                # Часть счетчиков создана параллельно - выставляем по одному
+                for row in rows:
+                    self._set_unread_counter(row["user_id"], row["unread_count"])
+
+    def reconcile_unread_counters(self, user_ids: Optional[List[str]] = None) -> int:
+        """
+        Сверить счетчики с фактическим COUNT(*) и исправить расхождения.
+
+        Подсчет и запись - один UPDATE с коррелированным подзапросом: между
+        ними не вклиниваются атомарные +n/-n из _adjust_unread_counters.
+        Возвращает число исправленных счетчиков.
+        """
+        actual = (
+            select(func.count(Notification.id))
+            .where(
+                Notification.user_id == NotificationCounter.user_id,
+                Notification.is_read == False,
+            )
+            .scalar_subquery()
+        )
+        fix_stmt = (
+            update(NotificationCounter)
+            .where(NotificationCounter.unread_count != actual)
+            .values(unread_count=actual)
+        )
+
+        # Пользователи с непрочитанными, у которых счетчика еще нет
+        missing = (
+            select(Notification.user_id, func.count(Notification.id))
+            .where(
+                Notification.is_read == False,
+                ~Notification.user_id.in_(select(NotificationCounter.user_id)),
+            )
+            .group_by(Notification.user_id)
+        )
+        if user_ids is not None:
+            fix_stmt = fix_stmt.where(NotificationCounter.user_id.in_(user_ids))
+            missing = missing.where(Notification.user_id.in_(user_ids))
+
+        fixed = self.db.execute(
+            fix_stmt, execution_options={"synchronize_session": False}
+        ).rowcount
+        try:
+            with self.db.begin_nested():
+                fixed += self.db.execute(
+                    insert(NotificationCounter).from_select(
+                        ["user_id", "unread_count"], missing
+                    )
+                ).rowcount
+        except IntegrityError:
+            # Счетчик создан параллельно - он уже инициализирован подсчетом
+            pass
+
+        self.db.commit()
+        if fixed:
+            logger.warning(f"Reconciled {fixed} drifted unread counters")
+        return fixed
 
     def create_review_pending_notification(
         self, goal_id: str, employee_name: str, manager_id: str
     ):
         """Создание уведомления о необходимости пройти ревью"""
-        return self.create_notification(
-            user_id=manager_id,
+        rows = self._insert_notifications(
+            user_ids=[manager_id],
             title="Ожидает ревью",
             message=f"Сотрудник {employee_name} завершил самооценку и ожидает вашего ревью",
             notification_type="review_pending",
             related_entity_type="goal",
             related_entity_id=goal_id,
         )
+        return Notification(**rows[0])
 
     def create_goal_created_notification(
         self, goal_id: str, employee_name: str, respondent_ids: List[str]
     ):
-        """Создание уведомлений для респондентов о новой цели"""
-        notifications = []
-        for respondent_id in respondent_ids:
-            notification = self.create_notification(
-                user_id=respondent_id,
-                title="Новая цель для оценки",
-                message=f"Сотрудник {employee_name} создал новую цель и просит вашей оценки",
-                notification_type="goal_created",
-                related_entity_type="goal",
-                related_entity_id=goal_id,
-            )
-            notifications.append(notification)
-
-        return notifications
+        """Создание уведомлений для респондентов о новой цели (одним INSERT)"""
+        rows = self._insert_notifications(
+            user_ids=respondent_ids,
+            title="Новая цель для оценки",
+            message=f"Сотрудник {employee_name} создал новую цель и просит вашей оценки",
+            notification_type="goal_created",
+            related_entity_type="goal",
+            related_entity_id=goal_id,
+        )
+        # Объекты собираются из вставленных строк без повторного SELECT
+        return [Notification(**row) for row in rows]
 
     def create_review_completed_notification(
         self, goal_id: str, manager_name: str, employee_id: str
     ):
         """Создание уведомления о завершении ревью"""
-        return self.create_notification(
-            user_id=employee_id,
+        rows = self._insert_notifications(
+            user_ids=[employee_id],
             title="Ревью завершено",
             message=f"Ваш руководитель {manager_name} завершил оценку вашей работы",
             notification_type="review_completed",
             related_entity_type="goal",
             related_entity_id=goal_id,
         )
+        return Notification(**rows[0])
+
+
+async def run_unread_counter_reconciliation(interval: Optional[float] = None) -> None:
+    """Фоновая периодическая сверка счетчиков непрочитанных уведомлений"""
+    interval = interval or settings.NOTIFICATION_COUNTER_RECONCILE_SECONDS
+
+    def reconcile() -> int:
+        db = SessionLocal()
+        try:
+            return NotificationService(db).reconcile_unread_counters()
+        finally:
+            db.close()
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            fixed = await asyncio.to_thread(reconcile)
+            if fixed:
+                logger.info(f"Reconciled {fixed} unread notification counters")
+        except Exception as e:
+            logger.error(f"Unread counter reconciliation failed: {e}")
@@ -0,0 +1,304 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import (
+    Integer,
+    case,
+    delete,
+    event,
+    func,
+    insert,
+    inspect,
+    literal,
+    or_,
+    select,
+    true,
+)
+from sqlalchemy.orm import Query, Session, aliased
+
+from app.models.database import Goal, GoalAnalyticsSnapshot, OrgHierarchy, User
+from app.services.goal_queries import goal_query
+
+# Ограничение глубины при перестроении (защита от циклов в manager_id)
+MAX_HIERARCHY_DEPTH = 64
+
+_closure = OrgHierarchy.__table__
+_users = User.__table__
+_COLUMNS = ["ancestor_id", "descendant_id", "depth"]
+
+
+def _insert_node(connection, user_id: str, manager_id: Optional[str]) -> None:
+    connection.execute(
+        insert(_closure).values(ancestor_id=user_id, descendant_id=user_id, depth=0)
+    )
+    if manager_id is not None:
+        connection.execute(
+            insert(_closure).from_select(
+                _COLUMNS,
+                select(
+                    _closure.c.ancestor_id,
+                    literal(user_id),
+                    _closure.c.depth + 1,
+                ).where(_closure.c.descendant_id == manager_id),
+            )
+        )
+
+
+def _move_subtree(connection, user_id: str, manager_id: Optional[str]) -> None:
+    has_node = connection.execute(
+        select(_closure.c.depth).where(
+            _closure.c.ancestor_id == user_id, _closure.c.descendant_id == user_id
+        )
+    ).first()
+    if not has_node:
+        # Пользователь создан до появления таблицы
+        _insert_node(connection, user_id, manager_id)
+        return
+
+    # Отрываем поддерево от прежних руководителей...
+    subtree = select(_closure.c.descendant_id).where(_closure.c.ancestor_id == user_id)
+    old_ancestors = select(_closure.c.ancestor_id).where(
+        _closure.c.descendant_id == user_id, _closure.c.ancestor_id != user_id
+    )
+    connection.execute(
+        delete(_closure).where(
+            _closure.c.descendant_id.in_(subtree),
+            _closure.c.ancestor_id.in_(old_ancestors),
+        )
+    )
+    if manager_id is None:
+        return
+
+    # ...и связываем со всеми руководителями нового (декартово произведение)
+    sup = _closure.alias("sup")
+    sub = _closure.alias("sub")
+    connection.execute(
+        insert(_closure).from_select(
+            _COLUMNS,
+            select(
+                sup.c.ancestor_id, sub.c.descendant_id, sup.c.depth + sub.c.depth + 1
+            )
+            .select_from(sup.join(sub, true()))
+            .where(sup.c.descendant_id == manager_id, sub.c.ancestor_id == user_id),
+        )
+    )
+
+
+def rebuild_org_hierarchy(connection) -> int:
+    """
+    Перестроить org_hierarchy по users.manager_id одним рекурсивным запросом.
+
+    Нужен для баз, заполненных до появления таблицы или в обход ORM.
+    Возвращает число строк замыкания.
+    """
+    child = _users.alias("child")
+    tree = select(
+        _users.c.id.label("ancestor_id"),
+        _users.c.id.label("descendant_id"),
+        literal(0, Integer).label("depth"),
+    ).cte("tree", recursive=True)
+    tree = tree.union_all(
+        select(tree.c.ancestor_id, child.c.id, tree.c.depth + 1).where(
+            child.c.manager_id == tree.c.descendant_id,
+            tree.c.depth < MAX_HIERARCHY_DEPTH,
+        )
+    )
+
+    connection.execute(delete(_closure))
+    connection.execute(
+        insert(_closure).from_select(
+            _COLUMNS,
+            select(
+                tree.c.ancestor_id, tree.c.descendant_id, func.min(tree.c.depth)
+            ).group_by(tree.c.ancestor_id, tree.c.descendant_id),
+        )
+    )
+    return connection.execute(select(func.count()).select_from(_closure)).scalar()
+
+
+class OrgHierarchyService:
+    """
+    Оргструктура целиком: все уровни подчинения одним запросом по org_hierarchy.
+
+    Таблица поддерживается событиями маппера User (регистрация,
+    назначение руководителя, удаление) в той же транзакции.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def is_in_subtree(self, root_id: str, user_id: str) -> bool:
+        """Входит ли user_id в поддерево root_id (включая сам root_id)"""
+        return (
+            self.db.query(OrgHierarchy.depth)
+            .filter(
+                OrgHierarchy.ancestor_id == root_id,
+                OrgHierarchy.descendant_id == user_id,
+            )
+            .first()
+            is not None
+        )
+
+    def get_subtree_users(
+        self, manager_id: str, max_depth: Optional[int] = None
+    ) -> List[Tuple[User, int]]:
+        """Все подчиненные руководителя с уровнем подчинения"""
+        query = (
+            self.db.query(User, OrgHierarchy.depth)
+            .join(OrgHierarchy, OrgHierarchy.descendant_id == User.id)
+            .filter(OrgHierarchy.ancestor_id == manager_id, OrgHierarchy.depth >= 1)
+        )
+        if max_depth is not None:
+            query = query.filter(OrgHierarchy.depth <= max_depth)
+        return query.order_by(OrgHierarchy.depth, User.full_name).all()  # type: ignore
+
+    def subtree_goals_query(
+        self, manager_id: str, max_depth: Optional[int] = None
+    ) -> Query:
+        """Запрос целей всех подчиненных руководителя (без сортировки)"""
+        query = (
+            goal_query(self.db, relations=("employee", "steps"))
+            .join(OrgHierarchy, OrgHierarchy.descendant_id == Goal.employee_id)
+            .filter(OrgHierarchy.ancestor_id == manager_id, OrgHierarchy.depth >= 1)
+        )
+        if max_depth is not None:
+            query = query.filter(OrgHierarchy.depth <= max_depth)
+        return query
+
+    def get_subtree_goals(
+        self, manager_id: str, max_depth: Optional[int] = None
+    ) -> List[Goal]:
+        """Цели всех подчиненных руководителя"""
+        return (
+            self.subtree_goals_query(manager_id, max_depth)
+            .order_by(Goal.created_at, Goal.id)
+            .all()
+        )
+
+    def get_goals_without_fresh_analytics(self, manager_id: str) -> List[Goal]:
+        """Цели поддерева без снимка аналитики или с устаревшим снимком"""
+        return (
+            self.db.query(Goal)
+            .join(OrgHierarchy, OrgHierarchy.descendant_id == Goal.employee_id)
+            .outerjoin(GoalAnalyticsSnapshot, GoalAnalyticsSnapshot.goal_id == Goal.id)
+            .filter(
+                OrgHierarchy.ancestor_id == manager_id,
+                OrgHierarchy.depth >= 1,
+                or_(
+                    GoalAnalyticsSnapshot.goal_id.is_(None),
+                    GoalAnalyticsSnapshot.is_stale == True,
+                ),
+            )
+            .all()
+        )
+
+    def get_analytics_rollup(self, manager_id: str) -> Dict[str, Any]:
+        """
+        Сводка по оргструктуре руководителя из снимков аналитики целей.
+
+        Один запрос: команды прямых подчиненных (каждая - поддерево
+        подчиненного), итог по всей структуре суммируется из команд.
+        """
+        head = aliased(OrgHierarchy)
+        member = aliased(OrgHierarchy)
+        snapshot = GoalAnalyticsSnapshot
+
+        rows = (
+            self.db.query(
+                head.descendant_id,
+                User.full_name,
+                func.count(func.distinct(member.descendant_id)),
+                func.count(Goal.id),
+                func.sum(case((Goal.status == "completed", 1), else_=0)),
+                func.count(snapshot.goal_id),
+                func.sum(case((snapshot.is_stale == True, 1), else_=0)),
+                func.sum(snapshot.total_score),
+            )
+            .select_from(head)
+            .join(User, User.id == head.descendant_id)
+            .join(member, member.ancestor_id == head.descendant_id)
+            .outerjoin(Goal, Goal.employee_id == member.descendant_id)
+            .outerjoin(snapshot, snapshot.goal_id == Goal.id)
+            .filter(head.ancestor_id == manager_id, head.depth == 1)
+            .group_by(head.descendant_id, User.full_name)
+            .order_by(User.full_name)
+            .all()
+        )
+
+        teams = []
+        for (
+            head_id,
+            full_name,
+            employees,
+            goals,
+            completed,
+            analyzed,
+            stale,
+            score_sum,
+        ) in rows:
+            teams.append(
+                {
+                    "user_id": head_id,
+                    "full_name": full_name,
+                    "employees": employees,
+                    "goals": goals,
+                    "completed_goals": completed or 0,
+                    "analyzed_goals": analyzed,
+                    "stale_goals": stale or 0,
+                    "score_sum": score_sum or 0.0,
+                }
+            )
+
+        total = {
+            "user_id": manager_id,
+            "full_name": None,
+            **{
+                key: sum(team[key] for team in teams)
+                for key in (
+                    "employees",
+                    "goals",
+                    "completed_goals",
+                    "analyzed_goals",
+                    "stale_goals",
+                    "score_sum",
+                )
+            },
+        }
+        for entry in [total, *teams]:
+            score_sum = entry.pop("score_sum")
+            entry["average_score"] = (
+                round(score_sum / entry["analyzed_goals"], 2)
+                if entry["analyzed_goals"]
+                else None
+            )
+
+        return {"manager_id": manager_id, "total": total, "teams": teams}
+
+
+def _manager_changed(target: User) -> bool:
+    attrs = inspect(target).attrs
+    return attrs.manager_id.history.has_changes() or attrs.manager.history.has_changes()
+
+
+def _on_user_insert(mapper, connection, target):
+    _insert_node(connection, target.id, target.manager_id)
+
+
+def _on_user_update(mapper, connection, target):
+    if _manager_changed(target):
+        _move_subtree(connection, target.id, target.manager_id)
+
+
+def _on_user_delete(mapper, connection, target):
+    connection.execute(
+        delete(_closure).where(
+            or_(
+                _closure.c.ancestor_id == target.id,
+                _closure.c.descendant_id == target.id,
+            )
+        )
+    )
+
+
+event.listen(User, "after_insert", _on_user_insert)
+event.listen(User, "after_update", _on_user_update)
+event.listen(User, "before_delete", _on_user_delete)
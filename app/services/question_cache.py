@@ -0,0 +1,162 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Mapping, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.models.database import QuestionTemplate
+from app.services.question_options import (
+    EMPTY_OPTION_SCORES,
+    InvalidOptionsError,
+    parse_option_scores,
+)
+
+
+@dataclass(frozen=True)
+class CachedQuestion:
+    """Неизменяемый снимок шаблона вопроса (не привязан к сессии БД)"""
+
+    id: str
+    question_text: str
+    question_type: str
+    section: Optional[str]
+    weight: float
+    max_score: int
+    order_index: int
+    trigger_words: Optional[str]
+    options_json: Optional[str]
+    requires_manager_scoring: bool
+    is_active: bool
+    # {id варианта: балл}, разобранный options_json
+    option_scores: Mapping[str, float] = field(
+        default_factory=lambda: EMPTY_OPTION_SCORES, compare=False
+    )
+
+    @classmethod
+    def from_model(cls, question: QuestionTemplate) -> "CachedQuestion":
+        return cls(
+            id=question.id,  # type: ignore
+            question_text=question.question_text,  # type: ignore
+            question_type=question.question_type,  # type: ignore
+            section=question.section,  # type: ignore
+            weight=question.weight if question.weight is not None else 1.0,  # type: ignore
+            max_score=question.max_score if question.max_score is not None else 5,  # type: ignore
+            order_index=question.order_index or 0,  # type: ignore
+            trigger_words=question.trigger_words,  # type: ignore
+            options_json=question.options_json,  # type: ignore
+            requires_manager_scoring=bool(question.requires_manager_scoring),
+            is_active=bool(question.is_active),
+            option_scores=_option_scores(question),
+        )
+
+
+def _option_scores(question: QuestionTemplate) -> Mapping[str, float]:
+    try:
+        return parse_option_scores(question.options_json)  # type: ignore
+    except InvalidOptionsError as e:
+        # Записано в обход проверки; выбор любого варианта будет ошибкой
+        logger.error(f"Question template {question.id}: {e}")
+        return EMPTY_OPTION_SCORES
+
+
+class QuestionTemplateCache:
+    """
+    Версионированный in-process кэш активных шаблонов вопросов.
+
+    Все активные шаблоны загружаются одним запросом. Любая запись в
+    question_templates через ORM (эндпоинты, админка, скрипты) увеличивает
+    версию, и следующее обращение перезагружает кэш.
+    """
+
+    def __init__(self, max_age_seconds: float = 300.0):
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._version = 0
+        self._loaded_version = -1
+        self._loaded_at = 0.0
+        self._questions: Dict[str, CachedQuestion] = {}
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self) -> None:
+        """Сбросить кэш (следующее обращение перезагрузит шаблоны)"""
+        with self._lock:
+            self._version += 1
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._loaded_version == self._version
+            and time.monotonic() - self._loaded_at < self.max_age_seconds
+        )
+
+    def _load(self, db: Session) -> None:
+        version = self._version
+        questions = (
+            db.query(QuestionTemplate).filter(QuestionTemplate.is_active == True).all()
+        )
+        snapshot = {q.id: CachedQuestion.from_model(q) for q in questions}
+
+        with self._lock:
+            self._questions = snapshot  # type: ignore
+            self._loaded_version = version
+            self._loaded_at = time.monotonic()
+
+        logger.debug(
+            f"Question template cache loaded: {len(snapshot)} templates (v{version})"
+        )
+
+    def get_all(self, db: Session) -> Dict[str, CachedQuestion]:
+        """Все активные шаблоны, {question_id: CachedQuestion}"""
+        if not self._is_fresh():
+            self._load(db)
+        return self._questions
+
+    def get(self, db: Session, question_id: str) -> Optional[CachedQuestion]:
+        """Получить активный шаблон по ID"""
+        return self.get_all(db).get(question_id)
+
+
+question_cache = QuestionTemplateCache(
+    max_age_seconds=settings.QUESTION_CACHE_TTL_SECONDS
+)
+
+
+_DIRTY_KEY = "question_templates_dirty"
+
+
+def _on_question_template_write(mapper, connection, target):
+    question_cache.invalidate()
+    session = Session.object_session(target)
+    if session is not None:
+        session.info[_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _on_session_end(session):
+    # Повторный сброс после коммита/отката: кэш мог быть перезагружен
+    # между flush и commit и увидеть незакоммиченное состояние
+    if session.info.pop(_DIRTY_KEY, False):
+        question_cache.invalidate()
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_bulk_write(orm_execute_state):
+    # Массовые query(...).update()/delete() и insert(QuestionTemplate)
+    # не вызывают событий маппера
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is QuestionTemplate:
+        question_cache.invalidate()
+        orm_execute_state.session.info[_DIRTY_KEY] = True
+
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(QuestionTemplate, _event_name, _on_question_template_write)
@@ -0,0 +1,57 @@
+from types import MappingProxyType
+from typing import List, Mapping, Optional
+
+from pydantic import TypeAdapter
+from sqlalchemy import event
+
+from app.core import json_codec
+from app.models.database import QuestionTemplate
+from app.models.schemas import QuestionOption
+
+EMPTY_OPTION_SCORES: Mapping[str, float] = MappingProxyType({})
+
+_options_adapter = TypeAdapter(List[QuestionOption])
+
+
+class InvalidOptionsError(ValueError):
+    """Некорректный options_json шаблона вопроса"""
+
+
+class InvalidOptionError(ValueError):
+    """Выбран вариант ответа, которого нет в шаблоне вопроса"""
+
+    def __init__(self, question_id: str, option_id: str):
+        self.question_id = question_id
+        self.option_id = option_id
+        super().__init__(f"Invalid option '{option_id}' for question {question_id}")
+
+
+def parse_option_scores(options_json: Optional[str]) -> Mapping[str, float]:
+    """
+    Разобрать options_json в неизменяемый словарь {id варианта: балл}.
+
+    Некорректный JSON, схема вариантов или повторяющиеся id -
+    InvalidOptionsError.
+    """
+    if not options_json:
+        return EMPTY_OPTION_SCORES
+    try:
+        options = _options_adapter.validate_python(json_codec.loads(options_json))
+    except ValueError as e:
+        raise InvalidOptionsError(f"Invalid options_json: {e}") from e
+
+    scores = {}
+    for option in options:
+        if option.id in scores:
+            raise InvalidOptionsError(f"Duplicate option id: {option.id}")
+        scores[option.id] = option.value
+    return MappingProxyType(scores)
+
+
+def _validate_template_options(mapper, connection, target):
+    # Любая запись шаблона (API, админка, скрипты) проходит проверку вариантов
+    parse_option_scores(target.options_json)
+
+
+for _event_name in ("before_insert", "before_update"):
+    event.listen(QuestionTemplate, _event_name, _validate_template_options)
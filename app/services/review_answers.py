@@ -0,0 +1,165 @@
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core import json_codec
+from app.core.config import settings
+from app.core.logger import logger
+from app.models.database import RespondentReview, Review, ReviewAnswer
+from app.models.schemas import Answer, ReviewType
+
+
+# JSON-поле Review, в котором хранятся ответы для каждого типа оценки
+ANSWER_COLUMNS = {
+    ReviewType.SELF.value: "self_evaluation_answers",
+    ReviewType.MANAGER.value: "manager_evaluation_answers",
+    ReviewType.POTENTIAL.value: "potential_evaluation_answers",
+}
+
+
+def _dump(answers: List[Answer]) -> str:
+    return json_codec.dumps([answer.model_dump() for answer in answers])
+
+
+def _load(raw: Optional[str]) -> List[Answer]:
+    if not raw:
+        return []
+    return [Answer(**data) for data in json_codec.loads(raw)]
+
+
+def _to_rows(
+    answers: List[Answer], review_type: str, goal_id: str
+) -> List[ReviewAnswer]:
+    return [
+        ReviewAnswer(
+            goal_id=goal_id,
+            review_type=review_type,
+            question_id=answer.question_id,
+            position=position,
+            score=answer.score,
+            selected_option=answer.selected_option,
+            answer_text=answer.answer,
+        )
+        for position, answer in enumerate(answers)
+    ]
+
+
+def _to_answer(row: ReviewAnswer) -> Answer:
+    return Answer(
+        question_id=row.question_id,  # type: ignore
+        answer=row.answer_text,  # type: ignore
+        score=row.score,  # type: ignore
+        selected_option=row.selected_option,  # type: ignore
+    )
+
+
+def set_review_answers(review: Review, answers: List[Answer]) -> None:
+    """
+    Записать ответы оценки.
+
+    Источник данных - review_answers; JSON-поле заполняется параллельно,
+    пока на него завязаны старые клиенты и админка.
+    """
+    column = ANSWER_COLUMNS.get(review.review_type)  # type: ignore
+    if column:
+        setattr(review, column, _dump(answers))
+    review.answer_rows = _to_rows(answers, review.review_type, review.goal_id)  # type: ignore
+
+
+def set_respondent_answers(
+    resp_review: RespondentReview, answers: List[Answer]
+) -> None:
+    """Записать ответы респондента (review_answers + JSON-поле)"""
+    resp_review.answers = _dump(answers)  # type: ignore
+    resp_review.answer_rows = _to_rows(  # type: ignore
+        answers, ReviewType.RESPONDENT.value, resp_review.goal_id  # type: ignore
+    )
+
+
+def get_review_answers(review: Review) -> List[Answer]:
+    """Ответы оценки в порядке их отправки"""
+    if review.answer_rows:
+        return [_to_answer(row) for row in review.answer_rows]
+    # Оценка еще не перенесена в review_answers
+    column = ANSWER_COLUMNS.get(review.review_type)  # type: ignore
+    return _load(getattr(review, column)) if column else []
+
+
+def get_respondent_answers(resp_review: RespondentReview) -> List[Answer]:
+    """Ответы респондента в порядке их отправки"""
+    if resp_review.answer_rows:
+        return [_to_answer(row) for row in resp_review.answer_rows]
+    return _load(resp_review.answers)  # type: ignore
+
+
+def update_answer_scores(
+    review: Review, scores: List[Answer], sync_legacy_json: Optional[bool] = None
+) -> List[Answer]:
+    """
+    Проставить баллы отдельным вопросам оценки.
+
+    Меняются только строки review_answers указанных вопросов; JSON-поле
+    переписывается лишь при sync_legacy_json (по умолчанию
+    REVIEW_ANSWERS_SYNC_LEGACY_JSON). Возвращает все ответы оценки.
+    """
+    if not review.answer_rows:
+        # Оценка еще не перенесена в review_answers
+        review.answer_rows = _to_rows(  # type: ignore
+            get_review_answers(review), review.review_type, review.goal_id  # type: ignore
+        )
+
+    new_scores = {score.question_id: score.score for score in scores}
+    for row in review.answer_rows:
+        if row.question_id in new_scores:
+            row.score = new_scores[row.question_id]  # type: ignore
+
+    answers = [_to_answer(row) for row in review.answer_rows]
+    if sync_legacy_json is None:
+        sync_legacy_json = settings.REVIEW_ANSWERS_SYNC_LEGACY_JSON
+    column = ANSWER_COLUMNS.get(review.review_type)  # type: ignore
+    if sync_legacy_json and column:
+        setattr(review, column, _dump(answers))
+    return answers
+
+
+def backfill_review_answers(db: Session, batch_size: int = 500) -> int:
+    """
+    Перенести ответы из JSON-полей в review_answers.
+
+    Обрабатывает только оценки без строк в review_answers, поэтому
+    безопасен для повторного запуска. Возвращает число перенесенных оценок.
+    """
+    migrated = 0
+    for model, load_answers, store_answers in (
+        (Review, get_review_answers, set_review_answers),
+        (RespondentReview, get_respondent_answers, set_respondent_answers),
+    ):
+        last_id = ""
+        while True:
+            batch = (
+                db.query(model)
+                .filter(model.id > last_id, ~model.answer_rows.any())
+                .order_by(model.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not batch:
+                break
+
+            for item in batch:
+                try:
+                    answers = load_answers(item)
+                except (TypeError, ValueError) as e:
+                    logger.error(
+                        f"Cannot parse answers of {model.__name__} {item.id}: {e}"
+                    )
+                    continue
+                if answers:
+                    store_answers(item, answers)
+                    migrated += 1
+
+            last_id = batch[-1].id
+            db.commit()
+            logger.info(f"Backfilled review_answers up to {model.__name__} {last_id}")
+
+    return migrated
@@ -0,0 +1,297 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core import json_codec
+from app.core.logger import logger
+from app.core.metrics import scoring_duration_seconds
+from app.models.database import GoalAnalyticsSnapshot, Review, ReviewAnswer
+from app.models.schemas import ReviewType
+from app.services.calibration_service import calibration_cache
+from app.services.question_cache import CachedQuestion, question_cache
+
+# Разделы потенциала и их доли в итоговом балле (как в calculate_potential_score)
+POTENTIAL_SECTIONS = (("professional", 0.4), ("personal", 0.3), ("development", 0.3))
+
+SCORED_REVIEW_TYPES = (
+    ReviewType.SELF.value,
+    ReviewType.MANAGER.value,
+    ReviewType.POTENTIAL.value,
+)
+
+
+@dataclass
+class RescoreResult:
+    """Итог пересчета"""
+
+    reviews: int = 0  # просмотрено оценок
+    updated: int = 0  # оценок с изменившимся баллом
+    answers: int = 0
+    invalid_options: int = 0  # ответов с вариантом, которого нет в шаблоне
+
+
+class _TemplateArrays:
+    """
+    Параметры активных шаблонов в виде массивов, индекс - номер шаблона.
+
+    Последний элемент - заглушка для неактивных и удаленных вопросов
+    (max_score=0, такие ответы не учитываются).
+    """
+
+    def __init__(self, questions: Dict[str, CachedQuestion]):
+        items = list(questions.values())
+        self.index = {question.id: i for i, question in enumerate(items)}
+        self.missing = len(items)
+        sections = [name for name, _ in POTENTIAL_SECTIONS]
+
+        self.weight = np.array([q.weight for q in items] + [0.0], dtype=np.float64)
+        self.max_score = np.array([q.max_score for q in items] + [0], dtype=np.float64)
+        self.requires_manager = np.array(
+            [q.requires_manager_scoring for q in items] + [False], dtype=bool
+        )
+        self.has_options = np.array(
+            [bool(q.options_json) for q in items] + [False], dtype=bool
+        )
+        self.section = np.array(
+            [sections.index(q.section) if q.section in sections else -1 for q in items]
+            + [-1],
+            dtype=np.int64,
+        )
+        self.option_values = self._option_values(items)
+
+    @staticmethod
+    def _option_values(items: List[CachedQuestion]) -> Dict[Tuple[str, str], float]:
+        return {
+            (question.id, option_id): value
+            for question in items
+            for option_id, value in question.option_scores.items()
+        }
+
+    def lookup(self, question_ids: List[str]) -> np.ndarray:
+        """Номера шаблонов для ответов"""
+        return _map_values(question_ids, self.index, self.missing)
+
+
+def _map_values(keys: List[str], index: Dict[str, int], default: int) -> np.ndarray:
+    return np.fromiter(
+        (index.get(key, default) for key in keys), dtype=np.int64, count=len(keys)
+    )
+
+
+def _weighted_average(
+    review_pos: np.ndarray,
+    weights: np.ndarray,
+    values: np.ndarray,
+    used: np.ndarray,
+    n: int,
+) -> np.ndarray:
+    """Средневзвешенное values по оценкам (0 - нет учтенных ответов)"""
+    # bincount суммирует в порядке ответов, как цикл в ReviewService
+    totals = np.bincount(
+        review_pos, weights=np.where(used, values * weights, 0.0), minlength=n + 1
+    )[:n]
+    total_weights = np.bincount(
+        review_pos, weights=np.where(used, weights, 0.0), minlength=n + 1
+    )[:n]
+    return np.divide(totals, total_weights, out=np.zeros(n), where=total_weights > 0)
+
+
+class ReviewRescoringService:
+    """
+    Массовый пересчет Review.calculated_score после изменения весов,
+    max_score или вариантов ответов в шаблонах вопросов.
+
+    Ответы пачки оценок загружаются одним запросом в массивы NumPy, баллы
+    считаются векторно по правилам ReviewService и записываются одним
+    bulk UPDATE на пачку. Оценки без строк в review_answers пропускаются
+    (сначала запустите backfill_review_answers.py).
+    """
+
+    def __init__(self, db: Session, batch_size: int = 5000):
+        self.db = db
+        self.batch_size = batch_size
+
+    @scoring_duration_seconds.timed(operation="batch_rescore")
+    def rescore(self, question_ids: Optional[Iterable[str]] = None) -> RescoreResult:
+        """
+        Пересчитать оценки, в ответах которых есть указанные вопросы
+        (без question_ids - все оценки)
+        """
+        templates = _TemplateArrays(question_cache.get_all(self.db))
+        question_ids = list(question_ids) if question_ids is not None else None
+        result = RescoreResult()
+
+        last_id = ""
+        while True:
+            batch = self._load_reviews(last_id, question_ids)
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            answers = self._load_answers(batch[0][0], last_id)
+            updates, invalid_options = self._score_batch(templates, batch, answers)
+
+            if updates:
+                self.db.execute(update(Review), updates)
+                goal_ids = {row[0]: row[2] for row in batch}
+                self._mark_snapshots_stale({goal_ids[row["id"]] for row in updates})
+            self.db.commit()
+
+            result.reviews += len(batch)
+            result.updated += len(updates)
+            result.answers += len(answers)
+            result.invalid_options += invalid_options
+
+        if result.invalid_options:
+            logger.warning(
+                f"Rescoring skipped {result.invalid_options} answers "
+                f"with unknown options"
+            )
+        if result.updated:
+            # bulk UPDATE не вызывает событий маппера Review
+            calibration_cache.clear()
+        logger.info(
+            f"Rescored reviews: {result.updated} updated of {result.reviews} "
+            f"({result.answers} answers)"
+        )
+        return result
+
+    def _load_reviews(self, last_id: str, question_ids: Optional[List[str]]) -> List:
+        query = (
+            select(
+                Review.id, Review.review_type, Review.goal_id, Review.calculated_score
+            )
+            .where(
+                Review.id > last_id,
+                Review.review_type.in_(SCORED_REVIEW_TYPES),
+                Review.answer_rows.any(),
+            )
+            .order_by(Review.id)
+            .limit(self.batch_size)
+        )
+        if question_ids is not None:
+            query = query.where(
+                select(ReviewAnswer.id)
+                .where(
+                    ReviewAnswer.review_id == Review.id,
+                    ReviewAnswer.question_id.in_(question_ids),
+                )
+                .exists()
+            )
+        return list(self.db.execute(query))
+
+    def _load_answers(self, first_id: str, last_id: str) -> List:
+        # Диапазон id пачки вместо IN по тысячам id; лишние оценки из
+        # диапазона отсеиваются при сопоставлении с пачкой
+        query = (
+            select(
+                ReviewAnswer.review_id,
+                ReviewAnswer.question_id,
+                ReviewAnswer.score,
+                ReviewAnswer.selected_option,
+            )
+            .where(
+                ReviewAnswer.review_id >= first_id, ReviewAnswer.review_id <= last_id
+            )
+            .order_by(ReviewAnswer.review_id, ReviewAnswer.position)
+        )
+        return list(self.db.execute(query))
+
+    def _score_batch(
+        self, templates: _TemplateArrays, batch: List, answers: List
+    ) -> Tuple[List[dict], int]:
+        n = len(batch)
+        positions = {row[0]: i for i, row in enumerate(batch)}
+        review_pos = _map_values([row[0] for row in answers], positions, n)
+        q = templates.lookup([row[1] for row in answers])
+        scores = np.array(
+            [np.nan if row[2] is None else row[2] for row in answers],
+            dtype=np.float64,
+        )
+        selected = np.array([bool(row[3]) for row in answers], dtype=bool)
+        options = np.array(
+            [
+                (
+                    templates.option_values.get((row[1], row[3]), np.nan)
+                    if row[3]
+                    else np.nan
+                )
+                for row in answers
+            ],
+            dtype=np.float64,
+        )
+
+        weight = templates.weight[q]
+        max_score = templates.max_score[q]
+        requires_manager = templates.requires_manager[q]
+        section = templates.section[q]
+        # Ответы чужих оценок из диапазона id попадают в лишнюю ячейку n
+        valid = (review_pos < n) & (max_score != 0)
+        safe_max = np.where(valid, max_score, 1.0)
+        has_score = ~np.isnan(scores)
+
+        # Ветки calculate_weighted_score: балл руководителя, обычный балл,
+        # вариант ответа
+        use_score = valid & has_score & (requires_manager | (max_score > 0))
+        option_branch = (
+            valid
+            & ~requires_manager
+            & ~((max_score > 0) & has_score)
+            & templates.has_options[q]
+            & selected
+        )
+        # ReviewService считает такой ответ ошибкой, здесь он только пропускается
+        invalid_options = option_branch & np.isnan(options)
+        use_option = option_branch & ~invalid_options
+        values = np.where(use_score, scores, options) / safe_max * 5.0
+        weighted = _weighted_average(
+            review_pos, weight, values, use_score | use_option, n
+        ).tolist()
+
+        # Разделы calculate_potential_score
+        normalized = np.where(has_score, scores, 0.0) / safe_max * 5.0
+        section_averages = [
+            _weighted_average(
+                review_pos, weight, normalized, valid & has_score & (section == i), n
+            ).tolist()
+            for i in range(len(POTENTIAL_SECTIONS))
+        ]
+
+        updates = []
+        for i, (review_id, review_type, _, current) in enumerate(batch):
+            row = {"id": review_id, "calculated_score": weighted[i]}
+            if review_type == ReviewType.POTENTIAL.value:
+                row.update(
+                    self._potential_values(
+                        [averages[i] for averages in section_averages], weighted[i]
+                    )
+                )
+            if row["calculated_score"] != current:
+                updates.append(row)
+        return updates, int(invalid_options.sum())
+
+    @staticmethod
+    def _potential_values(averages: List[float], performance: float) -> dict:
+        total = 0.0
+        for average, (_, share) in zip(averages, POTENTIAL_SECTIONS):
+            total += average * share
+        total = round(total * 2.0, 2)
+        details = {
+            f"{name}_score": round(average * 2.0, 2)
+            for average, (name, _) in zip(averages, POTENTIAL_SECTIONS)
+        }
+        details["total_potential_score"] = total
+        details["performance_score"] = performance
+        return {
+            "calculated_score": total,
+            "manager_feedback": json_codec.dumps(details),
+        }
+
+    def _mark_snapshots_stale(self, goal_ids) -> None:
+        self.db.execute(
+            update(GoalAnalyticsSnapshot)
+            .where(GoalAnalyticsSnapshot.goal_id.in_(goal_ids))
+            .values(is_stale=True)
+        )
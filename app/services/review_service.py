@@ -1,27 +1,51 @@
-import json
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
 
 from sqlalchemy.orm import Session
 
 from app.core.logger import logger
-from app.models.database import QuestionTemplate, Review
-from app.models.schemas import Answer, ReviewType
+from app.core.metrics import scoring_duration_seconds
+from app.models.database import Review
+from app.models.schemas import Answer
+from app.services.question_cache import CachedQuestion, question_cache
+from app.services.question_options import InvalidOptionError
+from app.services.review_answers import get_review_answers
+from app.services.trigger_matcher import trigger_matcher_cache
+
+
+# Рекомендации по категориям триггерных слов
+TRIGGER_RECOMMENDATIONS = {
+    "problem": [
+        "Рекомендуется тренировка навыков решения сложных задач",
+        "Развитие стрессоустойчивости и адаптивности",
+    ],
+    "communication": [
+        "Улучшение навыков коммуникации и работы в команде",
+        "Тренировка презентационных навыков",
+    ],
+    "leadership": [
+        "Развитие лидерских качеств и управления командой",
+        "Обучение делегированию задач",
+    ],
+    "development": [
+        "Разработка индивидуального плана развития",
+        "Участие в программах менторства",
+    ],
+    "success": [
+        "Развитие навыков управления успешными проектами",
+        "Обучение стратегическому планированию",
+    ],
+}
 
 
 class ReviewService:
     def __init__(self, db: Session):
         self.db = db
 
-    def get_question_by_id(self, question_id: str) -> QuestionTemplate:
-        """Получение вопроса по ID"""
-        return (
-            self.db.query(QuestionTemplate)
-            .filter(
-                QuestionTemplate.id == question_id, QuestionTemplate.is_active == True
-            )
-            .first()
-        )  # type: ignore
+    def get_question_by_id(self, question_id: str) -> Optional[CachedQuestion]:
+        """Получение активного вопроса по ID (из кэша шаблонов)"""
+        return question_cache.get(self.db, question_id)
 
+    @scoring_duration_seconds.timed(operation="weighted_score")
     def calculate_weighted_score(
         self, answers: List[Answer], review_type: str
     ) -> float:
@@ -49,7 +73,7 @@ class ReviewService:
                 else:
                     # Ожидаем оценку руководителя - не учитываем
                     pending_manager_scores += 1
-                    logger.info(f"Pending manager score for question {question.id}")
+                    logger.debug(f"Pending manager score for question {question.id}")
 
             # ОБЫЧНЫЕ ВОПРОСЫ С ОЦЕНКОЙ
             elif question.max_score > 0 and answer.score is not None:  # type: ignore
@@ -60,10 +84,9 @@ class ReviewService:
             # ВОПРОСЫ С ВАРИАНТАМИ ОТВЕТОВ
             elif question.options_json and answer.selected_option:  # type: ignore
                 option_score = self._get_option_score(question, answer.selected_option)
-                if option_score is not None:
-                    normalized_score = (option_score / question.max_score) * 5.0
-                    total_weighted_score += normalized_score * question.weight
-                    total_weight += question.weight
+                normalized_score = (option_score / question.max_score) * 5.0
+                total_weighted_score += normalized_score * question.weight
+                total_weight += question.weight
 
         # Логируем предупреждение о неоцененных вопросах
         if pending_manager_scores > 0:
@@ -80,28 +103,18 @@ class ReviewService:
             return []
 
         pending_questions = []
-        answers_data = []
-
-        # Получаем ответы в зависимости от типа оценки
-        if review.review_type == ReviewType.SELF and review.self_evaluation_answers:  # type: ignore
-            answers_data = json.loads(review.self_evaluation_answers)  # type: ignore
-        elif review.review_type == ReviewType.MANAGER and review.manager_evaluation_answers:  # type: ignore
-            answers_data = json.loads(review.manager_evaluation_answers)  # type: ignore
-        elif review.review_type == ReviewType.RESPONDENT and hasattr(review, "answers"):  # type: ignore
-            answers_data = json.loads(review.answers)  # type: ignore
-        for answer_data in answers_data:
-            question = self.get_question_by_id(answer_data.get("question_id"))
+
+        for answer in get_review_answers(review):
+            question = self.get_question_by_id(answer.question_id)
             if (
-                question
-                and question.requires_manager_scoring
-                and answer_data.get("score") is None
+                question and question.requires_manager_scoring and answer.score is None
             ):  # type: ignore
 
                 pending_questions.append(
                     {
                         "question_id": question.id,
                         "question_text": question.question_text,
-                        "answer_text": answer_data.get("answer", ""),
+                        "answer_text": answer.answer or "",
                         "max_score": question.max_score,
                         "weight": question.weight,
                         "section": question.section,
@@ -118,6 +131,7 @@ class ReviewService:
         """Основной метод расчета баллов (для обратной совместимости)"""
         return self.calculate_weighted_score(answers, review_type)
 
+    @scoring_duration_seconds.timed(operation="potential_score")
     def calculate_potential_score(self, answers: List[Answer]) -> Dict[str, float]:
         """Расчет оценки потенциала по компонентам"""
         professional_score = 0.0
@@ -168,87 +182,32 @@ class ReviewService:
 
     def extract_trigger_words_feedback(self, answers: List[Answer]) -> List[str]:
         """Извлечение триггерных слов из ответов для рекомендаций"""
-        all_feedback_text = ""
-
-        for answer in answers:
-            # Предполагаем, что answer.answer содержит текстовый ответ
-            if hasattr(answer, "answer") and answer.answer:
-                all_feedback_text += " " + answer.answer.lower()
+        all_feedback_text = " ".join(
+            answer.answer.lower() for answer in answers if answer.answer
+        )
 
-        # Получаем все триггерные слова из вопросов
-        trigger_words_map = {}
-        for answer in answers:
-            question = self.get_question_by_id(answer.question_id)
-            if question and question.trigger_words:  # type: ignore
-                try:
-                    words = json.loads(question.trigger_words)  # type: ignore
-                    trigger_words_map[question.section or "general"] = words
-                except:
-                    continue
-
-        # Анализируем текст на наличие триггерных слов
-        recommendations = self._generate_recommendations_from_triggers(
-            all_feedback_text, trigger_words_map
+        # Триггеры учитываются только у вопросов, на которые дан ответ
+        question_ids = {answer.question_id for answer in answers}
+        categories = trigger_matcher_cache.get(self.db).match_categories(
+            all_feedback_text, question_ids
         )
 
-        return recommendations
+        return self._recommendations_for_categories(categories)
 
-    def _generate_recommendations_from_triggers(
-        self, text: str, trigger_words_map: Dict
-    ) -> List[str]:
-        """Генерация рекомендаций на основе триггерных слов"""
+    def _recommendations_for_categories(self, categories: Set[str]) -> List[str]:
+        """Рекомендации по найденным категориям триггеров"""
         recommendations = []
-
-        # Словарь триггеров и соответствующих рекомендаций
-        trigger_recommendations = {
-            "problem": [
-                "Рекомендуется тренировка навыков решения сложных задач",
-                "Развитие стрессоустойчивости и адаптивности",
-            ],
-            "communication": [
-                "Улучшение навыков коммуникации и работы в команде",
-                "Тренировка презентационных навыков",
-            ],
-            "leadership": [
-                "Развитие лидерских качеств и управления командой",
-                "Обучение делегированию задач",
-            ],
-            "development": [
-                "Разработка индивидуального плана развития",
-                "Участие в программах менторства",
-            ],
-            "success": [
-                "Развитие навыков управления успешными проектами",
-                "Обучение стратегическому планированию",
-            ],
-        }
-
-        # Проверяем наличие триггерных слов в тексте
-        for section, words in trigger_words_map.items():
-            for word in words:
-                if word in text:
-                    # Добавляем соответствующие рекомендации
-                    if "сложн" in word or "проблем" in word or "трудн" in word:
-                        recommendations.extend(trigger_recommendations["problem"])
-                    elif "коммуник" in word or "общен" in word or "команд" in word:
-                        recommendations.extend(trigger_recommendations["communication"])
-                    elif "лидер" in word or "руковод" in word:
-                        recommendations.extend(trigger_recommendations["leadership"])
-                    elif "развит" in word or "рост" in word:
-                        recommendations.extend(trigger_recommendations["development"])
-                    elif "успех" in word or "результат" in word:
-                        recommendations.extend(trigger_recommendations["success"])
-
-        # Убираем дубликаты
-        unique_recommendations = list(set(recommendations))
+        for category, category_recommendations in TRIGGER_RECOMMENDATIONS.items():
+            if category in categories:
+                recommendations.extend(category_recommendations)
 
         # Если нет специфических рекомендаций, даем общую
-        if not unique_recommendations:
-            unique_recommendations = [
+        if not recommendations:
+            recommendations = [
                 "Рекомендуется индивидуальная консультация с руководителем"
             ]
 
-        return unique_recommendations[:5]  # Возвращаем не более 5 рекомендаций
+        return recommendations[:5]  # Возвращаем не более 5 рекомендаций
 
     def calculate_final_rating(self, total_score: float) -> str:
         """Определение итогового рейтинга на основе балла (шкала 0-5)"""
@@ -262,15 +221,10 @@ class ReviewService:
             return "D"
 
     def _get_option_score(
-        self, question: QuestionTemplate, selected_option_id: str
-    ) -> Optional[float]:
-        """Получить балл за выбранный вариант ответа"""
+        self, question: CachedQuestion, selected_option_id: str
+    ) -> float:
+        """Балл за выбранный вариант ответа (неизвестный вариант - InvalidOptionError)"""
         try:
-            if question.options_json:  # type: ignore
-                options = json.loads(question.options_json)  # type: ignore
-                for option in options:
-                    if option.get("id") == selected_option_id:
-                        return option.get("value", 0.0)
-        except Exception as e:
-            logger.error(f"Error getting option score: {e}")
-        return None
+            return question.option_scores[selected_option_id]
+        except KeyError:
+            raise InvalidOptionError(question.id, selected_option_id) from None
@@ -0,0 +1,144 @@
+import threading
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List, Mapping, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.core import json_codec
+from app.core.logger import logger
+from app.services.question_cache import CachedQuestion, question_cache
+
+
+class AhoCorasick:
+    """Автомат Ахо-Корасик: все вхождения набора подстрок за один проход"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[frozenset] = [frozenset()]
+
+        for pattern in patterns:
+            if pattern:
+                self._add(pattern)
+        self._link()
+
+    def _add(self, pattern: str) -> None:
+        node = 0
+        for char in pattern:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(frozenset())
+                self._goto[node][char] = child
+            node = child
+        self._out[node] = self._out[node] | {pattern}
+
+    def _link(self) -> None:
+        # Суффиксные ссылки обходом в ширину
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] | self._out[self._fail[child]]
+
+    def find(self, text: str) -> Set[str]:
+        """Шаблоны, встречающиеся в тексте"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Set[str] = set()
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                found |= out[node]
+        return found
+
+
+def trigger_category(stem: str) -> Optional[str]:
+    """Категория рекомендаций для триггерной основы слова"""
+    if "сложн" in stem or "проблем" in stem or "трудн" in stem:
+        return "problem"
+    if "коммуник" in stem or "общен" in stem or "команд" in stem:
+        return "communication"
+    if "лидер" in stem or "руковод" in stem:
+        return "leadership"
+    if "развит" in stem or "рост" in stem:
+        return "development"
+    if "успех" in stem or "результат" in stem:
+        return "success"
+    return None
+
+
+def parse_trigger_words(raw: Optional[str]) -> List[str]:
+    """Триггерные слова из JSON-поля шаблона вопроса"""
+    if not raw:
+        return []
+    try:
+        words = json_codec.loads(raw)
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid trigger_words JSON: {raw!r}")
+        return []
+    if not isinstance(words, list):
+        return []
+    return [word.lower() for word in words if isinstance(word, str) and word]
+
+
+class TriggerMatcher:
+    """Скомпилированный поиск триггерных слов всех активных шаблонов"""
+
+    def __init__(self, questions: Iterable[CachedQuestion]):
+        self._stem_questions: Dict[str, Set[str]] = defaultdict(set)
+        for question in questions:
+            for stem in parse_trigger_words(question.trigger_words):
+                self._stem_questions[stem].add(question.id)
+
+        self._categories = {
+            stem: trigger_category(stem) for stem in self._stem_questions
+        }
+        self._automaton = AhoCorasick(self._stem_questions)
+
+    def match_categories(
+        self, text: str, question_ids: Optional[Set[str]] = None
+    ) -> Set[str]:
+        """
+        Категории рекомендаций по тексту.
+
+        Если переданы question_ids, учитываются только триггеры этих вопросов.
+        """
+        categories = set()
+        for stem in self._automaton.find(text):
+            category = self._categories[stem]
+            if category is None:
+                continue
+            if question_ids is None or self._stem_questions[stem] & question_ids:
+                categories.add(category)
+        return categories
+
+
+class TriggerMatcherCache:
+    """Пересобирает TriggerMatcher только при перезагрузке кэша шаблонов"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._source: Optional[Mapping[str, CachedQuestion]] = None
+        self._matcher: Optional[TriggerMatcher] = None
+
+    def get(self, db: Session) -> TriggerMatcher:
+        questions = question_cache.get_all(db)
+        with self._lock:
+            if self._matcher is None or self._source is not questions:
+                self._matcher = TriggerMatcher(questions.values())
+                self._source = questions
+            return self._matcher
+
+
+trigger_matcher_cache = TriggerMatcherCache()
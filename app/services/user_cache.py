@@ -0,0 +1,86 @@
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.database import User
+
+
+class AuthenticatedUserCache:
+    """
+    Кэш пользователей, найденных по subject токена.
+
+    Хранятся только значения колонок; на каждый запрос из них собирается
+    экземпляр User и присоединяется к сессии запроса без SELECT.
+    Запись в users через ORM (assign_manager, админка, деактивация)
+    удаляет пользователя из кэша.
+    """
+
+    def __init__(self, max_size: int = 4096, ttl_seconds: float = 30.0):
+        self._cache = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self._columns = [attr.key for attr in inspect(User).column_attrs]
+
+    def get_user(self, db: Session, user_id: str) -> Optional[User]:
+        """Пользователь по ID, привязанный к сессии db"""
+        values: Optional[Dict[str, Any]] = self._cache.get(user_id)
+        if values is None:
+            user = db.get(User, user_id)
+            if user is not None:
+                self._cache.set(
+                    user_id, {key: getattr(user, key) for key in self._columns}
+                )
+            return user
+
+        user = User(**values)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Удалить пользователя из кэша (без user_id - очистить полностью)"""
+        if user_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(user_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+user_cache = AuthenticatedUserCache(
+    max_size=settings.AUTH_CACHE_MAX_SIZE,
+    ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS,
+)
+
+
+_DIRTY_KEY = "cached_users_dirty"
+
+
+def _on_user_write(mapper, connection, target):
+    user_cache.invalidate(target.id)
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault(_DIRTY_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _on_session_end(session):
+    # Между flush и commit кэш мог заполниться незакоммиченными данными
+    for user_id in session.info.pop(_DIRTY_KEY, ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_bulk_write(orm_execute_state):
+    # query(User).update()/delete() не вызывают событий маппера
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is User:
+        user_cache.invalidate()
+
+
+for _event_name in ("after_update", "after_delete"):
+    event.listen(User, _event_name, _on_user_write)
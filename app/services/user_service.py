@@ -3,6 +3,7 @@ from typing import List, Optional
 from sqlalchemy.orm import Session
 
 from app.models.database import User
+from app.services.org_hierarchy import OrgHierarchyService
 
 
 class UserService:
@@ -17,7 +18,7 @@ class UserService:
         return None
 
     def get_user_subordinates(self, manager_id: str) -> List[User]:
-        """Получить подчиненных руководителя"""
+        """Получить прямых подчиненных руководителя (все уровни - OrgHierarchyService)"""
         return self.db.query(User).filter(User.manager_id == manager_id).all()
 
     def get_all_managers(self) -> List[User]:
@@ -32,6 +33,11 @@ class UserService:
         if not user or not manager or not manager.is_manager:  # type: ignore
             return False
 
+        # Руководитель не может оказаться в подчинении у своего сотрудника
+        if OrgHierarchyService(self.db).is_in_subtree(user_id, manager_id):
+            return False
+
+        # org_hierarchy обновляется событием маппера в этой же транзакции
         user.manager_id = manager_id  # type: ignore
         self.db.commit()
         return True
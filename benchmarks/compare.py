@@ -0,0 +1,65 @@
+"""
+Сравнение двух файлов результатов benchmarks.run.
+
+Пример:
+    python -m benchmarks.compare base.json head.json --threshold 0.2
+
+Код возврата 1, если p95 какого-либо сценария вырос больше порога
+или увеличилось среднее число SQL-запросов.
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List
+
+
+def compare(base: Dict, head: Dict, threshold: float) -> List[str]:
+    """Строки отчета; регрессии помечены префиксом REGRESSION"""
+    lines = []
+    for name, head_result in head["results"].items():
+        base_result = base["results"].get(name)
+        if base_result is None:
+            lines.append(f"{name}: new scenario")
+            continue
+
+        p95_change = (
+            (head_result["p95_ms"] - base_result["p95_ms"]) / base_result["p95_ms"]
+            if base_result["p95_ms"]
+            else 0.0
+        )
+        queries_change = head_result["queries_mean"] - base_result["queries_mean"]
+        regression = p95_change > threshold or queries_change > 0
+
+        lines.append(
+            f"{'REGRESSION ' if regression else ''}{name}: "
+            f"p50 {base_result['p50_ms']:.1f} -> {head_result['p50_ms']:.1f} ms, "
+            f"p95 {base_result['p95_ms']:.1f} -> {head_result['p95_ms']:.1f} ms "
+            f"({p95_change:+.0%}), "
+            f"queries {base_result['queries_mean']:g} -> {head_result['queries_mean']:g}"
+        )
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Допустимый рост p95 (доля)"
+    )
+    args = parser.parse_args(argv)
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.head, encoding="utf-8") as f:
+        head = json.load(f)
+
+    lines = compare(base, head, args.threshold)
+    print("\n".join(lines))
+    if any(line.startswith("REGRESSION") for line in lines):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+EXPLAIN-проверка: горячие запросы эндпоинтов используют свои индексы.
+
+Каждая проверка выполняет запрос к API, собирает выполненный SQL и
+прогоняет его через EXPLAIN; в планах должны встретиться ожидаемые индексы.
+
+Пример:
+    python -m benchmarks.explain --database-url sqlite:///./benchmark.db \\
+        --preset tiny --reset
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Подготовка данных и запрос: (method, path, json body, id пользователя)
+ProbeFactory = Callable[[Any, Any], Tuple[str, str, Optional[Any], str]]
+
+_DOLLAR_PARAM = re.compile(r"\$(\d+)")
+
+
+def _create_review(dataset, engine):
+    goal_id = dataset.fresh_goal_ids[-1]
+    body = {
+        "goal_id": goal_id,
+        "review_type": "self",
+        "answers": [
+            {"question_id": dataset.question_ids["self"][1], "score": 4, "answer": "-"}
+        ],
+    }
+    return "POST", "/api/v1/reviews/", body, dataset.goal_owner[goal_id]
+
+
+def _create_respondent_review(dataset, engine):
+    from app.models.database import goal_respondents
+
+    goal_id = dataset.fresh_goal_ids[-2]
+    respondent_id = next(
+        user_id
+        for user_id in dataset.employee_ids
+        if user_id != dataset.goal_owner[goal_id]
+    )
+    with engine.begin() as conn:
+        conn.execute(
+            goal_respondents.insert().values(goal_id=goal_id, user_id=respondent_id)
+        )
+    body = {
+        "goal_id": goal_id,
+        "answers": [
+            {
+                "question_id": dataset.question_ids["respondent"][1],
+                "score": 4,
+                "answer": "-",
+            }
+        ],
+    }
+    return "POST", "/api/v1/reviews/respondent", body, respondent_id
+
+
+def _read_all_notifications(dataset, engine):
+    user_id = dataset.employee_ids[0]
+    return "PUT", "/api/v1/notifications/read-all", None, user_id
+
+
+def _employee_goals(dataset, engine):
+    employee_id = dataset.goal_owner[dataset.reviewed_goal_ids[0]]
+    return "GET", f"/api/v1/goals/employee/{employee_id}", None, employee_id
+
+
+def _goal_steps(dataset, engine):
+    goal_id = dataset.reviewed_goal_ids[0]
+    path = f"/api/v1/goals/{goal_id}/steps"
+    return "GET", path, None, dataset.goal_owner[goal_id]
+
+
+def _question_templates(dataset, engine):
+    path = "/api/v1/question-templates/?question_type=self&section=general"
+    return "GET", path, None, dataset.manager_ids[0]
+
+
+# Проверка -> (запрос, индексы, которые должны встретиться в планах)
+INDEX_CHECKS: Dict[str, Tuple[ProbeFactory, Tuple[str, ...]]] = {
+    "create_review": (_create_review, ("uq_reviews_goal_reviewer_type",)),
+    "create_respondent_review": (
+        _create_respondent_review,
+        ("uq_goal_respondents_goal_user", "uq_respondent_reviews_goal_respondent"),
+    ),
+    "notifications_read_all": (
+        _read_all_notifications,
+        ("ix_notifications_user_read_created",),
+    ),
+    "employee_goals": (_employee_goals, ("ix_goals_employee_created",)),
+    "goal_steps": (_goal_steps, ("ix_goal_steps_goal_order",)),
+    "question_templates_by_type": (
+        _question_templates,
+        ("ix_question_templates_type_section",),
+    ),
+}
+
+
+class StatementRecorder:
+    """Собирает SELECT/UPDATE/DELETE, выполненные на подключенных engine"""
+
+    def __init__(self, engines):
+        from sqlalchemy import event
+
+        self.statements: List[Tuple[str, Any, str]] = []
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if executemany:
+            return
+        verb = statement.lstrip().split(None, 1)[0].upper()
+        if verb in ("SELECT", "UPDATE", "DELETE", "WITH"):
+            self.statements.append((statement, parameters, conn.dialect.paramstyle))
+
+
+def _to_sync_statement(
+    statement: str, parameters: Any, paramstyle: str, target_paramstyle: str
+) -> Tuple[str, Any]:
+    """Привести SQL асинхронного драйвера (asyncpg: $1) к стилю psycopg2"""
+    if paramstyle == target_paramstyle or paramstyle != "numeric_dollar":
+        return statement, parameters
+    values = list(parameters)
+    order: List[Any] = []
+
+    def replace(match):
+        order.append(values[int(match.group(1)) - 1])
+        return "%s"
+
+    converted = _DOLLAR_PARAM.sub(replace, statement.replace("%", "%%"))
+    return converted, tuple(order)
+
+
+def explain(engine, statement: str, parameters: Any, paramstyle: str) -> str:
+    """Текст плана запроса"""
+    statement, parameters = _to_sync_statement(
+        statement, parameters, paramstyle, engine.dialect.paramstyle
+    )
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            # На маленьком наборе данных планировщик выберет seq scan -
+            # проверяем, что индекс применим к запросу
+            conn.exec_driver_sql("SET enable_seqscan = off")
+            rows = conn.exec_driver_sql("EXPLAIN " + statement, parameters).all()
+            plan = "\n".join(row[0] for row in rows)
+        else:
+            rows = conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN " + statement, parameters
+            ).all()
+            plan = "\n".join(str(row[-1]) for row in rows)
+        conn.rollback()
+    return plan
+
+
+def run_index_checks(client, engine, recorder: StatementRecorder, dataset) -> Dict:
+    """Выполнить проверки; для каждой - найденные и отсутствующие индексы"""
+    from app.core.security import create_access_token
+
+    results = {}
+    for name, (probe, expected) in INDEX_CHECKS.items():
+        method, path, body, user_id = probe(dataset, engine)
+        token = create_access_token({"sub": user_id})
+
+        recorder.statements.clear()
+        response = client.request(
+            method, path, json=body, headers={"Authorization": f"Bearer {token}"}
+        )
+        plans = [explain(engine, *captured) for captured in recorder.statements]
+
+        used = [index for index in expected if any(index in p for p in plans)]
+        results[name] = {
+            "status_code": response.status_code,
+            "expected": list(expected),
+            "missing": [index for index in expected if index not in used],
+            "statements": len(plans),
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--database-url", help="По умолчанию DATABASE_URL из .env")
+    parser.add_argument("--preset", default="tiny", choices=["tiny", "small", "large"])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--reset", action="store_true", help="Пересоздать схему (удаляет все данные!)"
+    )
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    from fastapi.testclient import TestClient
+
+    from app.database.session import async_engine, engine
+    from app.main import app
+    from app.migrations.runner import run_migrations
+    from app.models.database import Base, User
+    from app.services.question_cache import question_cache
+    from benchmarks.seed import PRESETS, seed_organisation
+
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    with engine.connect() as conn:
+        if conn.execute(User.__table__.select().limit(1)).first():
+            parser.error("Database is not empty, use --reset on a dedicated database")
+
+    dataset = seed_organisation(engine, PRESETS[args.preset], seed=args.seed)
+    question_cache.invalidate()
+
+    recorder = StatementRecorder([engine, async_engine.sync_engine])
+    results = run_index_checks(TestClient(app), engine, recorder, dataset)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+    failed = [name for name, result in results.items() if result["missing"]]
+    if failed:
+        print(f"Indexes not used by: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
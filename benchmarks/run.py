@@ -0,0 +1,285 @@
+"""
+Замеры горячих путей API: создание и оценка ревью, аналитика, уведомления.
+
+Пример:
+    python -m benchmarks.run --database-url sqlite:///./benchmark.db \\
+        --preset small --reset --output benchmark-results.json
+
+Результат - JSON с p50/p95/p99 (мс) и числом SQL-запросов на вызов.
+Два файла результатов сравниваются через python -m benchmarks.compare.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# (method, path, json body, токен) для i-го вызова сценария
+RequestFactory = Callable[[int], Tuple[str, str, Optional[Any], str]]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Перцентиль с линейной интерполяцией"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(durations_ms: List[float], query_counts: List[int], errors: int) -> Dict:
+    return {
+        "iterations": len(durations_ms),
+        "errors": errors,
+        "p50_ms": round(percentile(durations_ms, 50), 3),
+        "p95_ms": round(percentile(durations_ms, 95), 3),
+        "p99_ms": round(percentile(durations_ms, 99), 3),
+        "mean_ms": round(sum(durations_ms) / len(durations_ms), 3),
+        "max_ms": round(max(durations_ms), 3),
+        "queries_mean": round(sum(query_counts) / len(query_counts), 2),
+        "queries_max": max(query_counts),
+    }
+
+
+class QueryCounter:
+    """Считает SQL-запросы на всех подключенных engine"""
+
+    def __init__(self, engines):
+        from sqlalchemy import event
+
+        self.count = 0
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+
+def build_scenarios(dataset, seed: int = 42) -> Dict[str, RequestFactory]:
+    """Сценарии замеров поверх сгенерированной организации"""
+    from app.core.security import create_access_token
+
+    rng = random.Random(seed)
+    tokens: Dict[str, str] = {}
+
+    def token(user_id: str) -> str:
+        if user_id not in tokens:
+            tokens[user_id] = create_access_token({"sub": user_id})
+        return tokens[user_id]
+
+    def pick(items: List[str], i: int) -> str:
+        return items[i % len(items)]
+
+    def create_review(i):
+        goal_id = pick(dataset.fresh_goal_ids, i)
+        answers = [
+            {"question_id": question_id, "answer": "Были сложности", "score": 4}
+            for question_id in dataset.question_ids["self"]
+        ]
+        body = {"goal_id": goal_id, "review_type": "self", "answers": answers}
+        return "POST", "/api/v1/reviews/", body, token(dataset.goal_owner[goal_id])
+
+    def score_manager_questions(i):
+        review_id = pick(dataset.scorable_review_ids, i)
+        # Руководитель любого сотрудника имеет право оценивать
+        manager_id = pick(dataset.manager_ids, i)
+        body = [
+            {
+                "question_id": dataset.question_ids["self"][0],
+                "score": rng.randint(1, 10),
+            }
+        ]
+        path = f"/api/v1/reviews/{review_id}/score-manager-questions"
+        return "POST", path, body, token(manager_id)
+
+    def goal_analytics(refresh: bool) -> RequestFactory:
+        def factory(i):
+            goal_id = pick(dataset.reviewed_goal_ids, i)
+            path = f"/api/v1/analytics/goal/{goal_id}"
+            if refresh:
+                path += "?refresh=true"
+            return "GET", path, None, token(dataset.goal_owner[goal_id])
+
+        return factory
+
+    def employee_summary(i):
+        employee_id = pick(dataset.employee_ids, i)
+        path = f"/api/v1/analytics/employee/{employee_id}/summary"
+        return "GET", path, None, token(employee_id)
+
+    def org_summary(i):
+        manager_id = pick(dataset.manager_ids, i)
+        return "GET", "/api/v1/analytics/org/summary", None, token(manager_id)
+
+    def calibration(i):
+        manager_id = pick(dataset.manager_ids, i)
+        path = "/api/v1/analytics/calibration?refresh=true"
+        return "GET", path, None, token(manager_id)
+
+    def notifications(path: str, method: str = "GET") -> RequestFactory:
+        def factory(i):
+            user_id = pick(dataset.employee_ids, i)
+            return method, f"/api/v1/notifications{path}", None, token(user_id)
+
+        return factory
+
+    return {
+        "create_review": create_review,
+        "score_manager_questions": score_manager_questions,
+        "get_goal_analytics": goal_analytics(refresh=False),
+        "get_goal_analytics_refresh": goal_analytics(refresh=True),
+        "get_employee_summary": employee_summary,
+        "get_org_summary": org_summary,
+        "get_calibration": calibration,
+        "notifications_list": notifications("/"),
+        "notifications_unread_count": notifications("/unread-count"),
+        "notifications_read_all": notifications("/read-all", method="PUT"),
+    }
+
+
+def run_scenarios(
+    client,
+    counter: QueryCounter,
+    scenarios: Dict[str, RequestFactory],
+    iterations: int,
+    warmup: int = 5,
+) -> Dict[str, Dict]:
+    """Прогнать сценарии последовательно и собрать статистику"""
+    results = {}
+    for name, factory in scenarios.items():
+        for i in range(warmup):
+            method, path, body, token = factory(i)
+            client.request(
+                method, path, json=body, headers={"Authorization": f"Bearer {token}"}
+            )
+
+        durations, query_counts, errors = [], [], 0
+        for i in range(warmup, warmup + iterations):
+            method, path, body, token = factory(i)
+            headers = {"Authorization": f"Bearer {token}"}
+
+            counter.count = 0
+            started = time.perf_counter()
+            response = client.request(method, path, json=body, headers=headers)
+            durations.append((time.perf_counter() - started) * 1000)
+            query_counts.append(counter.count)
+            if response.status_code >= 400:
+                errors += 1
+
+        results[name] = summarize(durations, query_counts, errors)
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--database-url", help="По умолчанию DATABASE_URL из .env")
+    parser.add_argument("--preset", default="small", choices=["tiny", "small", "large"])
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--goals", type=int)
+    parser.add_argument("--reviews", type=int)
+    parser.add_argument("--respondent-reviews", type=int)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--reset", action="store_true", help="Пересоздать схему (удаляет все данные!)"
+    )
+    parser.add_argument("--output", default="benchmark-results.json")
+    args = parser.parse_args(argv)
+
+    # Настройки приложения читаются при импорте - задаем БД до него
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    from dataclasses import replace
+
+    from fastapi.testclient import TestClient
+
+    from app.database.session import async_engine, engine
+    from app.main import app
+    from app.models.database import Base, User
+    from app.services.question_cache import question_cache
+    from benchmarks.seed import PRESETS, seed_organisation
+
+    size = replace(
+        PRESETS[args.preset],
+        **{
+            key: value
+            for key, value in {
+                "users": args.users,
+                "goals": args.goals,
+                "reviews": args.reviews,
+                "respondent_reviews": args.respondent_reviews,
+            }.items()
+            if value is not None
+        },
+    )
+
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        if conn.execute(User.__table__.select().limit(1)).first():
+            parser.error("Database is not empty, use --reset on a dedicated database")
+
+    started = time.perf_counter()
+    dataset = seed_organisation(engine, size, seed=args.seed)
+    seed_seconds = time.perf_counter() - started
+    # Шаблоны вставлены через Core - событий ORM для сброса кэша не было
+    question_cache.invalidate()
+
+    counter = QueryCounter([engine, async_engine.sync_engine])
+    client = TestClient(app)
+    results = run_scenarios(
+        client,
+        counter,
+        build_scenarios(dataset, seed=args.seed),
+        iterations=args.iterations,
+        warmup=args.warmup,
+    )
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "database": engine.dialect.name,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "size": size.__dict__,
+            "seed": args.seed,
+            "iterations": args.iterations,
+            "seed_seconds": round(seed_seconds, 2),
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Benchmark results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""
+Генерация синтетической организации для нагрузочных замеров
+"""
+
+import json
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+from app.core.security import get_password_hash
+from app.models.database import (
+    Goal,
+    Notification,
+    QuestionTemplate,
+    RespondentReview,
+    Review,
+    ReviewAnswer,
+    User,
+)
+from app.services.org_hierarchy import rebuild_org_hierarchy
+
+BENCHMARK_PASSWORD = "benchmark123"
+QUESTIONS_PER_TYPE = 5
+CHUNK_SIZE = 5000
+
+ANSWER_TEXTS = [
+    "Задача выполнена в срок, команда работала слаженно",
+    "Были сложности с интеграцией, проблему решили после ревью",
+    "Нужен рост в коммуникации с заказчиком",
+    "Отличный результат, лидерство в проекте",
+    "Требуется развитие навыков планирования",
+]
+
+
+@dataclass
+class OrganisationSize:
+    users: int = 10_000
+    goals: int = 50_000
+    reviews: int = 200_000
+    respondent_reviews: int = 50_000
+    notifications_per_user: int = 5
+    # Цели без оценок для сценария create_review
+    fresh_goals: int = 1_000
+
+
+PRESETS = {
+    "tiny": OrganisationSize(
+        users=20,
+        goals=40,
+        reviews=80,
+        respondent_reviews=20,
+        notifications_per_user=2,
+        fresh_goals=50,
+    ),
+    "small": OrganisationSize(
+        users=1_000,
+        goals=5_000,
+        reviews=20_000,
+        respondent_reviews=5_000,
+        fresh_goals=500,
+    ),
+    "large": OrganisationSize(),
+}
+
+
+@dataclass
+class Dataset:
+    """ID сущностей, на которых запускаются сценарии"""
+
+    manager_ids: List[str] = field(default_factory=list)
+    employee_ids: List[str] = field(default_factory=list)
+    manager_of: Dict[str, str] = field(default_factory=dict)
+    reviewed_goal_ids: List[str] = field(default_factory=list)
+    fresh_goal_ids: List[str] = field(default_factory=list)
+    goal_owner: Dict[str, str] = field(default_factory=dict)
+    scorable_review_ids: List[str] = field(default_factory=list)
+    question_ids: Dict[str, List[str]] = field(default_factory=dict)
+
+
+def _chunks(rows: List[dict], size: int = CHUNK_SIZE) -> Iterable[List[dict]]:
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+def _insert(conn, model, rows: List[dict]) -> None:
+    for chunk in _chunks(rows):
+        conn.execute(insert(model.__table__), chunk)
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _rating(score: float) -> str:
+    # Грубая шкала, чтобы у калибровки было распределение A-D
+    if score >= 4.5:
+        return "A"
+    if score >= 3.5:
+        return "B"
+    if score >= 2.5:
+        return "C"
+    return "D"
+
+
+def seed_organisation(
+    engine: Engine, size: OrganisationSize, seed: int = 42
+) -> Dataset:
+    """
+    Заполнить базу синтетической организацией.
+
+    Данные детерминированы для одного и того же seed; вставка идет
+    пачками через Core INSERT, минуя ORM.
+    """
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    dataset = Dataset()
+
+    # Один bcrypt-хеш на всех: хеширование 10k паролей заняло бы минуты
+    hashed_password = get_password_hash(BENCHMARK_PASSWORD)
+
+    manager_count = max(1, size.users // 10)
+    users = []
+    for i in range(size.users):
+        user_id = _uuid(rng)
+        is_manager = i < manager_count
+        users.append(
+            {
+                "id": user_id,
+                "email": f"bench{i}@benchmark.local",
+                "full_name": f"Benchmark User {i}",
+                "hashed_password": hashed_password,
+                "is_manager": is_manager,
+                "is_active": True,
+                "created_at": now,
+                "manager_id": None,
+            }
+        )
+        if is_manager:
+            dataset.manager_ids.append(user_id)
+        else:
+            manager_id = dataset.manager_ids[i % manager_count]
+            users[-1]["manager_id"] = manager_id
+            dataset.employee_ids.append(user_id)
+            dataset.manager_of[user_id] = manager_id
+    if not dataset.employee_ids:
+        raise ValueError("Organisation needs at least one employee")
+
+    questions = []
+    for question_type in ("self", "manager", "potential", "respondent"):
+        dataset.question_ids[question_type] = []
+        for i in range(QUESTIONS_PER_TYPE):
+            question_id = _uuid(rng)
+            dataset.question_ids[question_type].append(question_id)
+            questions.append(
+                {
+                    "id": question_id,
+                    "question_text": f"Benchmark {question_type} question {i}",
+                    "question_type": question_type,
+                    "section": "general",
+                    "weight": 1.0 + i * 0.1,
+                    "max_score": 10 if i == 0 else 5,
+                    "order_index": i,
+                    "trigger_words": json.dumps(
+                        ["сложн", "проблем", "команд", "лидер", "развит", "результат"],
+                        ensure_ascii=False,
+                    ),
+                    "options_json": None,
+                    # Первый вопрос самооценки оценивает руководитель
+                    "requires_manager_scoring": question_type == "self" and i == 0,
+                    "is_active": True,
+                    "created_at": now,
+                }
+            )
+
+    goals = []
+    for i in range(size.goals + size.fresh_goals):
+        goal_id = _uuid(rng)
+        employee_id = rng.choice(dataset.employee_ids)
+        goals.append(
+            {
+                "id": goal_id,
+                "employee_id": employee_id,
+                "title": f"Benchmark goal {i}",
+                "description": "Синтетическая цель",
+                "expected_result": "Результат",
+                "deadline": now + timedelta(days=90),
+                "status": "completed" if i % 5 == 0 else "active",
+                "created_at": now - timedelta(minutes=i),
+            }
+        )
+        dataset.goal_owner[goal_id] = employee_id
+        if i < size.goals:
+            dataset.reviewed_goal_ids.append(goal_id)
+        else:
+            dataset.fresh_goal_ids.append(goal_id)
+
+    def make_answers(question_type: str) -> List[dict]:
+        answers = []
+        for i, question_id in enumerate(dataset.question_ids[question_type]):
+            manager_scored = question_type == "self" and i == 0
+            answers.append(
+                {
+                    "question_id": question_id,
+                    "answer": rng.choice(ANSWER_TEXTS),
+                    "score": None if manager_scored else rng.randint(1, 5),
+                    "selected_option": None,
+                }
+            )
+        return answers
+
+    def answer_rows(answers: List[dict], goal_id: str, review_type: str, **parent):
+        return [
+            {
+                "id": _uuid(rng),
+                "review_id": parent.get("review_id"),
+                "respondent_review_id": parent.get("respondent_review_id"),
+                "goal_id": goal_id,
+                "review_type": review_type,
+                "question_id": answer["question_id"],
+                "position": position,
+                "score": answer["score"],
+                "selected_option": answer["selected_option"],
+                "answer_text": answer["answer"],
+            }
+            for position, answer in enumerate(answers)
+        ]
+
+    review_types = ("self", "manager", "potential")
+    answer_columns = {
+        "self": "self_evaluation_answers",
+        "manager": "manager_evaluation_answers",
+        "potential": "potential_evaluation_answers",
+    }
+    reviews, review_answers = [], []
+    # Одна оценка на (цель, оценивающий, тип) - как требует uq_reviews_*
+    seen_reviews = set()
+    for i in range(size.reviews):
+        goal_id = dataset.reviewed_goal_ids[i % len(dataset.reviewed_goal_ids)]
+        review_type = review_types[(i // len(dataset.reviewed_goal_ids)) % 3]
+        owner_id = dataset.goal_owner[goal_id]
+        reviewer_id = (
+            owner_id if review_type == "self" else dataset.manager_of[owner_id]
+        )
+        if (goal_id, reviewer_id, review_type) in seen_reviews:
+            continue
+        seen_reviews.add((goal_id, reviewer_id, review_type))
+        review_id = _uuid(rng)
+        answers = make_answers(review_type)
+        score = round(rng.uniform(2.0, 5.0), 2)
+
+        row = {
+            "id": review_id,
+            "goal_id": goal_id,
+            "reviewer_id": reviewer_id,
+            "review_type": review_type,
+            "self_evaluation_answers": None,
+            "manager_evaluation_answers": None,
+            "potential_evaluation_answers": None,
+            "calculated_score": score,
+            "final_rating": _rating(score),
+            "created_at": now,
+            "updated_at": now,
+        }
+        row[answer_columns[review_type]] = json.dumps(answers, ensure_ascii=False)
+        reviews.append(row)
+        review_answers.extend(
+            answer_rows(answers, goal_id, review_type, review_id=review_id)
+        )
+        if review_type == "self":
+            dataset.scorable_review_ids.append(review_id)
+
+    respondent_reviews = []
+    seen_respondents = set()
+    for i in range(size.respondent_reviews):
+        goal_id = rng.choice(dataset.reviewed_goal_ids)
+        respondent_review_id = _uuid(rng)
+        answers = make_answers("respondent")
+        respondent_id = rng.choice(dataset.employee_ids)
+        if (goal_id, respondent_id) in seen_respondents:
+            continue
+        seen_respondents.add((goal_id, respondent_id))
+        respondent_reviews.append(
+            {
+                "id": respondent_review_id,
+                "goal_id": goal_id,
+                "respondent_id": respondent_id,
+                "answers": json.dumps(answers, ensure_ascii=False),
+                "comments": rng.choice(ANSWER_TEXTS),
+                "created_at": now,
+            }
+        )
+        review_answers.extend(
+            answer_rows(
+                answers,
+                goal_id,
+                "respondent",
+                respondent_review_id=respondent_review_id,
+            )
+        )
+
+    notifications = [
+        {
+            "id": _uuid(rng),
+            "user_id": user["id"],
+            "title": "Benchmark",
+            "message": "Синтетическое уведомление",
+            "notification_type": "goal_created",
+            "related_entity_type": None,
+            "related_entity_id": None,
+            "is_read": i % 2 == 0,
+            "created_at": now - timedelta(minutes=i),
+        }
+        for user in users
+        for i in range(size.notifications_per_user)
+    ]
+
+    with engine.begin() as conn:
+        _insert(conn, User, users)
+        _insert(conn, QuestionTemplate, questions)
+        _insert(conn, Goal, goals)
+        _insert(conn, Review, reviews)
+        _insert(conn, RespondentReview, respondent_reviews)
+        _insert(conn, ReviewAnswer, review_answers)
+        _insert(conn, Notification, notifications)
+        # Core INSERT минует события маппера User
+        rebuild_org_hierarchy(conn)
+
+    return dataset
@@ -0,0 +1,125 @@
+"""
+Время холодного старта воркера: импорт app.main и lifespan.
+
+Импорт выполняется в отдельном процессе с `python -X importtime`;
+отчет - общее время и модули/пакеты с наибольшим собственным временем
+импорта (модули app - по отдельности, сторонние - по пакету верхнего уровня).
+
+Пример:
+    python -m benchmarks.startup --mode production --top 15
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_IMPORT_LINE = re.compile(r"^import time:\s*(\d+) \|\s*(\d+) \| (\s*)(\S+)$")
+
+# Дальше в stderr - импорты самой замерки (TestClient), не приложения
+_APP_IMPORTED = "-- app.main imported --"
+
+# Выполняется в дочернем процессе: время импорта и старта lifespan, секунды
+_PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+print({_APP_IMPORTED!r}, file=sys.stderr)
+from fastapi.testclient import TestClient
+lifespan_started = time.perf_counter()
+with TestClient(app):
+    ready = time.perf_counter()
+print(json.dumps({{"import": imported - started, "lifespan": ready - lifespan_started}}))
+"""
+
+
+def parse_importtime(output: str) -> List[Dict]:
+    """Строки `-X importtime`: модуль, собственное и накопленное время (мкс)"""
+    modules = []
+    for line in output.splitlines():
+        if line == _APP_IMPORTED:
+            break
+        match = _IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append(
+                {
+                    "module": name,
+                    "self_us": int(self_us),
+                    "cumulative_us": int(cumulative_us),
+                    "depth": len(indent) // 2,
+                }
+            )
+    return modules
+
+
+def group_key(module: str) -> str:
+    return module if module.split(".")[0] == "app" else module.split(".")[0]
+
+
+def breakdown(modules: List[Dict], top: int = 20) -> List[Dict]:
+    """Собственное время импорта по модулям app и сторонним пакетам"""
+    totals: Dict[str, int] = defaultdict(int)
+    for module in modules:
+        totals[group_key(module["module"])] += module["self_us"]
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    return [{"name": name, "ms": round(us / 1000, 1)} for name, us in ranked[:top]]
+
+
+def measure(mode: str, database_url: Optional[str] = None) -> Dict:
+    env = {**os.environ, "STARTUP_MODE": mode, "EMAIL_DISPATCHER_ENABLED": "false"}
+    if database_url:
+        env["DATABASE_URL"] = database_url
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    return {
+        "mode": mode,
+        "import_ms": round(timings["import"] * 1000, 1),
+        "lifespan_ms": round(timings["lifespan"] * 1000, 1),
+        "modules": parse_importtime(result.stderr),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--database-url", help="По умолчанию DATABASE_URL из .env")
+    parser.add_argument(
+        "--mode", default="production", choices=["development", "production"]
+    )
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", help="Сохранить отчет в JSON")
+    args = parser.parse_args(argv)
+
+    report = measure(args.mode, args.database_url)
+    report["breakdown"] = breakdown(report.pop("modules"), args.top)
+
+    print(
+        f"{args.mode}: import {report['import_ms']} ms, "
+        f"lifespan {report['lifespan_ms']} ms"
+    )
+    for item in report["breakdown"]:
+        print(f"  {item['ms']:>8.1f} ms  {item['name']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
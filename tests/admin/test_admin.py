@@ -1,3 +1,7 @@
+from app.admin.admin import RespondentReviewView, ReviewView
+from app.models.database import RespondentReview, Review
+
+
 class TestAdminAuthentication:
     """Тесты аутентификации в админ-панели"""
 
@@ -157,3 +161,40 @@ class TestAdminPermissions:
 
         # Должен быть редирект на логин
         assert response.status_code in [302, 303, 307]
+
+
+class TestAdminReviewAnswers:
+    """Ответы оценок в админке только для просмотра"""
+
+    def test_answer_fields_not_editable(self):
+        review_view = ReviewView(Review)
+        respondent_view = RespondentReviewView(RespondentReview)
+
+        for view, fields in (
+            (review_view, ["self_evaluation_answers", "answer_rows"]),
+            (respondent_view, ["answers", "answer_rows"]),
+        ):
+            for field in fields:
+                assert field in view.exclude_fields_from_edit
+                assert field in view.exclude_fields_from_create
+                assert field not in view.exclude_fields_from_detail
+
+    def test_review_edit_form_has_no_answers(
+        self, admin_login_session, client, test_goal_with_employee, db_session
+    ):
+        review = Review(
+            goal_id=test_goal_with_employee.id,
+            reviewer_id=test_goal_with_employee.employee_id,
+            review_type="self",
+            self_evaluation_answers="[]",
+        )
+        db_session.add(review)
+        db_session.commit()
+
+        response = client.get(
+            f"/admin/review/edit/{review.id}", cookies=admin_login_session
+        )
+
+        assert response.status_code == 200
+        assert 'name="self_evaluation_answers"' not in response.text
+        assert 'name="final_feedback"' in response.text
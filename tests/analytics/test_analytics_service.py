@@ -1,3 +1,11 @@
+import json
+from datetime import datetime, timedelta
+
+from app.models.database import Goal, QuestionTemplate, RespondentReview, Review
+from app.models.schemas import Answer
+from app.services.review_answers import set_respondent_answers
+
+
 def test_calculate_scores_empty_data(analytics_service):
     """Тест расчета баллов с пустыми данными"""
     scores = analytics_service._calculate_scores([], [])
@@ -38,6 +46,7 @@ def test_generate_recommendations_with_feedback(analytics_service):
             self.manager_evaluation_answers = None
             self.potential_evaluation_answers = None
             self.final_feedback = None
+            self.answer_rows = []
 
     class MockRespondentReview:
         def __init__(self):
@@ -63,6 +72,7 @@ def test_extract_feedback_text(analytics_service):
             self.self_evaluation_answers = '[{"answer": "Хорошая работа"}]'
             self.manager_evaluation_answers = '[{"answer": "Отличные результаты"}]'
             self.final_feedback = "Продолжайте в том же духе"
+            self.answer_rows = []
 
     class MockRespondentReview:
         def __init__(self):
@@ -77,3 +87,88 @@ def test_extract_feedback_text(analytics_service):
     assert "отличные результаты" in text
     assert "продолжайте в том же духе" in text
     assert "отличный сотрудник" in text
+
+
+def test_employee_summary_uses_constant_queries(
+    analytics_service, db_session, test_employee_user, count_queries
+):
+    """Сводная аналитика не делает запросов на каждую цель"""
+    question = QuestionTemplate(
+        question_text="Вопрос", question_type="respondent", weight=1.0, max_score=5
+    )
+    db_session.add(question)
+    db_session.commit()
+
+    for i in range(5):
+        goal = Goal(
+            title=f"Цель {i}",
+            description="Описание",
+            expected_result="Результат",
+            deadline=datetime.now() + timedelta(days=30),
+            employee_id=test_employee_user.id,
+        )
+        db_session.add(goal)
+        db_session.flush()
+        db_session.add(
+            Review(
+                goal_id=goal.id,
+                reviewer_id=test_employee_user.id,
+                review_type="self",
+                calculated_score=4.0,
+            )
+        )
+        db_session.add(
+            RespondentReview(
+                goal_id=goal.id,
+                respondent_id=test_employee_user.id,
+                answers=json.dumps([{"question_id": question.id, "score": 3}]),
+            )
+        )
+    db_session.commit()
+    employee_id = test_employee_user.id
+
+    with count_queries() as statements:
+        summary = analytics_service.get_employee_summary(employee_id)
+
+    # цели + оценки + оценки респондентов (+ загрузка кэша шаблонов)
+    assert len(statements) <= 4
+    assert summary["total_goals"] == 5
+    assert len(summary["goals_analytics"]) == 5
+    for goal_analytics in summary["goals_analytics"]:
+        assert goal_analytics["review_count"] == 1
+        assert goal_analytics["respondent_count"] == 1
+        assert abs(goal_analytics["scores"]["respondent_score"] - 3.0) < 0.01
+
+
+def test_respondent_review_with_unknown_option_is_reported(
+    analytics_service, db_session, test_goal_with_employee
+):
+    """Оценка с удаленным вариантом ответа не теряется молча"""
+    question = QuestionTemplate(
+        question_text="Выберите вариант",
+        question_type="respondent",
+        max_score=4,
+        options_json=json.dumps([{"id": "high", "text": "Высоко", "value": 4.0}]),
+    )
+    db_session.add(question)
+    db_session.commit()
+
+    for respondent_id, option in (
+        ("respondent-ok", "high"),
+        ("respondent-old", "gone"),
+    ):
+        respondent_review = RespondentReview(
+            goal_id=test_goal_with_employee.id, respondent_id=respondent_id
+        )
+        set_respondent_answers(
+            respondent_review,
+            [Answer(question_id=question.id, selected_option=option)],
+        )
+        db_session.add(respondent_review)
+    db_session.commit()
+
+    analytics = analytics_service.get_goal_analytics(test_goal_with_employee.id)
+
+    assert analytics["respondent_count"] == 2
+    assert analytics["skipped_respondent_reviews"] == 1
+    assert analytics["scores"]["respondent_score"] > 0
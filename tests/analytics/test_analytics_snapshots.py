@@ -0,0 +1,113 @@
+from sqlalchemy import event
+
+from app.models.database import Goal, GoalAnalyticsSnapshot, Review
+from app.services.analytics_snapshot_service import GoalAnalyticsSnapshotService
+
+
+def _add_self_review(db_session, goal, score):
+    db_session.add(
+        Review(
+            goal_id=goal.id,
+            reviewer_id=goal.employee_id,
+            review_type="self",
+            calculated_score=score,
+        )
+    )
+    db_session.commit()
+
+
+def test_snapshot_served_without_recompute(
+    db_session, test_goal_with_employee, count_queries
+):
+    """Повторное чтение отдает снимок без загрузки оценок"""
+    goal_id = test_goal_with_employee.id
+    _add_self_review(db_session, test_goal_with_employee, 4.0)
+
+    first = GoalAnalyticsSnapshotService(db_session).get_goal_analytics(goal_id)
+    assert first["review_count"] == 1
+    assert first["is_stale"] is False
+
+    with count_queries() as statements:
+        second = GoalAnalyticsSnapshotService(db_session).get_goal_analytics(goal_id)
+
+    assert not [s for s in statements if "FROM reviews" in s]
+    assert second["scores"] == first["scores"]
+    assert second["computed_at"] is not None
+
+
+def test_review_write_marks_snapshot_stale(db_session, test_goal_with_employee):
+    """Новая оценка помечает снимок устаревшим, чтение пересчитывает его"""
+    goal_id = test_goal_with_employee.id
+    service = GoalAnalyticsSnapshotService(db_session)
+    assert service.get_goal_analytics(goal_id)["review_count"] == 0
+
+    _add_self_review(db_session, test_goal_with_employee, 4.0)
+    assert db_session.get(GoalAnalyticsSnapshot, goal_id).is_stale
+
+    analytics = service.get_goal_analytics(goal_id)
+    assert analytics["review_count"] == 1
+    assert abs(analytics["scores"]["self_score"] - 4.0) < 0.01
+    assert not db_session.get(GoalAnalyticsSnapshot, goal_id).is_stale
+
+
+def test_refresh_goals_rebuilds_snapshot(db_session, test_goal_with_employee):
+    """Явный пересчет после записи обновляет снимок"""
+    goal_id = test_goal_with_employee.id
+    _add_self_review(db_session, test_goal_with_employee, 3.0)
+
+    GoalAnalyticsSnapshotService(db_session).refresh_goals([goal_id])
+
+    snapshot = db_session.get(GoalAnalyticsSnapshot, goal_id)
+    assert snapshot.is_stale is False
+    assert abs(snapshot.total_score - 3.0) < 0.01
+    assert snapshot.final_rating == "C"
+
+
+def test_employee_summary_stores_snapshots_in_one_commit(
+    db_session, test_goal_with_employee
+):
+    """Пересчитанные снимки сохраняются одним commit после расчета сводки"""
+    employee_id = test_goal_with_employee.employee_id
+    db_session.add(
+        Goal(
+            title="Вторая цель",
+            description="Описание",
+            expected_result="Результат",
+            employee_id=employee_id,
+            status="completed",
+        )
+    )
+    db_session.commit()
+
+    # COMMIT на уровне соединения (освобождение savepoint не считается)
+    engine = db_session.get_bind()
+    commits = []
+    listener = lambda connection: commits.append(connection)
+    event.listen(engine, "commit", listener)
+    try:
+        summary = GoalAnalyticsSnapshotService(db_session).get_employee_summary(
+            employee_id
+        )
+    finally:
+        event.remove(engine, "commit", listener)
+
+    assert len(commits) == 1
+    assert summary["total_goals"] == 2
+    assert summary["completed_goals"] == 1
+    assert db_session.query(GoalAnalyticsSnapshot).count() == 2
+
+
+def test_goal_analytics_endpoint_refresh(
+    client, employee_auth_headers, test_goal_with_employee
+):
+    """Эндпоинт отдает отметку времени расчета и умеет пересчитать снимок"""
+    url = f"/api/v1/analytics/goal/{test_goal_with_employee.id}"
+
+    first = client.get(url, headers=employee_auth_headers).json()
+    cached = client.get(url, headers=employee_auth_headers).json()
+    refreshed = client.get(f"{url}?refresh=true", headers=employee_auth_headers)
+
+    assert first["is_stale"] is False
+    assert cached["computed_at"] == first["computed_at"]
+    assert refreshed.status_code == 200
+    assert refreshed.json()["computed_at"] != first["computed_at"]
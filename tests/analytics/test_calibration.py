@@ -0,0 +1,187 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.security import create_access_token
+from app.models.database import Goal, Review, User
+from app.services.calibration_service import (
+    CalibrationService,
+    calibration_cache,
+    parse_review_cycle,
+)
+
+
+def headers(user):
+    return {"Authorization": f"Bearer {create_access_token({'sub': user.id})}"}
+
+
+def make_user(db_session, name, manager=None, is_manager=False):
+    user = User(
+        email=f"{name}@company.com",
+        full_name=name,
+        hashed_password="x",
+        is_manager=is_manager,
+        manager_id=manager.id if manager else None,
+    )
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def add_review(db_session, employee, reviewer, score, rating, created_at):
+    goal = Goal(
+        title="g",
+        description="d",
+        expected_result="r",
+        deadline=created_at + timedelta(days=30),
+        employee_id=employee.id,
+    )
+    db_session.add(goal)
+    db_session.flush()
+    db_session.add(
+        Review(
+            goal_id=goal.id,
+            reviewer_id=reviewer.id,
+            review_type="manager",
+            calculated_score=score,
+            final_rating=rating,
+            created_at=created_at,
+        )
+    )
+    db_session.commit()
+
+
+@pytest.fixture
+def org(db_session):
+    """director -> (lead_a -> (a1, a2), lead_b -> b1)"""
+    calibration_cache.clear()
+    director = make_user(db_session, "director", is_manager=True)
+    lead_a = make_user(db_session, "lead_a", director, is_manager=True)
+    lead_b = make_user(db_session, "lead_b", director, is_manager=True)
+    a1 = make_user(db_session, "a1", lead_a)
+    a2 = make_user(db_session, "a2", lead_a)
+    b1 = make_user(db_session, "b1", lead_b)
+
+    march = datetime(2026, 3, 10)
+    add_review(db_session, a1, lead_a, 5.0, "A", march)
+    add_review(db_session, a2, lead_a, 4.0, "B", march)
+    add_review(db_session, b1, lead_b, 2.0, "D", march)
+    add_review(db_session, b1, lead_b, 3.0, None, datetime(2025, 11, 1))
+    yield director, lead_a, lead_b
+    calibration_cache.clear()
+
+
+class TestReviewCycle:
+    @pytest.mark.parametrize(
+        "label, start, end",
+        [
+            ("2026", datetime(2026, 1, 1), datetime(2027, 1, 1)),
+            ("2026-H2", datetime(2026, 7, 1), datetime(2027, 1, 1)),
+            ("2026-Q2", datetime(2026, 4, 1), datetime(2026, 7, 1)),
+        ],
+    )
+    def test_parse(self, label, start, end):
+        cycle = parse_review_cycle(label)
+        assert (cycle.start, cycle.end) == (start, end)
+
+    @pytest.mark.parametrize("label", ["2026-Q5", "26", "last-year"])
+    def test_invalid(self, label):
+        with pytest.raises(ValueError):
+            parse_review_cycle(label)
+
+
+class TestCalibration:
+    def test_groups_and_deltas(self, db_session, org):
+        _, lead_a, lead_b = org
+
+        result = CalibrationService(db_session).get_calibration(
+            parse_review_cycle("2026")
+        )
+
+        assert result["reviews"] == 3
+        assert result["average_score"] == pytest.approx(11 / 3, abs=1e-3)
+        assert result["rating_distribution"] == {
+            "A": 1,
+            "B": 1,
+            "C": 0,
+            "D": 1,
+            "unrated": 0,
+        }
+        assert result["percentiles"]["p50"] == 4.0
+        assert result["percentiles"]["p25"] == 3.0
+        assert sum(bucket["count"] for bucket in result["score_histogram"]) == 3
+
+        managers = {group["id"]: group for group in result["managers"]}
+        assert managers[lead_a.id]["average_score"] == 4.5
+        assert managers[lead_a.id]["high_rating_share"] == 1.0
+        assert managers[lead_b.id]["score_delta"] == pytest.approx(2 - 11 / 3, abs=1e-3)
+
+        (department,) = result["departments"]
+        assert department["name"] == "director"
+        assert department["reviews"] == 3
+
+    def test_all_time_counts_unrated(self, db_session, org):
+        result = CalibrationService(db_session).get_calibration()
+
+        assert result["reviews"] == 4
+        assert result["rating_distribution"]["unrated"] == 1
+
+    def test_cache_invalidated_by_review_in_cycle(self, db_session, org):
+        _, lead_a, _ = org
+        service = CalibrationService(db_session)
+        cycle_2026 = parse_review_cycle("2026")
+        cycle_2025 = parse_review_cycle("2025")
+        service.get_calibration(cycle_2026)
+        closed = service.get_calibration(cycle_2025)
+
+        employee = make_user(db_session, "a3", lead_a)
+        add_review(db_session, employee, lead_a, 3.0, "C", datetime(2026, 5, 1))
+
+        assert service.get_calibration(cycle_2026)["reviews"] == 4
+        assert service.get_calibration(cycle_2025) is closed
+
+    def test_query_count_does_not_grow(self, db_session, org, count_queries):
+        _, lead_a, _ = org
+        service = CalibrationService(db_session)
+
+        with count_queries() as small:
+            service.get_calibration(refresh=True)
+        for i in range(10):
+            employee = make_user(db_session, f"extra{i}", lead_a)
+            add_review(db_session, employee, lead_a, 4.0, "B", datetime(2026, 2, 1))
+        with count_queries() as large:
+            service.get_calibration(refresh=True)
+
+        assert len(large) == len(small)
+
+
+class TestCalibrationEndpoint:
+    def test_manager_gets_calibration(self, client, org):
+        director, *_ = org
+
+        response = client.get(
+            "/api/v1/analytics/calibration?cycle=2026-Q1", headers=headers(director)
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["cycle"]["label"] == "2026-Q1"
+        assert len(body["managers"]) == 2
+
+    def test_invalid_cycle(self, client, org):
+        director, *_ = org
+
+        response = client.get(
+            "/api/v1/analytics/calibration?cycle=2026-Q9", headers=headers(director)
+        )
+
+        assert response.status_code == 400
+
+    def test_requires_manager(self, client, db_session, org):
+        employee = db_session.query(User).filter(User.full_name == "a1").one()
+
+        response = client.get(
+            "/api/v1/analytics/calibration", headers=headers(employee)
+        )
+
+        assert response.status_code == 403
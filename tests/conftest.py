@@ -1,20 +1,32 @@
+from collections import Counter
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from fastapi.testclient import TestClient
 from unittest.mock import MagicMock, patch
-from sqlalchemy import text
+from sqlalchemy import event, text
 
 import pytest
 
 from app.core.security import get_password_hash
-from app.database.session import engine, get_db
+from app.database.query_stats import normalize_statement
+from app.database.session import async_engine, engine, get_db
 from app.main import app
+from app.migrations.runner import run_migrations
 from app.models.database import Base, User, QuestionTemplate, Goal
 from app.services.email_service import EmailService
 from app.services.analytics_service import AnalyticsService
 from app.services.notification_service import NotificationService
+from app.services.user_cache import user_cache
 from app.services.user_service import UserService
 
 
+@pytest.fixture(scope="session", autouse=True)
+def create_schema():
+    """Создает недостающие таблицы и индексы в тестовой БД"""
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+
 @pytest.fixture(scope="function")
 def client():
     """Тестовый клиент с очисткой базы между тестами"""
@@ -22,6 +34,8 @@ def client():
         for table in reversed(Base.metadata.sorted_tables):
             conn.execute(text(f"DELETE FROM {table.name}"))
         conn.commit()
+    # Прямой DELETE минует события ORM
+    user_cache.clear()
 
     return TestClient(app)
 
@@ -103,6 +117,8 @@ def db_session():
         for table in reversed(Base.metadata.sorted_tables):
             conn.execute(text(f"DELETE FROM {table.name}"))
         conn.commit()
+    # Прямой DELETE минует события ORM
+    user_cache.clear()
 
     try:
         yield db
@@ -110,6 +126,65 @@ def db_session():
         db.close()
 
 
+@pytest.fixture
+def count_queries():
+    """Контекстный менеджер, собирающий SQL-запросы, выполненные через engine"""
+
+    @contextmanager
+    def _count_queries():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    return _count_queries
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Проверка бюджета SQL-запросов эндпоинта.
+
+        with query_budget(3):
+            client.get("/api/v1/notifications/unread-count", headers=...)
+
+    Учитываются оба engine (синхронный и асинхронный).
+    """
+
+    @contextmanager
+    def _query_budget(max_queries: int):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engines = [engine, async_engine.sync_engine]
+        for target in engines:
+            event.listen(target, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            for target in engines:
+                event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+        if len(statements) > max_queries:
+            shapes = Counter(normalize_statement(s) for s in statements)
+            details = "\n".join(
+                f"  {count}x {shape}" for shape, count in shapes.most_common()
+            )
+            pytest.fail(
+                f"Query budget exceeded: {len(statements)} > {max_queries}\n{details}"
+            )
+
+    return _query_budget
+
+
 @pytest.fixture
 def email_service(db_session):
     """Фикстура для сервиса email"""
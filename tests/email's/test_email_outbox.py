@@ -0,0 +1,189 @@
+import socketserver
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.database.session import SessionLocal
+from app.models.database import EmailOutbox
+from app.services.email_dispatcher import EmailDispatcher, SMTPConnectionPool
+from app.services.email_service import EmailService
+
+
+class FakeSMTPHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP-сервер: принимает письма и складывает их в server.messages"""
+
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1  # type: ignore
+        self.reply("220 fake-smtp ready")
+        recipients = []
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                break
+            command = line.split(" ", 1)[0].upper()
+
+            if command == "EHLO":
+                self.reply("250 fake-smtp")
+            elif command == "MAIL":
+                recipients = []
+                self.reply("250 OK")
+            elif command == "RCPT":
+                recipients.append(line.split(":", 1)[1].strip("<> "))
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    data_line = self.rfile.readline().decode()
+                    if data_line.rstrip("\r\n") == ".":
+                        break
+                    data.append(data_line)
+                self.server.messages.append((recipients, "".join(data)))  # type: ignore
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                break
+            else:  # NOOP, RSET
+                self.reply("250 OK")
+
+
+@pytest.fixture
+def fake_smtp_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), FakeSMTPHandler)
+    server.daemon_threads = True
+    server.messages = []  # type: ignore
+    server.connections = 0  # type: ignore
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_dispatcher(port, **kwargs):
+    pool = SMTPConnectionPool(
+        host="127.0.0.1",
+        port=port,
+        username="",
+        password="",
+        use_tls=False,
+        size=1,
+        timeout=5,
+    )
+    return EmailDispatcher(session_factory=SessionLocal, pool=pool, **kwargs)
+
+
+class TestEmailOutbox:
+
+    def test_outbox_mode_only_enqueues(self, db_session, mock_smtp):
+        """В режиме outbox письмо не отправляется по SMTP, а ставится в очередь"""
+        mock_smtp_class, _ = mock_smtp
+        service = EmailService(db_session, use_outbox=True)
+
+        assert service.send_email("user@test.com", "Тема", "<p>Текст</p>") is True
+
+        mock_smtp_class.assert_not_called()
+        item = db_session.query(EmailOutbox).one()
+        assert item.to_email == "user@test.com"
+        assert item.status == "pending"
+        assert item.subject.endswith("Тема")
+        assert "<p>Текст</p>" in item.html_body
+
+    def test_dispatcher_reuses_smtp_connection(self, db_session, fake_smtp_server):
+        """Диспетчер отправляет пачку писем через одно SMTP-соединение"""
+        service = EmailService(db_session, use_outbox=True)
+        for i in range(3):
+            service.send_email(f"user{i}@test.com", "Тема", "<p>Текст</p>")
+
+        dispatcher = make_dispatcher(fake_smtp_server.server_address[1])
+        sent = dispatcher.drain_once()
+        dispatcher.pool.close()
+
+        assert sent == 3
+        assert fake_smtp_server.connections == 1
+        assert sorted(r[0] for r, _ in fake_smtp_server.messages) == [
+            "user0@test.com",
+            "user1@test.com",
+            "user2@test.com",
+        ]
+
+        db_session.expire_all()
+        statuses = {item.status for item in db_session.query(EmailOutbox).all()}
+        assert statuses == {"sent"}
+
+    def test_failed_delivery_is_retried_with_backoff(self, db_session):
+        """Ошибка отправки планирует повтор, после лимита письмо помечается failed"""
+        EmailService(db_session, use_outbox=True).send_email(
+            "user@test.com", "Тема", "<p>Текст</p>"
+        )
+
+        # Закрытый порт - соединение будет отклонено
+        dispatcher = make_dispatcher(1, max_attempts=2, retry_base_seconds=60)
+        assert dispatcher.drain_once() == 0
+
+        db_session.expire_all()
+        item = db_session.query(EmailOutbox).one()
+        assert item.status == "pending"
+        assert item.attempts == 1
+        assert item.last_error
+        assert item.next_attempt_at > datetime.now(timezone.utc).replace(
+            tzinfo=None
+        ) + timedelta(seconds=30)
+
+        # Повтор еще не наступил
+        assert dispatcher.drain_once() == 0
+        db_session.expire_all()
+        assert db_session.query(EmailOutbox).one().attempts == 1
+
+        item.next_attempt_at = datetime.now(timezone.utc)  # type: ignore
+        db_session.commit()
+        dispatcher.drain_once()
+
+        db_session.expire_all()
+        item = db_session.query(EmailOutbox).one()
+        assert item.status == "failed"
+        assert item.attempts == 2
+
+    def test_claimed_items_are_leased(self, db_session, fake_smtp_server):
+        """Забранное письмо не берется повторно, пока не истекла аренда"""
+        service = EmailService(db_session, use_outbox=True)
+        service.send_email("leased@company.com", "Тема", "<p>Текст</p>")
+        service.send_email("stale@company.com", "Тема", "<p>Текст</p>")
+
+        now = datetime.now(timezone.utc)
+        leased, stale = sorted(
+            db_session.query(EmailOutbox).all(), key=lambda item: item.to_email
+        )
+        # Отправку первого ведет другой воркер, второй воркер упал
+        leased.status, leased.attempts = "sending", 1  # type: ignore
+        leased.next_attempt_at = now + timedelta(minutes=5)  # type: ignore
+        stale.status, stale.attempts = "sending", 1  # type: ignore
+        stale.next_attempt_at = now - timedelta(seconds=1)  # type: ignore
+        db_session.commit()
+
+        dispatcher = make_dispatcher(fake_smtp_server.server_address[1])
+        assert dispatcher.drain_once() == 1
+        dispatcher.pool.close()
+
+        assert [r for r, _ in fake_smtp_server.messages] == [["stale@company.com"]]
+        db_session.expire_all()
+        assert db_session.get(EmailOutbox, leased.id).status == "sending"
+        resent = db_session.get(EmailOutbox, stale.id)
+        assert resent.status == "sent"
+        assert resent.attempts == 2
+
+    def test_backoff_is_exponential_and_capped(self):
+        dispatcher = EmailDispatcher(
+            pool=SMTPConnectionPool(size=1),
+            retry_base_seconds=10,
+            retry_max_seconds=60,
+        )
+
+        assert dispatcher.backoff_seconds(1) == 10
+        assert dispatcher.backoff_seconds(2) == 20
+        assert dispatcher.backoff_seconds(3) == 40
+        assert dispatcher.backoff_seconds(5) == 60
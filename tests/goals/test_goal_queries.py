@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.database import Goal, GoalStep
+from app.services.goal_queries import goal_loader_options, goal_query
+
+
+def add_goals(db_session, employee, respondent, count):
+    for i in range(count):
+        goal = Goal(
+            title=f"Цель {i}",
+            description="Описание",
+            expected_result="Результат",
+            deadline=datetime.now() + timedelta(days=30),
+            employee_id=employee.id,
+        )
+        goal.steps = [GoalStep(title=f"Шаг {j}", order_index=j) for j in range(2)]
+        goal.respondents.append(respondent)
+        db_session.add(goal)
+    db_session.commit()
+
+
+def query_count(client, query_budget, path, headers):
+    with query_budget(10) as statements:
+        response = client.get(path, headers=headers)
+    assert response.status_code == 200
+    return len(statements), response.json()
+
+
+class TestGoalQueryBuilder:
+    def test_loads_relations_eagerly(
+        self, db_session, test_employee_user, test_manager_user_complete
+    ):
+        add_goals(db_session, test_employee_user, test_manager_user_complete, 3)
+        db_session.expire_all()
+
+        goals = goal_query(db_session).all()
+
+        for goal in goals:
+            state = goal.__dict__
+            assert "employee" in state
+            assert "steps" in state
+            assert "respondents" in state
+
+    def test_unknown_strategy(self):
+        with pytest.raises(ValueError):
+            goal_loader_options(["steps"], strategies={"steps": "lazy"})
+
+
+class TestGoalListQueryCount:
+    @pytest.mark.parametrize(
+        "path",
+        ["/api/v1/goals/employee/{employee_id}", "/api/v1/goals/respondent/my"],
+    )
+    def test_constant_number_of_queries(
+        self,
+        client,
+        db_session,
+        test_employee_user,
+        test_manager_user_complete,
+        employee_auth_headers,
+        manager_auth_headers,
+        query_budget,
+        path,
+    ):
+        path = path.format(employee_id=test_employee_user.id)
+        headers = employee_auth_headers if "employee" in path else manager_auth_headers
+
+        add_goals(db_session, test_employee_user, test_manager_user_complete, 1)
+        # Прогрев кэша пользователя
+        client.get(path, headers=headers)
+        one_goal_queries, body = query_count(client, query_budget, path, headers)
+        assert len(body) == 1
+
+        add_goals(db_session, test_employee_user, test_manager_user_complete, 4)
+        many_goals_queries, body = query_count(client, query_budget, path, headers)
+        assert len(body) == 5
+        assert all(len(goal["steps"]) == 2 for goal in body)
+        assert all(goal["employee_name"] for goal in body)
+
+        assert many_goals_queries == one_goal_queries
+
+    def test_goal_as_respondent(
+        self,
+        client,
+        db_session,
+        test_employee_user,
+        test_manager_user_complete,
+        manager_auth_headers,
+        query_budget,
+    ):
+        add_goals(db_session, test_employee_user, test_manager_user_complete, 1)
+        goal_id = db_session.query(Goal.id).scalar()
+
+        with query_budget(4):
+            response = client.get(
+                f"/api/v1/goals/respondent/{goal_id}", headers=manager_auth_headers
+            )
+
+        assert response.status_code == 200
+        assert response.json()["respondent_names"] == [
+            test_manager_user_complete.full_name
+        ]
@@ -1,4 +1,4 @@
-from app.models.database import User, Notification
+from app.models.database import User, Notification, NotificationCounter
 
 
 class TestNotificationService:
@@ -276,3 +276,136 @@ class TestNotificationService:
         assert notification.title == "Ревью завершено"
         assert "Test Manager" in notification.message
         assert notification.notification_type == "review_completed"
+
+    def test_create_notifications_bulk(
+        self, notification_service, db_session, count_queries
+    ):
+        """Тест массового создания уведомлений одним INSERT"""
+        users = [
+            User(
+                email=f"bulk{i}@example.com",
+                full_name=f"Bulk User {i}",
+                hashed_password="test",
+                is_manager=False,
+            )
+            for i in range(5)
+        ]
+        db_session.add_all(users)
+        db_session.commit()
+        user_ids = [user.id for user in users]
+
+        with count_queries() as statements:
+            ids = notification_service.create_notifications_bulk(
+                user_ids=user_ids
+                + [user_ids[0]],  # дубль не создает второе уведомление
+                title="Bulk Title",
+                message="Bulk Message",
+                notification_type="goal_created",
+                related_entity_type="goal",
+                related_entity_id="goal-123",
+            )
+
+        inserts = [s for s in statements if s.startswith("INSERT INTO notifications")]
+        assert len(inserts) == 1
+        assert len(ids) == 5
+
+        created = db_session.query(Notification).filter(Notification.id.in_(ids)).all()
+        assert sorted(n.user_id for n in created) == sorted(user_ids)
+        assert all(n.is_read == False for n in created)
+        assert all(n.created_at is not None for n in created)
+
+    def test_unread_counter_maintained(
+        self, notification_service, db_session, count_queries
+    ):
+        """Счетчик непрочитанных обновляется при записи, чтение без COUNT"""
+        user = User(
+            email="counter@example.com",
+            full_name="Counter User",
+            hashed_password="test",
+            is_manager=False,
+        )
+        db_session.add(user)
+        db_session.commit()
+
+        first = notification_service.create_notification(
+            user_id=user.id,
+            title="One",
+            message="One",
+            notification_type="test_type",
+        )
+        notification_service.create_notifications_bulk(
+            user_ids=[user.id], title="Two", message="Two", notification_type="test"
+        )
+        assert db_session.get(NotificationCounter, user.id).unread_count == 2
+
+        with count_queries() as statements:
+            assert notification_service.get_unread_count(user.id) == 2
+        assert not any("count(" in s.lower() for s in statements)
+
+        # Повторная отметка не уменьшает счетчик дважды
+        notification_service.mark_as_read(first.id, user.id)
+        notification_service.mark_as_read(first.id, user.id)
+        assert notification_service.get_unread_count(user.id) == 1
+
+        notification_service.mark_all_as_read(user.id)
+        assert notification_service.get_unread_count(user.id) == 0
+
+    def test_reconcile_unread_counters(self, notification_service, db_session):
+        """Сверка исправляет расхождение счетчика с уведомлениями"""
+        user = User(
+            email="drift@example.com",
+            full_name="Drift User",
+            hashed_password="test",
+            is_manager=False,
+        )
+        db_session.add(user)
+        db_session.commit()
+
+        for i in range(3):
+            notification_service.create_notification(
+                user_id=user.id,
+                title=f"Notification {i}",
+                message=f"Message {i}",
+                notification_type="test_type",
+            )
+
+        db_session.get(NotificationCounter, user.id).unread_count = 10
+        db_session.commit()
+
+        assert notification_service.reconcile_unread_counters([user.id]) == 1
+        assert notification_service.get_unread_count(user.id) == 3
+        assert notification_service.reconcile_unread_counters([user.id]) == 0
+
+        # Отсутствующий счетчик создается по фактическому числу
+        db_session.delete(db_session.get(NotificationCounter, user.id))
+        db_session.commit()
+        assert notification_service.reconcile_unread_counters() == 1
+        assert db_session.get(NotificationCounter, user.id).unread_count == 3
+
+    def test_mark_all_as_read_subtracts_marked_only(
+        self, notification_service, db_session
+    ):
+        """Из счетчика вычитаются только отмеченные, а не обнуляется он сам"""
+        user = User(
+            email="concurrent@company.com",
+            full_name="Concurrent User",
+            hashed_password="test",
+            is_manager=False,
+        )
+        db_session.add(user)
+        db_session.commit()
+
+        for i in range(2):
+            notification_service.create_notification(
+                user_id=user.id,
+                title=f"Notification {i}",
+                message=f"Message {i}",
+                notification_type="test_type",
+            )
+
+        # Уведомление, учтенное параллельной транзакцией, но еще не видимое
+        db_session.get(NotificationCounter, user.id).unread_count += 1
+        db_session.commit()
+
+        assert notification_service.mark_all_as_read(user.id) == 2
+        assert db_session.get(NotificationCounter, user.id).unread_count == 1
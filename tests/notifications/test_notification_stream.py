@@ -0,0 +1,109 @@
+import asyncio
+
+from app.api.endpoints.notifications import format_sse, notification_event_stream
+from app.models.database import User
+from app.services.notification_broker import notification_broker
+from app.services.notification_service import NotificationService
+
+
+class FakeRequest:
+    """Запрос, который 'отключается' после заданного числа проверок"""
+
+    def __init__(self, checks_before_disconnect: int):
+        self.checks_left = checks_before_disconnect
+
+    async def is_disconnected(self) -> bool:
+        self.checks_left -= 1
+        return self.checks_left < 0
+
+
+def create_user(db_session):
+    user = User(
+        email="stream@example.com",
+        full_name="Stream User",
+        hashed_password="test",
+        is_manager=False,
+    )
+    db_session.add(user)
+    db_session.commit()
+    return user.id
+
+
+def test_created_notification_is_published(db_session):
+    """Новое уведомление и счетчик публикуются подписчикам пользователя"""
+    user_id = create_user(db_session)
+
+    async def scenario():
+        subscription = notification_broker.subscribe(user_id)
+        try:
+            NotificationService(db_session).create_notification(
+                user_id=user_id,
+                title="Stream Title",
+                message="Stream Message",
+                notification_type="test_type",
+            )
+            first = await subscription.get(timeout=1)
+            second = await subscription.get(timeout=1)
+        finally:
+            subscription.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first["type"] == "notification"
+    assert first["data"]["title"] == "Stream Title"
+    assert second == {"type": "unread_count", "data": {"unread_count": 1}}
+    assert not notification_broker.has_subscribers(user_id)
+
+
+def test_bulk_notifications_are_published(db_session):
+    """Массовое создание тоже публикует события"""
+    user_id = create_user(db_session)
+
+    async def scenario():
+        subscription = notification_broker.subscribe(user_id)
+        try:
+            NotificationService(db_session).create_goal_created_notification(
+                goal_id="goal-123", employee_name="Test", respondent_ids=[user_id]
+            )
+            return await subscription.get(timeout=1)
+        finally:
+            subscription.close()
+
+    event = asyncio.run(scenario())
+
+    assert event["type"] == "notification"
+    assert event["data"]["notification_type"] == "goal_created"
+
+
+def test_event_stream_format():
+    """Поток начинается со счетчика и отдает опубликованные события"""
+
+    async def scenario():
+        subscription = notification_broker.subscribe("sse-user")
+        notification_broker.publish(
+            "sse-user", {"type": "unread_count", "data": {"unread_count": 3}}
+        )
+        stream = notification_event_stream(FakeRequest(1), subscription, 2)
+        chunks = [chunk async for chunk in stream]
+        return chunks
+
+    chunks = asyncio.run(scenario())
+
+    assert chunks == [
+        'event: unread_count\ndata: {"unread_count":2}\n\n',
+        'event: unread_count\ndata: {"unread_count":3}\n\n',
+    ]
+    assert not notification_broker.has_subscribers("sse-user")
+
+
+def test_stream_requires_token(client):
+    response = client.get("/api/v1/notifications/stream")
+    assert response.status_code == 401
+
+
+def test_format_sse_uses_json_codec():
+    """Данные события - компактный UTF-8 JSON настроенного кодека"""
+    message = format_sse("notification", {"title": "Оценка", "count": 2})
+
+    assert message == 'event: notification\ndata: {"title":"Оценка","count":2}\n\n'
@@ -0,0 +1,66 @@
+from app.database.session import async_engine, engine
+from app.services.question_cache import question_cache
+from benchmarks.compare import compare
+from benchmarks.explain import StatementRecorder, run_index_checks
+from benchmarks.run import QueryCounter, build_scenarios, percentile, run_scenarios
+from benchmarks.seed import PRESETS, seed_organisation
+
+
+def test_percentile_interpolates():
+    """Перцентили считаются с интерполяцией"""
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.5
+    assert abs(percentile(values, 99) - 99.01) < 1e-9
+    assert percentile([], 95) == 0.0
+
+
+def test_benchmark_smoke(client, db_session):
+    """Все сценарии отрабатывают на маленькой организации"""
+    dataset = seed_organisation(engine, PRESETS["tiny"], seed=1)
+    question_cache.invalidate()
+
+    results = run_scenarios(
+        client,
+        QueryCounter([engine, async_engine.sync_engine]),
+        build_scenarios(dataset, seed=1),
+        iterations=3,
+        warmup=1,
+    )
+
+    assert set(results) >= {
+        "create_review",
+        "score_manager_questions",
+        "get_goal_analytics",
+        "get_employee_summary",
+        "notifications_list",
+    }
+    for name, result in results.items():
+        assert result["errors"] == 0, name
+        assert result["iterations"] == 3
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+        assert result["queries_mean"] > 0
+
+
+def test_hot_queries_use_indexes(client, db_session):
+    """EXPLAIN горячих запросов показывает ожидаемые индексы"""
+    dataset = seed_organisation(engine, PRESETS["tiny"], seed=1)
+    question_cache.invalidate()
+
+    results = run_index_checks(
+        client, engine, StatementRecorder([engine, async_engine.sync_engine]), dataset
+    )
+
+    for name, result in results.items():
+        assert result["status_code"] == 200, name
+        assert result["missing"] == [], name
+
+
+def test_compare_flags_regressions():
+    """Рост p95 выше порога или числа запросов считается регрессией"""
+    base = {"results": {"a": {"p50_ms": 1, "p95_ms": 10, "queries_mean": 3}}}
+    slower = {"results": {"a": {"p50_ms": 1, "p95_ms": 15, "queries_mean": 3}}}
+    more_queries = {"results": {"a": {"p50_ms": 1, "p95_ms": 10, "queries_mean": 4}}}
+
+    assert not compare(base, base, 0.2)[0].startswith("REGRESSION")
+    assert compare(base, slower, 0.2)[0].startswith("REGRESSION")
+    assert compare(base, more_queries, 0.2)[0].startswith("REGRESSION")
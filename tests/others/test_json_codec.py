@@ -0,0 +1,78 @@
+import json
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+from fastapi.responses import ORJSONResponse
+
+from app.core import json_codec
+from app.core.json_codec import load_codec, model_response
+from app.main import app
+from app.models.schemas import ReviewResponse
+
+CODECS = ["orjson", "ujson", "json"]
+
+PAYLOAD = {
+    "scores": {"total_score": 4.25, "count": 3},
+    "feedback": "Хорошо / отлично",
+    "answers": [{"question_id": "q1", "score": None}],
+}
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_codecs_write_identical_json(name):
+    codec = load_codec(name)
+
+    dumped = codec.dumps(PAYLOAD)
+
+    assert dumped == json.dumps(PAYLOAD, ensure_ascii=False, separators=(",", ":"))
+    assert codec.dumps_bytes(PAYLOAD) == dumped.encode()
+    assert codec.loads(dumped) == PAYLOAD
+    assert codec.loads(dumped.encode()) == PAYLOAD
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_codecs_handle_numpy_and_datetime(name):
+    codec = load_codec(name)
+    moment = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+    loaded = codec.loads(codec.dumps({"score": np.float64(1.5), "at": moment}))
+
+    assert loaded["score"] == 1.5
+    assert loaded["at"].startswith("2026-01-02T03:04:05")
+
+
+def test_use_codec_switches_module_functions():
+    previous = json_codec.use_codec("json")
+    try:
+        assert json_codec.codec.name == "json"
+        assert json_codec.loads(json_codec.dumps([1, "а"])) == [1, "а"]
+    finally:
+        json_codec.codec = previous
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        load_codec("yaml")
+
+
+def test_orjson_is_default_response_class():
+    assert json_codec.codec.name == "orjson"
+    assert app.router.default_response_class is ORJSONResponse
+
+
+def test_model_response_matches_model_json():
+    model = ReviewResponse(
+        id="r1",
+        goal_id="g1",
+        reviewer_id="u1",
+        review_type="self",
+        calculated_score=4.5,
+        created_at=datetime(2026, 1, 2, tzinfo=timezone.utc),
+    )
+
+    response = model_response(model, status_code=201)
+
+    assert response.status_code == 201
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == model.model_dump(mode="json")
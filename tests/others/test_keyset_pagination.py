@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.security import create_access_token
+from app.models.database import Goal, Notification, QuestionTemplate, User
+
+
+def headers(user):
+    return {"Authorization": f"Bearer {create_access_token({'sub': user.id})}"}
+
+
+def collect_pages(client, path, user, page_size):
+    """Пройти все страницы по X-Next-Cursor"""
+    items, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": page_size}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(path, params=params, headers=headers(user))
+        assert response.status_code == 200
+        items.extend(response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return items, pages
+
+
+@pytest.fixture
+def user(client, db_session):
+    user = User(
+        email="pager@company.com",
+        full_name="Pager",
+        hashed_password="x",
+        is_manager=True,
+    )
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+class TestCursor:
+    def test_roundtrip_normalizes_timezone(self):
+        aware = datetime(2026, 1, 2, 15, 0, tzinfo=timezone(timedelta(hours=3)))
+
+        created_at, item_id = decode_cursor(encode_cursor(aware, "abc"))
+
+        assert created_at == datetime(2026, 1, 2, 12, 0)
+        assert item_id == "abc"
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "W10", "e30"])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(HTTPException) as exc_info:
+            decode_cursor(cursor)
+        assert exc_info.value.status_code == 400
+
+
+class TestNotificationsPagination:
+    def test_pages_cover_history_without_duplicates(self, client, db_session, user):
+        base = datetime(2026, 1, 1)
+        # Одинаковые created_at проверяют разрешение ничьих по id
+        db_session.add_all(
+            Notification(
+                user_id=user.id,
+                title=f"n{i}",
+                message="m",
+                notification_type="goal_created",
+                created_at=base + timedelta(minutes=i // 3),
+            )
+            for i in range(12)
+        )
+        db_session.commit()
+
+        items, pages = collect_pages(client, "/api/v1/notifications/", user, 5)
+
+        assert pages == 3
+        assert len({item["id"] for item in items}) == 12
+        created = [item["created_at"] for item in items]
+        assert created == sorted(created, reverse=True)
+
+    def test_invalid_cursor_returns_400(self, client, user):
+        response = client.get(
+            "/api/v1/notifications/?cursor=garbage", headers=headers(user)
+        )
+        assert response.status_code == 400
+
+
+class TestGoalsPagination:
+    def test_employee_goals_pages(self, client, db_session, user):
+        base = datetime(2026, 1, 1)
+        db_session.add_all(
+            Goal(
+                title=f"g{i}",
+                description="d",
+                expected_result="r",
+                deadline=base + timedelta(days=90),
+                employee_id=user.id,
+                created_at=base + timedelta(hours=i),
+            )
+            for i in range(5)
+        )
+        db_session.commit()
+        path = f"/api/v1/goals/employee/{user.id}"
+
+        items, pages = collect_pages(client, path, user, 2)
+        legacy = client.get(path, headers=headers(user))
+
+        assert pages == 3
+        assert [goal["title"] for goal in items] == [f"g{i}" for i in range(5)]
+        assert "X-Next-Cursor" not in legacy.headers
+        assert [goal["title"] for goal in legacy.json()] == [
+            goal["title"] for goal in items
+        ]
+
+
+class TestTemplatesPagination:
+    def test_templates_pages_and_legacy_order(self, client, db_session, user):
+        base = datetime(2026, 1, 1)
+        db_session.add_all(
+            QuestionTemplate(
+                question_text=f"q{i}",
+                question_type="self",
+                order_index=10 - i,
+                created_at=base + timedelta(hours=i),
+            )
+            for i in range(4)
+        )
+        db_session.commit()
+        path = "/api/v1/question-templates/"
+
+        items, pages = collect_pages(client, path, user, 3)
+        legacy = client.get(path, headers=headers(user)).json()
+
+        assert pages == 2
+        assert [t["question_text"] for t in items] == ["q0", "q1", "q2", "q3"]
+        assert [t["question_text"] for t in legacy] == ["q3", "q2", "q1", "q0"]
@@ -0,0 +1,115 @@
+import json
+import logging
+import queue
+import sys
+import time
+
+import pytest
+
+from app.core.logger import (
+    DroppingQueueHandler,
+    JsonFormatter,
+    RateLimitFilter,
+    RedactQueryParamsFilter,
+    parse_logger_levels,
+)
+
+
+def make_record(msg="hot path", level=logging.INFO, lineno=10, **extra):
+    record = logging.LogRecord("test", level, "module.py", lineno, msg, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_parse_logger_levels():
+    levels = parse_logger_levels(" uvicorn.access=warning, performance_review=DEBUG,")
+
+    assert levels == {"uvicorn.access": logging.WARNING, "performance_review": 10}
+    with pytest.raises(ValueError):
+        parse_logger_levels("app=LOUD")
+
+
+def test_access_log_redacts_token_query_param():
+    """JWT из ?token= не попадает в журнал доступа"""
+    record = logging.LogRecord(
+        "uvicorn.access",
+        logging.INFO,
+        "h11_impl.py",
+        1,
+        '%s - "%s %s HTTP/%s" %d',
+        (
+            "127.0.0.1:5000",
+            "GET",
+            "/api/v1/notifications/stream?token=eyJ.secret.sig&x=1",
+            "1.1",
+            200,
+        ),
+        None,
+    )
+
+    assert RedactQueryParamsFilter().filter(record)
+
+    message = record.getMessage()
+    assert "eyJ.secret.sig" not in message
+    assert "/api/v1/notifications/stream?token=***&x=1" in message
+    assert logging.getLogger("uvicorn.access").filters
+
+
+class TestRateLimitFilter:
+    def test_limits_records_per_call_site(self):
+        limiter = RateLimitFilter(limit=2, window_seconds=60)
+
+        passed = [limiter.filter(make_record()) for _ in range(5)]
+
+        assert passed == [True, True, False, False, False]
+        # Другое место вызова и предупреждения не прореживаются
+        assert limiter.filter(make_record(lineno=11))
+        assert limiter.filter(make_record(level=logging.WARNING))
+
+    def test_reports_suppressed_in_next_window(self):
+        limiter = RateLimitFilter(limit=1, window_seconds=0.05)
+        for _ in range(4):
+            limiter.filter(make_record())
+
+        time.sleep(0.06)
+        record = make_record()
+
+        assert limiter.filter(record)
+        assert record.suppressed == 3
+
+
+def test_json_formatter_includes_extra_and_exception():
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        record = logging.LogRecord(
+            "test", logging.ERROR, "m.py", 1, "failed %s", ("goal",), True
+        )
+        record.exc_info = sys.exc_info()
+    record.goal_id = "g1"
+
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert payload["message"] == "failed goal"
+    assert payload["level"] == "ERROR"
+    assert payload["goal_id"] == "g1"
+    assert "RuntimeError: boom" in payload["exc"]
+
+
+def test_queue_handler_drops_when_full():
+    log_queue: queue.Queue = queue.Queue(maxsize=2)
+    handler = DroppingQueueHandler(log_queue)
+
+    for _ in range(4):
+        handler.handle(make_record())
+    assert handler.dropped == 2
+
+    log_queue.get_nowait()
+    log_queue.get_nowait()
+    handler.handle(make_record("after"))
+
+    assert log_queue.get_nowait().getMessage() == "after"
+    warning = log_queue.get_nowait()
+    assert warning.levelno == logging.WARNING
+    assert "Dropped 2 log records" in warning.getMessage()
+    assert handler.dropped == 0
@@ -0,0 +1,87 @@
+import pytest
+
+from app.core.metrics import (
+    CONTENT_TYPE,
+    Histogram,
+    MetricsRegistry,
+    http_request_duration_seconds,
+    http_requests_in_progress,
+    http_requests_total,
+)
+from app.core.middleware import UNMATCHED_ROUTE
+
+
+class TestRegistry:
+    def test_renders_text_format(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("jobs_total", "Jobs", ("kind",))
+        histogram = registry.histogram("job_seconds", "Job time", buckets=(0.1, 1.0))
+        counter.inc(kind='say "hi"')
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(3)
+
+        text = registry.render()
+
+        assert "# TYPE jobs_total counter" in text
+        assert 'jobs_total{kind="say \\"hi\\""} 1' in text
+        assert 'job_seconds_bucket{le="0.1"} 1' in text
+        assert 'job_seconds_bucket{le="1"} 2' in text
+        assert 'job_seconds_bucket{le="+Inf"} 3' in text
+        assert "job_seconds_sum 3.55" in text
+        assert "job_seconds_count 3" in text
+
+    def test_rejects_wrong_labels(self):
+        histogram = Histogram("x_seconds", "x", ("operation",))
+
+        with pytest.raises(ValueError):
+            histogram.observe(1.0, route="/")
+
+    def test_collectors_run_on_render(self):
+        registry = MetricsRegistry()
+        gauge = registry.gauge("queue_size", "Queue size")
+        registry.add_collector(lambda: gauge.set(7))
+
+        assert "queue_size 7" in registry.render()
+
+
+class TestMetricsEndpoint:
+    def test_requests_labelled_by_route_template(
+        self, client, test_goal_with_employee, employee_auth_headers
+    ):
+        labels = {"method": "GET", "route": "/api/v1/goals/{goal_id}"}
+        before = http_request_duration_seconds.count(**labels)
+
+        response = client.get(
+            f"/api/v1/goals/{test_goal_with_employee.id}",
+            headers=employee_auth_headers,
+        )
+
+        assert response.status_code == 200
+        assert http_request_duration_seconds.count(**labels) == before + 1
+        assert http_requests_total.value(status="200", **labels) >= 1
+        assert http_requests_in_progress.value(**labels) == 0
+
+    def test_unknown_paths_share_one_series(self, client):
+        labels = {"method": "GET", "route": UNMATCHED_ROUTE}
+        before = http_requests_total.value(status="404", **labels)
+
+        client.get("/no-such-page/1")
+        client.get("/no-such-page/2")
+
+        assert http_requests_total.value(status="404", **labels) == before + 2
+
+    def test_exposes_prometheus_text(self, client, test_goal_with_employee):
+        client.get("/")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == CONTENT_TYPE
+        assert 'http_requests_total{method="GET",route="/",status="200"}' in (
+            response.text
+        )
+        assert 'db_pool_connections{engine="sync",state="checked_out"}' in (
+            response.text
+        )
+        assert "# TYPE scoring_duration_seconds histogram" in response.text
@@ -0,0 +1,69 @@
+import pytest
+from sqlalchemy import create_engine, inspect, select, text
+
+from app.migrations.runner import (
+    MigrationError,
+    load_migrations,
+    pending_migrations,
+    run_migrations,
+    schema_migrations,
+)
+from app.models.database import Base, RespondentReview
+
+
+@pytest.fixture
+def fresh_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def test_versions_are_ordered():
+    versions = [migration.version for migration in load_migrations()]
+    assert versions == sorted(versions)
+    assert versions[:2] == ["0001", "0002"]
+
+
+def test_run_is_idempotent(fresh_engine):
+    assert [m.version for m in pending_migrations(fresh_engine)] == ["0001", "0002"]
+
+    assert run_migrations(fresh_engine) == ["0001", "0002"]
+    assert run_migrations(fresh_engine) == []
+    assert pending_migrations(fresh_engine) == []
+
+
+def test_creates_indexes_on_existing_tables(fresh_engine):
+    # Таблицы без индексов - как в базе, созданной до их появления в моделях
+    with fresh_engine.begin() as conn:
+        conn.execute(text("DROP INDEX uq_reviews_goal_reviewer_type"))
+        conn.execute(text("DROP INDEX ix_goal_steps_goal_order"))
+
+    run_migrations(fresh_engine)
+
+    inspector = inspect(fresh_engine)
+    review_indexes = {i["name"]: i for i in inspector.get_indexes("reviews")}
+    assert review_indexes["uq_reviews_goal_reviewer_type"]["unique"]
+    assert "ix_goal_steps_goal_order" in {
+        i["name"] for i in inspector.get_indexes("goal_steps")
+    }
+
+
+def test_duplicates_stop_unique_index(fresh_engine):
+    table = RespondentReview.__table__
+    with fresh_engine.begin() as conn:
+        conn.execute(text("DROP INDEX uq_respondent_reviews_goal_respondent"))
+        conn.execute(
+            table.insert(),
+            [
+                {"id": "r1", "goal_id": "g", "respondent_id": "u"},
+                {"id": "r2", "goal_id": "g", "respondent_id": "u"},
+            ],
+        )
+
+    with pytest.raises(MigrationError, match="duplicate rows in respondent_reviews"):
+        run_migrations(fresh_engine)
+
+    with fresh_engine.connect() as conn:
+        applied = conn.execute(select(schema_migrations.c.version)).scalars().all()
+    assert applied == ["0001"]
@@ -0,0 +1,122 @@
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.database.query_stats import (
+    QueryStats,
+    current_query_stats,
+    normalize_statement,
+    track_queries,
+)
+from app.database.session import engine
+
+
+class TestNormalizeStatement:
+    def test_collapses_in_lists(self):
+        short = "SELECT * FROM goals WHERE goals.id IN (?, ?)"
+        long = "SELECT *\n  FROM goals WHERE goals.id IN (?, ?, ?, ?)"
+
+        assert normalize_statement(short) == normalize_statement(long)
+        assert normalize_statement(short) == "SELECT * FROM goals WHERE goals.id IN (?)"
+
+    def test_collapses_multi_values_insert(self):
+        statement = "INSERT INTO t (a, b) VALUES (%(a_0)s, %(b_0)s), (%(a_1)s, %(b_1)s)"
+
+        assert normalize_statement(statement) == "INSERT INTO t (a, b) VALUES (?)"
+
+    def test_keeps_column_lists(self):
+        statement = "SELECT count(goals.id) FROM goals"
+
+        assert normalize_statement(statement) == statement
+
+
+class TestTrackQueries:
+    def test_counts_statements_and_time(self):
+        with track_queries("test") as stats:
+            assert current_query_stats() is stats
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+
+        assert stats.count == 2
+        assert stats.duration_ms >= 0
+        assert current_query_stats() is None
+
+    def test_ignores_queries_outside_request(self):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        assert current_query_stats() is None
+
+    def test_warns_once_about_repeated_statement(self):
+        stats = QueryStats("GET /api/v1/goals/", n_plus_one_threshold=3)
+
+        with patch("app.database.query_stats.logger") as mock_logger:
+            for _ in range(10):
+                stats.record("SELECT * FROM reviews WHERE goal_id = ?", 0.1)
+            stats.record("SELECT * FROM goals", 0.1)
+
+        mock_logger.warning.assert_called_once()
+        assert "GET /api/v1/goals/" in mock_logger.warning.call_args[0][0]
+        assert stats.repeated() == {"SELECT * FROM reviews WHERE goal_id = ?": 10}
+
+    def test_threshold_zero_disables_warning(self):
+        stats = QueryStats(n_plus_one_threshold=0)
+
+        with patch("app.database.query_stats.logger") as mock_logger:
+            for _ in range(50):
+                stats.record("SELECT 1", 0.1)
+
+        mock_logger.warning.assert_not_called()
+
+
+class TestQueryStatsMiddleware:
+    def test_debug_headers(self, client, auth_headers, create_test_goal):
+        with patch.object(settings, "DEBUG", True):
+            response = client.get(
+                f"/api/v1/goals/{create_test_goal}", headers=auth_headers
+            )
+
+        assert response.status_code == 200
+        assert int(response.headers["X-DB-Queries"]) >= 1
+        assert float(response.headers["X-DB-Time-ms"]) >= 0
+
+    def test_no_headers_without_debug(self, client, auth_headers, create_test_goal):
+        with patch.object(settings, "DEBUG", False):
+            response = client.get(
+                f"/api/v1/goals/{create_test_goal}", headers=auth_headers
+            )
+
+        assert response.status_code == 200
+        assert "X-DB-Queries" not in response.headers
+
+
+class TestEndpointQueryBudgets:
+    def test_unread_count(self, client, auth_headers, query_budget):
+        # Первый вызов создает счетчик непрочитанных
+        client.get("/api/v1/notifications/unread-count", headers=auth_headers)
+
+        with query_budget(2):
+            response = client.get(
+                "/api/v1/notifications/unread-count", headers=auth_headers
+            )
+        assert response.status_code == 200
+
+    def test_get_goal(self, client, auth_headers, create_test_goal, query_budget):
+        with query_budget(3):
+            response = client.get(
+                f"/api/v1/goals/{create_test_goal}", headers=auth_headers
+            )
+        assert response.status_code == 200
+
+    def test_budget_failure_lists_statements(self, query_budget):
+        with pytest.raises(pytest.fail.Exception) as exc_info:
+            with query_budget(1):
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+                    conn.execute(text("SELECT 1"))
+
+        assert "2 > 1" in str(exc_info.value)
+        assert "2x SELECT 1" in str(exc_info.value)
@@ -0,0 +1,80 @@
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.admin.lazy import LazyASGIApp, mount_admin
+from app.core.config import settings
+from app.main import app
+from benchmarks.startup import breakdown, parse_importtime
+
+
+def test_lazy_app_is_built_once_on_first_request():
+    builds = []
+
+    def factory():
+        builds.append(1)
+        return Starlette(routes=[Route("/", lambda request: PlainTextResponse("ok"))])
+
+    lazy = LazyASGIApp(factory)
+    host = Starlette()
+    host.mount("/lazy", app=lazy)
+    client = TestClient(host)
+
+    assert not lazy.is_built
+    assert client.get("/lazy/").text == "ok"
+    assert client.get("/lazy/").text == "ok"
+    assert builds == [1]
+
+
+def test_lazy_admin_serves_login_page():
+    host = FastAPI()
+    mount_admin(host, lazy=True)
+
+    response = TestClient(host).get("/admin/login")
+
+    assert response.status_code == 200
+    assert "/admin/login" in response.text
+
+
+def test_production_startup_skips_schema_creation(monkeypatch):
+    monkeypatch.setattr(settings, "STARTUP_MODE", "production")
+    monkeypatch.setattr(settings, "EMAIL_DISPATCHER_ENABLED", False)
+
+    with patch("app.main.Base.metadata.create_all") as create_all, patch(
+        "app.main.run_migrations"
+    ) as run_migrations:
+        with TestClient(app) as client:
+            assert client.get("/").status_code == 200
+
+    create_all.assert_not_called()
+    run_migrations.assert_not_called()
+
+
+def test_importtime_breakdown():
+    output = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       300 |        300 |     sqlalchemy.sql",
+            "import time:       200 |        500 |   sqlalchemy",
+            "import time:      1500 |       2000 | app.models.database",
+            "-- app.main imported --",
+            "import time:      9000 |       9000 | httpx",
+        ]
+    )
+
+    modules = parse_importtime(output)
+
+    assert [m["module"] for m in modules] == [
+        "sqlalchemy.sql",
+        "sqlalchemy",
+        "app.models.database",
+    ]
+    assert modules[0]["depth"] == 2
+    assert breakdown(modules, top=2) == [
+        {"name": "app.models.database", "ms": 1.5},
+        {"name": "sqlalchemy", "ms": 0.5},
+    ]
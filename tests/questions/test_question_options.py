@@ -0,0 +1,143 @@
+import json
+
+import pytest
+
+from app.models.database import QuestionTemplate
+from app.models.schemas import Answer
+from app.services.question_cache import question_cache
+from app.services.question_options import (
+    InvalidOptionError,
+    InvalidOptionsError,
+    parse_option_scores,
+)
+from app.services.review_service import ReviewService
+
+OPTIONS = json.dumps(
+    [
+        {"id": "low", "text": "Низко", "value": 1.0, "order_index": 1},
+        {"id": "high", "text": "Высоко", "value": 4.0, "order_index": 2},
+    ]
+)
+
+
+def template_payload(options_json):
+    return {
+        "question_text": "Выберите вариант",
+        "question_type": "self",
+        "weight": 1.0,
+        "max_score": 4,
+        "order_index": 0,
+        "options_json": options_json,
+    }
+
+
+@pytest.fixture
+def options_question(db_session):
+    question = QuestionTemplate(
+        question_text="Выберите вариант",
+        question_type="self",
+        max_score=4,
+        options_json=OPTIONS,
+    )
+    db_session.add(question)
+    db_session.commit()
+    return question
+
+
+class TestParseOptionScores:
+    def test_compiles_immutable_map(self):
+        scores = parse_option_scores(OPTIONS)
+
+        assert dict(scores) == {"low": 1.0, "high": 4.0}
+        with pytest.raises(TypeError):
+            scores["low"] = 5.0  # type: ignore
+
+    @pytest.mark.parametrize(
+        "options_json",
+        [
+            "not json",
+            '{"id": "a"}',
+            '[{"text": "без id"}]',
+            '[{"id": "a", "value": "много"}]',
+            '[{"id": "a"}, {"id": "a"}]',
+            '[{"id": " "}]',
+        ],
+    )
+    def test_rejects_invalid(self, options_json):
+        with pytest.raises(InvalidOptionsError):
+            parse_option_scores(options_json)
+
+
+class TestOptionScoring:
+    def test_cached_template_has_scores(self, db_session, options_question):
+        cached = question_cache.get(db_session, options_question.id)
+
+        assert cached.option_scores == {"low": 1.0, "high": 4.0}
+
+    def test_score_from_option(self, db_session, options_question):
+        answers = [Answer(question_id=options_question.id, selected_option="high")]
+
+        score = ReviewService(db_session).calculate_weighted_score(answers, "self")
+
+        assert score == 5.0
+
+    def test_unknown_option_is_reported(self, db_session, options_question):
+        answers = [Answer(question_id=options_question.id, selected_option="nope")]
+
+        with pytest.raises(InvalidOptionError) as exc_info:
+            ReviewService(db_session).calculate_weighted_score(answers, "self")
+        assert exc_info.value.option_id == "nope"
+
+    def test_review_with_unknown_option_returns_400(
+        self,
+        client,
+        options_question,
+        test_goal_with_employee,
+        employee_auth_headers,
+    ):
+        response = client.post(
+            "/api/v1/reviews/",
+            json={
+                "goal_id": test_goal_with_employee.id,
+                "review_type": "self",
+                "answers": [
+                    {"question_id": options_question.id, "selected_option": "nope"}
+                ],
+            },
+            headers=employee_auth_headers,
+        )
+
+        assert response.status_code == 400
+        assert "nope" in response.json()["detail"]
+
+
+class TestTemplateWriteValidation:
+    def test_orm_write_rejects_invalid_options(self, db_session):
+        db_session.add(
+            QuestionTemplate(
+                question_text="q", question_type="self", options_json="[{}]"
+            )
+        )
+
+        with pytest.raises(InvalidOptionsError):
+            db_session.commit()
+        db_session.rollback()
+
+    def test_api_stores_options(self, client, manager_auth_headers):
+        response = client.post(
+            "/api/v1/question-templates/",
+            json=template_payload(OPTIONS),
+            headers=manager_auth_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["options_json"] == OPTIONS
+
+    def test_api_rejects_invalid_options(self, client, manager_auth_headers):
+        response = client.post(
+            "/api/v1/question-templates/",
+            json=template_payload('[{"id": "a"}, {"id": "a"}]'),
+            headers=manager_auth_headers,
+        )
+
+        assert response.status_code == 422
@@ -0,0 +1,72 @@
+from app.models.database import QuestionTemplate
+from app.models.schemas import Answer
+from app.services.question_cache import question_cache
+from app.services.review_service import ReviewService
+
+
+class TestQuestionTemplateCache:
+
+    def _create_questions(self, db_session, count=15):
+        questions = [
+            QuestionTemplate(
+                question_text=f"Вопрос {i}",
+                question_type="self",
+                weight=1.0,
+                max_score=5,
+                trigger_words='["сложн", "проблем"]',
+            )
+            for i in range(count)
+        ]
+        db_session.add_all(questions)
+        db_session.commit()
+        return questions
+
+    def test_scoring_uses_single_bulk_load(self, db_session, count_queries):
+        """Расчет баллов не делает запрос на каждый ответ"""
+        questions = self._create_questions(db_session)
+        answers = [
+            Answer(question_id=q.id, score=4, answer="Были сложности")  # type: ignore
+            for q in questions
+        ]
+        service = ReviewService(db_session)
+
+        with count_queries() as statements:
+            service.calculate_weighted_score(answers, "self")
+            service.calculate_potential_score(answers)
+            service.extract_trigger_words_feedback(answers)
+
+        template_queries = [s for s in statements if "question_templates" in s]
+        assert len(template_queries) <= 1
+
+        with count_queries() as statements:
+            score = service.calculate_weighted_score(answers, "self")
+
+        assert statements == []
+        assert abs(score - 4.0) < 0.01
+
+    def test_cache_invalidated_on_template_update(self, db_session):
+        """Изменение шаблона сбрасывает кэш"""
+        question = self._create_questions(db_session, count=1)[0]
+        service = ReviewService(db_session)
+
+        assert service.get_question_by_id(question.id).weight == 1.0  # type: ignore
+
+        version = question_cache.version
+        question.weight = 2.5  # type: ignore
+        db_session.commit()
+
+        assert question_cache.version > version
+        assert service.get_question_by_id(question.id).weight == 2.5  # type: ignore
+
+    def test_cache_skips_deactivated_templates(self, db_session):
+        """Деактивированный шаблон пропадает из кэша"""
+        question = self._create_questions(db_session, count=1)[0]
+        service = ReviewService(db_session)
+        assert service.get_question_by_id(question.id) is not None  # type: ignore
+
+        db_session.query(QuestionTemplate).filter(
+            QuestionTemplate.id == question.id
+        ).update({"is_active": False})
+        db_session.commit()
+
+        assert service.get_question_by_id(question.id) is None  # type: ignore
@@ -0,0 +1,154 @@
+import json
+
+from app.models.database import RespondentReview, Review, ReviewAnswer
+from app.models.schemas import Answer
+from app.services.analytics_service import AnalyticsService
+from app.services.review_answers import (
+    backfill_review_answers,
+    get_review_answers,
+    set_respondent_answers,
+    set_review_answers,
+    update_answer_scores,
+)
+
+
+def _answers():
+    return [
+        Answer(question_id="q1", answer="Сделал модуль", score=4),
+        Answer(question_id="q2", answer="Нужна оценка"),
+        Answer(question_id="q3", selected_option="a"),
+    ]
+
+
+def _self_review(goal):
+    return Review(goal_id=goal.id, reviewer_id=goal.employee_id, review_type="self")
+
+
+class TestReviewAnswers:
+
+    def test_answers_written_to_table_and_json(
+        self, db_session, test_goal_with_employee
+    ):
+        """Ответы пишутся строками review_answers и в JSON-поле"""
+        review = _self_review(test_goal_with_employee)
+        set_review_answers(review, _answers())
+        db_session.add(review)
+        db_session.commit()
+
+        rows = (
+            db_session.query(ReviewAnswer)
+            .filter(ReviewAnswer.review_id == review.id)
+            .order_by(ReviewAnswer.position)
+            .all()
+        )
+        assert [row.question_id for row in rows] == ["q1", "q2", "q3"]
+        assert rows[0].score == 4 and rows[2].selected_option == "a"
+        assert all(row.goal_id == test_goal_with_employee.id for row in rows)
+        assert len(json.loads(review.self_evaluation_answers)) == 3
+        assert get_review_answers(review) == _answers()
+
+    def test_partial_score_update(self, db_session, test_goal_with_employee):
+        """Балл обновляется только у указанного вопроса"""
+        review = _self_review(test_goal_with_employee)
+        set_review_answers(review, _answers())
+        db_session.add(review)
+        db_session.commit()
+
+        answers = update_answer_scores(review, [Answer(question_id="q2", score=8)])
+        db_session.commit()
+
+        assert [a.score for a in answers] == [4, 8, None]
+        row = (
+            db_session.query(ReviewAnswer)
+            .filter(
+                ReviewAnswer.review_id == review.id, ReviewAnswer.question_id == "q2"
+            )
+            .one()
+        )
+        assert row.score == 8
+        # JSON-поле не переписывается, ответы читаются из строк
+        assert json.loads(review.self_evaluation_answers)[1].get("score") is None
+        assert get_review_answers(review)[1].score == 8
+
+    def test_partial_score_update_syncs_legacy_json_on_request(
+        self, db_session, test_goal_with_employee
+    ):
+        """С sync_legacy_json JSON-поле обновляется вместе со строками"""
+        review = _self_review(test_goal_with_employee)
+        set_review_answers(review, _answers())
+        db_session.add(review)
+        db_session.commit()
+
+        update_answer_scores(
+            review, [Answer(question_id="q2", score=8)], sync_legacy_json=True
+        )
+        db_session.commit()
+
+        assert json.loads(review.self_evaluation_answers)[1]["score"] == 8
+
+    def test_backfill_migrates_legacy_json(self, db_session, test_goal_with_employee):
+        """Backfill переносит старые JSON-ответы и безопасен при повторе"""
+        legacy = _self_review(test_goal_with_employee)
+        legacy.self_evaluation_answers = json.dumps(
+            [a.model_dump() for a in _answers()], ensure_ascii=False
+        )
+        legacy_respondent = RespondentReview(
+            goal_id=test_goal_with_employee.id,
+            respondent_id=test_goal_with_employee.employee_id,
+            answers=json.dumps([{"question_id": "q1", "score": 5}]),
+        )
+        db_session.add_all([legacy, legacy_respondent])
+        db_session.commit()
+
+        assert backfill_review_answers(db_session, batch_size=1) == 2
+        assert backfill_review_answers(db_session) == 0
+
+        assert db_session.query(ReviewAnswer).count() == 4
+        respondent_row = (
+            db_session.query(ReviewAnswer)
+            .filter(ReviewAnswer.respondent_review_id == legacy_respondent.id)
+            .one()
+        )
+        assert respondent_row.review_type == "respondent"
+
+    def test_question_averages_in_sql(self, db_session, test_goal_with_employee):
+        """Средний балл по вопросу считается одним агрегирующим запросом"""
+        for score in (2, 4):
+            respondent_review = RespondentReview(
+                goal_id=test_goal_with_employee.id,
+                respondent_id=f"respondent-{score}",
+            )
+            set_respondent_answers(
+                respondent_review,
+                [Answer(question_id="q1", score=score), Answer(question_id="q2")],
+            )
+            db_session.add(respondent_review)
+        db_session.commit()
+
+        averages = AnalyticsService(db_session).get_question_score_averages(
+            goal_ids=[test_goal_with_employee.id], review_type="respondent"
+        )
+
+        assert averages == {"q1": {"average_score": 3.0, "answer_count": 2}}
+
+    def test_create_review_endpoint_writes_rows(
+        self, client, employee_auth_headers, test_goal_with_employee, db_session
+    ):
+        """Эндпоинт создания оценки сохраняет ответы в review_answers"""
+        response = client.post(
+            "/api/v1/reviews/",
+            json={
+                "goal_id": test_goal_with_employee.id,
+                "review_type": "self",
+                "answers": [{"question_id": "q1", "answer": "Готово", "score": 5}],
+            },
+            headers=employee_auth_headers,
+        )
+        assert response.status_code == 200, response.text
+
+        rows = (
+            db_session.query(ReviewAnswer)
+            .filter(ReviewAnswer.review_id == response.json()["id"])
+            .all()
+        )
+        assert [(row.question_id, row.score) for row in rows] == [("q1", 5)]
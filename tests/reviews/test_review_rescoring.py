@@ -0,0 +1,195 @@
+import json
+import random
+
+import pytest
+
+from app.models.database import GoalAnalyticsSnapshot, QuestionTemplate, Review
+from app.models.schemas import Answer
+from app.services.review_answers import get_review_answers, set_review_answers
+from app.services.review_rescoring import ReviewRescoringService
+from app.services.review_service import ReviewService
+
+OPTIONS = json.dumps(
+    [{"id": "low", "value": 1}, {"id": "high", "value": 5}, {"id": "none"}]
+)
+
+
+@pytest.fixture
+def templates(db_session):
+    """Шаблоны на все ветки расчета балла"""
+    questions = [
+        QuestionTemplate(
+            id="plain", question_text="q", question_type="self", weight=1.5
+        ),
+        QuestionTemplate(
+            id="manager",
+            question_text="q",
+            question_type="self",
+            weight=2.0,
+            max_score=10,
+            requires_manager_scoring=True,
+        ),
+        QuestionTemplate(
+            id="options",
+            question_text="q",
+            question_type="self",
+            options_json=OPTIONS,
+        ),
+        QuestionTemplate(
+            id="inactive", question_text="q", question_type="self", is_active=False
+        ),
+    ]
+    questions += [
+        QuestionTemplate(
+            id=section,
+            question_text="q",
+            question_type="potential",
+            section=section,
+            weight=weight,
+            max_score=10,
+        )
+        for section, weight in (
+            ("professional", 1.0),
+            ("personal", 2.0),
+            ("development", 0.5),
+        )
+    ]
+    db_session.add_all(questions)
+    db_session.commit()
+    return questions
+
+
+def random_answers(rng, question_ids):
+    answers = []
+    for question_id in question_ids:
+        if question_id == "options":
+            option = rng.choice(["low", "high", "none", None])
+            answers.append(Answer(question_id=question_id, selected_option=option))
+        else:
+            score = rng.choice([None, 1, 3, 5, 8])
+            answers.append(Answer(question_id=question_id, score=score))
+    return answers
+
+
+def add_reviews(db_session, goal, count):
+    rng = random.Random(7)
+    self_questions = ["plain", "manager", "options", "inactive", "unknown"]
+    potential_questions = ["professional", "personal", "development"]
+    reviews = []
+    for i in range(count):
+        review_type = "potential" if i % 3 == 0 else "self"
+        questions = (
+            potential_questions if review_type == "potential" else self_questions
+        )
+        # Одна оценка каждого типа на пару (цель, оценивающий)
+        review = Review(
+            goal_id=goal.id,
+            reviewer_id=f"reviewer-{i}",
+            review_type=review_type,
+            calculated_score=-1.0,
+        )
+        set_review_answers(review, random_answers(rng, rng.sample(questions, 3)))
+        reviews.append(review)
+    db_session.add_all(reviews)
+    db_session.commit()
+    return reviews
+
+
+def expected_score(service, review):
+    answers = get_review_answers(review)
+    if review.review_type == "potential":
+        return service.calculate_potential_score(answers)
+    return service.calculate_weighted_score(answers, review.review_type)
+
+
+class TestReviewRescoring:
+    def test_matches_review_service(
+        self, db_session, templates, test_goal_with_employee
+    ):
+        reviews = add_reviews(db_session, test_goal_with_employee, 30)
+        templates[0].weight = 3.0
+        templates[1].max_score = 5
+        db_session.commit()
+
+        result = ReviewRescoringService(db_session, batch_size=7).rescore()
+
+        assert result.reviews == 30
+        service = ReviewService(db_session)
+        for review in reviews:
+            db_session.refresh(review)
+            expected = expected_score(service, review)
+            if review.review_type == "potential":
+                assert review.calculated_score == expected["total_potential_score"]
+                assert json.loads(review.manager_feedback) == pytest.approx(expected)
+            else:
+                assert review.calculated_score == pytest.approx(expected)
+
+    def test_only_reviews_with_given_questions(
+        self, db_session, templates, test_goal_with_employee
+    ):
+        reviews = add_reviews(db_session, test_goal_with_employee, 12)
+        affected = {
+            review.id
+            for review in reviews
+            if any(a.question_id == "personal" for a in get_review_answers(review))
+        }
+
+        result = ReviewRescoringService(db_session).rescore(["personal"])
+
+        assert result.reviews == len(affected)
+        for review in reviews:
+            db_session.refresh(review)
+            assert (review.calculated_score != -1.0) == (review.id in affected)
+
+    def test_unknown_options_are_counted(
+        self, db_session, templates, test_goal_with_employee
+    ):
+        review = Review(
+            goal_id=test_goal_with_employee.id,
+            reviewer_id=test_goal_with_employee.employee_id,
+            review_type="self",
+        )
+        set_review_answers(
+            review,
+            [
+                Answer(question_id="plain", score=4),
+                Answer(question_id="options", selected_option="missing"),
+            ],
+        )
+        db_session.add(review)
+        db_session.commit()
+
+        result = ReviewRescoringService(db_session).rescore()
+
+        db_session.refresh(review)
+        assert result.invalid_options == 1
+        assert review.calculated_score == 4.0
+
+    def test_marks_snapshots_stale(
+        self, db_session, templates, test_goal_with_employee
+    ):
+        add_reviews(db_session, test_goal_with_employee, 3)
+        db_session.add(
+            GoalAnalyticsSnapshot(goal_id=test_goal_with_employee.id, data="{}")
+        )
+        db_session.commit()
+
+        ReviewRescoringService(db_session).rescore()
+
+        snapshot = db_session.get(GoalAnalyticsSnapshot, test_goal_with_employee.id)
+        db_session.refresh(snapshot)
+        assert snapshot.is_stale
+
+    def test_queries_per_batch(
+        self, db_session, templates, test_goal_with_employee, count_queries
+    ):
+        add_reviews(db_session, test_goal_with_employee, 40)
+        service = ReviewRescoringService(db_session, batch_size=20)
+        service.rescore()  # прогрев кэша шаблонов
+
+        with count_queries() as queries:
+            result = service.rescore()
+
+        assert result.updated == 0
+        # 2 пачки по (оценки + ответы) и пустая выборка в конце
+        assert len(queries) == 5
@@ -0,0 +1,75 @@
+import random
+
+from app.models.database import QuestionTemplate
+from app.services.question_cache import CachedQuestion
+from app.services.trigger_matcher import (
+    AhoCorasick,
+    TriggerMatcher,
+    trigger_matcher_cache,
+)
+
+
+def _question(question_id, trigger_words):
+    return CachedQuestion(
+        id=question_id,
+        question_text="Вопрос",
+        question_type="self",
+        section=None,
+        weight=1.0,
+        max_score=5,
+        order_index=0,
+        trigger_words=trigger_words,
+        options_json=None,
+        requires_manager_scoring=False,
+        is_active=True,
+    )
+
+
+def test_automaton_matches_naive_search():
+    """Результат совпадает с поиском каждой подстроки отдельно"""
+    patterns = ["he", "she", "his", "hers", "сложн", "сложност", "ложь", "проблем"]
+    automaton = AhoCorasick(patterns)
+    rng = random.Random(42)
+    alphabet = "hersiсложнтьпробем "
+
+    for _ in range(200):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        assert automaton.find(text) == {p for p in patterns if p in text}
+
+
+def test_matcher_filters_by_answered_questions():
+    """Учитываются только триггеры отвеченных вопросов"""
+    matcher = TriggerMatcher(
+        [
+            _question("q1", '["сложн"]'),
+            _question("q2", '["команд"]'),
+            _question("q3", "not json"),
+        ]
+    )
+    text = "сложная задача для команды"
+
+    assert matcher.match_categories(text) == {"problem", "communication"}
+    assert matcher.match_categories(text, {"q1"}) == {"problem"}
+    assert matcher.match_categories(text, {"q3"}) == set()
+
+
+def test_matcher_rebuilt_only_on_template_change(db_session):
+    """Матчер пересобирается только после изменения шаблонов"""
+    question = QuestionTemplate(
+        question_text="Опишите сложности",
+        question_type="self",
+        trigger_words='["сложн"]',
+    )
+    db_session.add(question)
+    db_session.commit()
+
+    matcher = trigger_matcher_cache.get(db_session)
+    assert trigger_matcher_cache.get(db_session) is matcher
+    assert matcher.match_categories("лидерство") == set()
+
+    question.trigger_words = '["лидер"]'  # type: ignore
+    db_session.commit()
+
+    rebuilt = trigger_matcher_cache.get(db_session)
+    assert rebuilt is not matcher
+    assert rebuilt.match_categories("лидерство") == {"leadership"}
@@ -0,0 +1,49 @@
+from app.core.security import create_access_token, token_cache, verify_token
+from app.models.database import User
+from app.services.user_service import UserService
+
+
+class TestAuthenticatedUserCache:
+
+    def test_repeated_requests_skip_user_select(
+        self, client, auth_headers, count_queries
+    ):
+        """Повторный запрос с тем же токеном не читает users"""
+        assert client.get("/api/v1/auth/me", headers=auth_headers).status_code == 200
+
+        with count_queries() as statements:
+            response = client.get("/api/v1/auth/me", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert not [s for s in statements if "FROM users" in s]
+
+    def test_assign_manager_invalidates_cache(
+        self, client, auth_headers, db_session, test_manager_user
+    ):
+        """Назначение руководителя сразу видно в /me"""
+        me = client.get("/api/v1/auth/me", headers=auth_headers).json()
+        assert me["manager_id"] is None
+
+        assert UserService(db_session).assign_manager(me["id"], test_manager_user.id)
+
+        me = client.get("/api/v1/auth/me", headers=auth_headers).json()
+        assert me["manager_id"] == test_manager_user.id
+
+    def test_admin_style_edit_invalidates_cache(self, client, auth_headers, db_session):
+        """Изменение пользователя через ORM сбрасывает кэш"""
+        me = client.get("/api/v1/auth/me", headers=auth_headers).json()
+
+        user = db_session.get(User, me["id"])
+        user.full_name = "Renamed User"  # type: ignore
+        db_session.commit()
+
+        me = client.get("/api/v1/auth/me", headers=auth_headers).json()
+        assert me["full_name"] == "Renamed User"
+
+
+def test_verified_token_is_cached():
+    """Повторная проверка токена не декодирует JWT"""
+    token = create_access_token({"sub": "user-123"})
+    assert verify_token(token) == "user-123"
+    assert token_cache.get(token) == "user-123"
+    assert verify_token(token) == "user-123"
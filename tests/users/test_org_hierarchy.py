@@ -0,0 +1,193 @@
+from datetime import datetime, timedelta
+
+from app.core.security import create_access_token
+from app.models.database import Goal, GoalAnalyticsSnapshot, OrgHierarchy, User
+from app.services.org_hierarchy import OrgHierarchyService, rebuild_org_hierarchy
+from app.services.user_service import UserService
+
+
+def closure(db_session):
+    return {
+        (row.ancestor_id, row.descendant_id): row.depth
+        for row in db_session.query(OrgHierarchy)
+    }
+
+
+def make_user(db_session, name, manager=None, is_manager=True):
+    user = User(
+        email=f"{name}@company.com",
+        full_name=name,
+        hashed_password="x",
+        is_manager=is_manager,
+        manager_id=manager.id if manager else None,
+    )
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def make_tree(db_session):
+    """director -> (head_a -> (lead -> dev), head_b)"""
+    director = make_user(db_session, "director")
+    head_a = make_user(db_session, "head_a", director)
+    head_b = make_user(db_session, "head_b", director)
+    lead = make_user(db_session, "lead", head_a)
+    dev = make_user(db_session, "dev", lead, is_manager=False)
+    return director, head_a, head_b, lead, dev
+
+
+def headers(user):
+    return {"Authorization": f"Bearer {create_access_token({'sub': user.id})}"}
+
+
+class TestClosureMaintenance:
+    def test_insert_builds_ancestor_rows(self, db_session):
+        director, head_a, _, lead, dev = make_tree(db_session)
+        rows = closure(db_session)
+
+        assert rows[(dev.id, dev.id)] == 0
+        assert rows[(lead.id, dev.id)] == 1
+        assert rows[(head_a.id, dev.id)] == 2
+        assert rows[(director.id, dev.id)] == 3
+
+    def test_assign_manager_moves_subtree(self, db_session):
+        director, head_a, head_b, lead, dev = make_tree(db_session)
+
+        assert UserService(db_session).assign_manager(lead.id, head_b.id)
+        rows = closure(db_session)
+
+        assert (head_a.id, lead.id) not in rows
+        assert (head_a.id, dev.id) not in rows
+        assert rows[(head_b.id, dev.id)] == 2
+        assert rows[(director.id, dev.id)] == 3
+
+    def test_assign_manager_rejects_cycle(self, db_session):
+        director, head_a, _, lead, _ = make_tree(db_session)
+
+        assert not UserService(db_session).assign_manager(head_a.id, lead.id)
+        assert not UserService(db_session).assign_manager(head_a.id, head_a.id)
+        assert closure(db_session)[(director.id, lead.id)] == 2
+
+    def test_register_adds_node(self, client, db_session):
+        director = make_user(db_session, "director")
+
+        response = client.post(
+            "/api/v1/auth/register",
+            json={
+                "email": "newbie@company.com",
+                "full_name": "Newbie",
+                "password": "secret123",
+                "manager_id": director.id,
+            },
+        )
+
+        assert response.status_code == 200
+        new_id = response.json()["id"]
+        assert closure(db_session)[(director.id, new_id)] == 1
+
+    def test_rebuild_matches_incremental(self, db_session):
+        make_tree(db_session)
+        incremental = closure(db_session)
+
+        rebuild_org_hierarchy(db_session)
+        db_session.commit()
+
+        assert closure(db_session) == incremental
+
+
+class TestOrgEndpoints:
+    def test_my_org_returns_whole_subtree(self, client, db_session):
+        director, head_a, head_b, lead, dev = make_tree(db_session)
+
+        response = client.get("/api/v1/users/my-org", headers=headers(director))
+
+        assert response.status_code == 200
+        assert [(u["full_name"], u["depth"]) for u in response.json()] == [
+            ("head_a", 1),
+            ("head_b", 1),
+            ("lead", 2),
+            ("dev", 3),
+        ]
+
+        limited = client.get(
+            "/api/v1/users/my-org?max_depth=1", headers=headers(director)
+        )
+        assert len(limited.json()) == 2
+
+    def test_my_org_requires_manager(self, client, db_session):
+        *_, dev = make_tree(db_session)
+
+        response = client.get("/api/v1/users/my-org", headers=headers(dev))
+
+        assert response.status_code == 403
+
+    def test_org_goals_and_rollup(self, client, db_session, query_budget):
+        director, head_a, head_b, lead, dev = make_tree(db_session)
+        deadline = datetime.now() + timedelta(days=30)
+        goals = [
+            Goal(
+                title=f"Goal {i}",
+                description="d",
+                expected_result="r",
+                deadline=deadline,
+                employee_id=owner.id,
+                status="completed" if i == 0 else "active",
+            )
+            for i, owner in enumerate([dev, dev, head_b])
+        ]
+        db_session.add_all(goals)
+        db_session.commit()
+        db_session.add_all(
+            [
+                GoalAnalyticsSnapshot(goal_id=goals[0].id, data="{}", total_score=4.0),
+                GoalAnalyticsSnapshot(
+                    goal_id=goals[2].id, data="{}", total_score=2.0, is_stale=True
+                ),
+            ]
+        )
+        db_session.commit()
+
+        goals_response = client.get("/api/v1/goals/org/my", headers=headers(director))
+        assert goals_response.status_code == 200
+        assert len(goals_response.json()) == 3
+
+        with query_budget(2):
+            response = client.get(
+                "/api/v1/analytics/org/summary", headers=headers(director)
+            )
+        assert response.status_code == 200
+        summary = response.json()
+
+        assert summary["total"]["employees"] == 4
+        assert summary["total"]["goals"] == 3
+        assert summary["total"]["completed_goals"] == 1
+        assert summary["total"]["analyzed_goals"] == 2
+        assert summary["total"]["stale_goals"] == 1
+        assert summary["total"]["average_score"] == 3.0
+
+        teams = {team["full_name"]: team for team in summary["teams"]}
+        assert teams["head_a"]["employees"] == 3
+        assert teams["head_a"]["goals"] == 2
+        assert teams["head_b"]["goals"] == 1
+
+
+class TestOrgQueryCount:
+    def test_subtree_queries_do_not_grow_with_tree(self, db_session, count_queries):
+        director = make_user(db_session, "director")
+        director_id = director.id
+        service = OrgHierarchyService(db_session)
+
+        with count_queries() as small:
+            service.get_subtree_users(director_id)
+            service.get_analytics_rollup(director_id)
+
+        parent = director
+        for i in range(30):
+            parent = make_user(db_session, f"level{i}", parent)
+
+        with count_queries() as large:
+            users = service.get_subtree_users(director_id)
+            service.get_analytics_rollup(director_id)
+
+        assert len(users) == 30
+        assert len(large) == len(small) == 2
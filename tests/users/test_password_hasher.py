@@ -0,0 +1,89 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.security import PasswordHasher, password_hasher
+
+
+def test_hashing_runs_outside_event_loop():
+    """bcrypt выполняется в отдельном потоке пула"""
+    hasher = PasswordHasher(max_workers=1, max_pending=4)
+
+    async def main():
+        return await hasher.run(lambda: threading.current_thread().name)
+
+    try:
+        assert asyncio.run(main()).startswith("password-hash")
+    finally:
+        hasher.shutdown()
+
+
+def test_saturated_pool_returns_503():
+    """Переполненная очередь сразу отвечает 503"""
+    hasher = PasswordHasher(max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def main():
+        blocked = asyncio.ensure_future(hasher.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        assert hasher.pending == 1
+        with pytest.raises(HTTPException) as exc_info:
+            await hasher.run(lambda: None)
+        release.set()
+        await blocked
+        return exc_info.value
+
+    try:
+        error = asyncio.run(main())
+    finally:
+        hasher.shutdown()
+
+    assert error.status_code == 503
+    assert hasher.pending == 0
+
+
+def test_login_returns_503_when_hasher_busy(
+    client, auth_headers, test_user_data, monkeypatch
+):
+    """Логин при перегрузке пула получает 503, а не блокирует сервер"""
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": test_user_data["email"], "password": test_user_data["password"]},
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_cancelled_request_keeps_slot_until_thread_finishes():
+    """Отмена запроса не освобождает слот, пока bcrypt занимает поток"""
+    hasher = PasswordHasher(max_workers=1, max_pending=1)
+    release = threading.Event()
+    finished = threading.Event()
+
+    def work():
+        release.wait(5)
+        finished.set()
+
+    async def main():
+        request = asyncio.ensure_future(hasher.run(work))
+        await asyncio.sleep(0.05)
+        request.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await request
+        pending_after_cancel = hasher.pending
+        release.set()
+        finished.wait(5)
+        await asyncio.sleep(0.05)
+        return pending_after_cancel
+
+    try:
+        assert asyncio.run(main()) == 1
+    finally:
+        hasher.shutdown()
+
+    assert hasher.pending == 0